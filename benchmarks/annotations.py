@@ -0,0 +1,23 @@
+"""Benchmarks of reading annotation files."""
+
+import os.path
+
+import benchmarks.run
+import benchmarks.synthetic
+import vta.dataset.annotations
+
+
+def _setup_file(count, directory):
+    file_path = os.path.join(directory, "groundtruth.txt")
+    return (benchmarks.synthetic.write_annotations(file_path, count),)
+
+
+BENCHMARKS = [
+    benchmarks.run.Benchmark(
+        "annotations.read_groundtruth",
+        [10**3, 10**4, 10**5, 10**6],
+        _setup_file,
+        vta.dataset.annotations.read_groundtruth,
+    ),
+]
+"""The benchmarks of this suite."""
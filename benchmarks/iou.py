@@ -0,0 +1,106 @@
+"""Benchmarks of the intersection-over-union functions."""
+
+import benchmarks.run
+import benchmarks.synthetic
+import vta.iou.bounding_box as bounding_box
+import vta.iou.center_error as center_error
+import vta.iou.matching as matching
+import vta.iou.spatial_index as spatial_index
+
+
+def _setup_pairs(count, _):
+    return benchmarks.synthetic.make_tracks(count)
+
+
+def _setup_boxes(count, _):
+    ground_truth, results = benchmarks.synthetic.make_tracks(count)
+    return (
+        [_make_box(box) for box in ground_truth],
+        [_make_box(box) for box in results],
+    )
+
+
+def _setup_matrix(count, _):
+    return benchmarks.synthetic.make_boxes(count, 1), benchmarks.synthetic.make_boxes(
+        count, 2
+    )
+
+
+def _setup_detections(frames, _):
+    ground_truth, ground_truth_frames, predicted, predicted_frames = (
+        benchmarks.synthetic.make_detections(frames, 20)
+    )
+    return predicted, predicted_frames, ground_truth, ground_truth_frames
+
+
+def _setup_index(count, _):
+    # Small boxes keep the number of matches low, so the search is timed.
+    boxes = benchmarks.synthetic.make_boxes(count)
+    regions = benchmarks.synthetic.make_boxes(100, 1)
+    boxes[:, 2:4] /= 10.0
+    regions[:, 2:4] /= 10.0
+    return spatial_index.SpatialIndex(boxes), regions
+
+
+def _query_index(index, regions):
+    for region in regions:
+        index.query(region)
+
+
+def _calculate_scalar(ground_truth, results):
+    for a, b in zip(ground_truth, results):
+        bounding_box.calculate_iou(a, b)
+
+
+def _calculate_normalized_precision(ground_truth, results):
+    errors = center_error.calculate_normalized_center_error(results, ground_truth)
+    return center_error.calculate_threshold_curve(
+        errors, center_error.NORMALIZED_THRESHOLDS
+    )
+
+
+def _make_box(box):
+    return bounding_box.BoundingBox(
+        bounding_box.Point(box[0], box[1]), bounding_box.Size(box[2], box[3])
+    )
+
+
+BENCHMARKS = [
+    benchmarks.run.Benchmark(
+        "iou.batch",
+        [10**3, 10**4, 10**5, 10**6, 10**7],
+        _setup_pairs,
+        bounding_box.calculate_iou_batch,
+    ),
+    benchmarks.run.Benchmark(
+        "iou.scalar", [10**3, 10**4], _setup_boxes, _calculate_scalar
+    ),
+    benchmarks.run.Benchmark(
+        "iou.matrix",
+        [100, 1000, 3000],
+        _setup_matrix,
+        bounding_box.calculate_iou_matrix,
+    ),
+    benchmarks.run.Benchmark(
+        "iou.normalized_precision",
+        [10**3, 10**5, 10**7],
+        _setup_pairs,
+        _calculate_normalized_precision,
+    ),
+    benchmarks.run.Benchmark(
+        "iou.match_sequence",
+        [100, 1000, 10000],
+        _setup_detections,
+        matching.match_sequence,
+    ),
+    benchmarks.run.Benchmark(
+        "iou.index_build",
+        [10**4, 10**5, 10**6],
+        lambda count, _: (benchmarks.synthetic.make_boxes(count),),
+        spatial_index.SpatialIndex,
+    ),
+    benchmarks.run.Benchmark(
+        "iou.index_query", [10**4, 10**5, 10**6], _setup_index, _query_index
+    ),
+]
+"""The benchmarks of this suite."""
@@ -0,0 +1,78 @@
+"""Benchmarks of reading, ranking, and drawing loss data."""
+
+import matplotlib.backends.backend_agg
+import matplotlib.figure
+
+import benchmarks.run
+import benchmarks.synthetic
+import vta.loss.data
+import vta.loss.loss
+import vta.loss.ranking
+
+_FILES = [(10, 1000), (100, 1000), (10, 100000), (100, 10000)]
+_RUNS = [(100, 10000, a) for a in vta.loss.ranking.ALGORITHMS] + [(1000, 10000, "last")]
+_FIGURES = [(10, 10000), (10, 1000000), (50, 100000)]
+
+
+def _setup_json_files(parameter, directory):
+    count, length = parameter
+    losses = benchmarks.synthetic.make_losses(count, length)
+    return (benchmarks.synthetic.write_loss_files(directory, losses),)
+
+
+def _setup_binary_files(parameter, directory):
+    count, length = parameter
+    losses = benchmarks.synthetic.make_losses(count, length)
+    return (benchmarks.synthetic.write_loss_files(directory, losses, binary=True),)
+
+
+def _setup_runs(parameter, _):
+    count, length, algorithm = parameter
+    return benchmarks.synthetic.make_losses(count, length), algorithm
+
+
+def _setup_figure(parameter, _):
+    count, length = parameter
+    losses = benchmarks.synthetic.make_losses(count, length)
+    configuration = (
+        vta.loss.loss._augment_configuration(  # pylint: disable=protected-access
+            {
+                "maximum_graphs": count,
+                "sort_algorithm": "last",
+                "line_loss": True,
+                "scatter_loss": False,
+                "line_precision": True,
+                "scatter_precision": False,
+            }
+        )
+    )
+    return configuration, vta.loss.data.LossTable.from_losses(losses)
+
+
+def _read_files(file_paths):
+    vta.loss.loss._read_loss_data(file_paths)  # pylint: disable=protected-access
+
+
+def _draw_figure(configuration, table):
+    figure = matplotlib.figure.Figure(figsize=(15, 10))
+    canvas = matplotlib.backends.backend_agg.FigureCanvasAgg(figure)
+    vta.loss.loss._draw_figure(  # pylint: disable=protected-access
+        figure, configuration, table
+    )
+    canvas.draw()
+
+
+BENCHMARKS = [
+    benchmarks.run.Benchmark("loss.read_json", _FILES, _setup_json_files, _read_files),
+    benchmarks.run.Benchmark(
+        "loss.read_binary", _FILES, _setup_binary_files, _read_files
+    ),
+    benchmarks.run.Benchmark(
+        "loss.sort_by_loss", _RUNS, _setup_runs, vta.loss.data.sort_by_loss
+    ),
+    benchmarks.run.Benchmark(
+        "loss.sort_by_precision", _RUNS, _setup_runs, vta.loss.data.sort_by_precision
+    ),
+    benchmarks.run.Benchmark("loss.draw_figure", _FIGURES, _setup_figure, _draw_figure),
+]
+"""The benchmarks of this suite."""
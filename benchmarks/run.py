@@ -0,0 +1,216 @@
+"""Run the benchmark suite, and save or compare the results.
+
+Each suite is a module with a ``BENCHMARKS`` list of :py:class:`Benchmark`. The
+results are written as JSON, with the commit that was measured, so that two
+commits can be compared with ``--compare``. Run this from the repository root::
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --compare results.json --filter iou
+"""
+
+import argparse
+import importlib
+import json
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy
+
+SUITES = ("benchmarks.iou", "benchmarks.annotations", "benchmarks.loss")
+"""The names of the benchmark suite modules."""
+
+
+class Benchmark:
+    """A function to time, with each of several parameters.
+
+    .. py:attribute:: name
+        The name of the benchmark, such as ``iou.batch``.
+
+    .. py:attribute:: parameters
+        The parameters with which the benchmark is run, such as the number of
+        boxes. Each is passed to ``setup``.
+
+    .. py:attribute:: setup
+        A function that takes a parameter and a temporary directory, prepares
+        the data, and returns the tuple of arguments for ``function``. The time
+        it takes is not measured.
+
+    .. py:attribute:: function
+        The function that is timed.
+    """
+
+    def __init__(self, name: str, parameters, setup, function):
+        self.name = name
+        self.parameters = list(parameters)
+        self.setup = setup
+        self.function = function
+
+    def measure(self, parameter, repeat: int) -> list:
+        """Time the function with one parameter.
+
+        :param parameter: One of :py:attr:`parameters`.
+        :param int repeat: The number of times to call the function.
+        :returns: The time of each call, in seconds.
+        :rtype: list
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            arguments = self.setup(parameter, directory)
+            times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                self.function(*arguments)
+                times.append(time.perf_counter() - start)
+        return times
+
+
+def run_benchmarks(benchmarks, repeat: int, quick: bool = False) -> list:
+    """Run benchmarks, printing each result as it is measured.
+
+    :param benchmarks: The :py:class:`Benchmark` objects to run.
+    :param int repeat: The number of times to time each benchmark, with each
+        parameter.
+    :param bool quick: If ``True``, only run each benchmark with its first two
+        parameters.
+    :returns: One dictionary per benchmark and parameter, with the benchmark
+        name, the parameter, the times, and the median time.
+    :rtype: list
+    """
+    results = []
+    for benchmark in benchmarks:
+        for parameter in benchmark.parameters[: 2 if quick else None]:
+            times = benchmark.measure(parameter, repeat)
+            results.append(
+                {
+                    "benchmark": benchmark.name,
+                    "parameter": str(parameter),
+                    "times": times,
+                    "median": statistics.median(times),
+                }
+            )
+            print(f"{benchmark.name:<30}{str(parameter):<28}{_format(times)}")
+    return results
+
+
+def compare_results(old: list, new: list, threshold: float) -> int:
+    """Print the change in each result, and count the regressions.
+
+    :param list old: The results of an earlier run, as returned by
+        :py:func:`run_benchmarks`.
+    :param list new: The results of this run.
+    :param float threshold: A result regressed if its median time is more than
+        this many times the old median time.
+    :returns: The number of results that regressed.
+    :rtype: int
+    """
+    medians = {(r["benchmark"], r["parameter"]): r["median"] for r in old}
+    regressions = 0
+    for result in new:
+        key = (result["benchmark"], result["parameter"])
+        if key not in medians:
+            continue
+        ratio = result["median"] / medians[key]
+        regressed = ratio > threshold
+        regressions += regressed
+        print(
+            f"{key[0]:<30}{key[1]:<28}{ratio:6.2f}x"
+            + ("  REGRESSION" if regressed else "")
+        )
+    return regressions
+
+
+def main() -> int:
+    """Run the benchmarks selected on the command line.
+
+    :return: An exit code following Unix command conventions. 1 indicates that
+        a benchmark regressed, compared to the ``--compare`` results.
+    :rtype: int
+    """
+    arguments = _make_parser().parse_args()
+    pattern = re.compile(arguments.filter or "")
+    benchmarks = [
+        benchmark
+        for suite in SUITES
+        for benchmark in importlib.import_module(suite).BENCHMARKS
+        if pattern.search(benchmark.name)
+    ]
+    results = run_benchmarks(benchmarks, arguments.repeat, arguments.quick)
+    if arguments.output:
+        with open(arguments.output, "w") as output_file:
+            json.dump(_describe_run(results), output_file, indent=2)
+    if arguments.compare:
+        with open(arguments.compare) as old_file:
+            old = json.load(old_file)["results"]
+        if compare_results(old, results, arguments.threshold):
+            return 1
+    return 0
+
+
+# -----------------------------------------------------------------------------
+#                                                       implementation details
+# -----------------------------------------------------------------------------
+def _make_parser():
+    parser = argparse.ArgumentParser(
+        description="Run the VTA benchmark suite.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument(
+        "--filter", help="Only run benchmarks whose names match this expression."
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="The number of times to time each."
+    )
+    parser.add_argument(
+        "--quick",
+        action="store_true",
+        help="Only run each benchmark with its two smallest parameters.",
+    )
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument(
+        "--compare", help="Compare the results to those in this JSON file."
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.25,
+        help="The ratio of new to old median time that is a regression.",
+    )
+    return parser
+
+
+def _describe_run(results):
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            check=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            universal_newlines=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "numpy": numpy.__version__,
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def _format(times):
+    median = statistics.median(times)
+    if median < 1e-3:
+        return f"{median * 1e6:9.1f} us"
+    if median < 1.0:
+        return f"{median * 1e3:9.1f} ms"
+    return f"{median:9.2f} s"
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""Measure how long each VTA command takes to start.
+
+Each command is started in a new Python process, as a shell script would start
+it, with ``--help``; so the time is what the command pays before it does any
+work. The cumulative import time of the command's module is read from Python's
+``-X importtime`` report. Run this from the repository root::
+
+    python -m benchmarks.startup --repeat 10
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+import vta.vta
+
+
+def measure_startup(command: str, repeat: int) -> dict:
+    """Measure the start up time of one command.
+
+    :param str command: The name of a command in :py:data:`vta.vta.COMMANDS`,
+        or ``None`` to measure ``vta --version``.
+    :param int repeat: The number of times to start the command.
+    :returns: A dictionary with the command name, the median wall time of the
+        ``repeat`` runs, in seconds, and the cumulative import time of the
+        command's module, in seconds.
+    :rtype: dict
+    """
+    arguments = [command, "--help"] if command else ["--version"]
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-m", "vta.vta", *arguments],
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        times.append(time.perf_counter() - start)
+    module = vta.vta.COMMANDS[command].module if command else "vta.vta"
+    return {
+        "command": command or "--version",
+        "wall_time": statistics.median(times),
+        "import_time": _import_time(module),
+    }
+
+
+def main() -> int:
+    """Measure the start up time of every command, and print the results.
+
+    :return: An exit code following Unix command conventions.
+    :rtype: int
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="The number of runs per command."
+    )
+    parser.add_argument("--output", help="Also write the results to this JSON file.")
+    arguments = parser.parse_args()
+    results = [
+        measure_startup(command, arguments.repeat)
+        for command in [None, *vta.vta.COMMANDS]
+    ]
+    for result in results:
+        print(
+            f"{result['command']:>10}: {result['wall_time'] * 1000:7.1f} ms wall,"
+            f" {result['import_time'] * 1000:7.1f} ms importing"
+        )
+    if arguments.output:
+        with open(arguments.output, "w") as output_file:
+            json.dump(results, output_file, indent=2)
+    return 0
+
+
+# -----------------------------------------------------------------------------
+#                                                       implementation details
+# -----------------------------------------------------------------------------
+def _import_time(module):
+    """Return the cumulative time, in seconds, of importing module."""
+    report = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        check=True,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    ).stderr
+    for line in report.splitlines():
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1]) / 1e6
+    return float("nan")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+"""Generators of reproducible synthetic data for the benchmarks.
+
+Every generator takes a seed, so a benchmark measures the same data on every
+commit, and results can be compared.
+"""
+
+import os.path
+
+import numpy
+
+import vta.loss.data
+import vta.loss.loss_file
+
+
+def make_boxes(count: int, seed: int = 0) -> numpy.ndarray:
+    """Make random boxes, in a 640 x 480 frame.
+
+    :param int count: The number of boxes.
+    :param int seed: The seed of the random number generator.
+    :returns: A ``(count, 4)`` array of ``[x, y, width, height]`` boxes.
+    :rtype: numpy.ndarray
+    """
+    generator = numpy.random.default_rng(seed)
+    sizes = generator.uniform(10.0, 200.0, (count, 2))
+    corners = generator.uniform(0.0, 1.0, (count, 2)) * ([640.0, 480.0] - sizes)
+    return numpy.hstack((corners, sizes))
+
+
+def make_tracks(count: int, seed: int = 0) -> tuple:
+    """Make ground truth boxes, and tracker boxes that follow them with noise.
+
+    :param int count: The number of boxes in each array.
+    :param int seed: The seed of the random number generator.
+    :returns: A tuple of two ``(count, 4)`` arrays. Most pairs of boxes
+        overlap, as in real tracker results.
+    :rtype: tuple(numpy.ndarray, numpy.ndarray)
+    """
+    ground_truth = make_boxes(count, seed)
+    generator = numpy.random.default_rng(seed + 1)
+    noise = generator.normal(0.0, 0.1, (count, 4)) * ground_truth[:, [2, 3, 2, 3]]
+    return ground_truth, ground_truth + noise
+
+
+def make_detections(frames: int, objects: int, seed: int = 0) -> tuple:
+    """Make the ground truth and tracker boxes of a multiple object sequence.
+
+    :param int frames: The number of frames.
+    :param int objects: The number of ground truth boxes in each frame. The
+        tracker reports each of them with noise, plus as many false positives.
+    :param int seed: The seed of the random number generator.
+    :returns: A tuple of the ground truth boxes, their frames, the tracker
+        boxes, and their frames.
+    :rtype: tuple(numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray)
+    """
+    ground_truth, tracked = make_tracks(frames * objects, seed)
+    false_positives = make_boxes(frames * objects, seed + 2)
+    ground_truth_frames = numpy.repeat(numpy.arange(frames), objects)
+    return (
+        ground_truth,
+        ground_truth_frames,
+        numpy.concatenate((tracked, false_positives)),
+        numpy.concatenate((ground_truth_frames, ground_truth_frames)),
+    )
+
+
+def make_loss(label: str, length: int, seed: int = 0) -> vta.loss.data.Loss:
+    """Make the loss data of one training run.
+
+    :param str label: The label of the run.
+    :param int length: The number of epochs.
+    :param int seed: The seed of the random number generator.
+    :returns: Loss values that decay with noise, and precision values that rise
+        with noise.
+    :rtype: vta.loss.data.Loss
+    """
+    generator = numpy.random.default_rng(seed)
+    decay = numpy.exp(-numpy.linspace(0.0, generator.uniform(2.0, 6.0), length))
+    loss = decay + generator.normal(0.0, 0.02, length)
+    precision = 1.0 - decay + generator.normal(0.0, 0.02, length)
+    return vta.loss.data.Loss(label, loss, precision)
+
+
+def make_losses(count: int, length: int, seed: int = 0) -> list:
+    """Make the loss data of several training runs.
+
+    :param int count: The number of runs.
+    :param int length: The number of epochs of each run.
+    :param int seed: The seed of the first run; the other runs use the seeds
+        after it.
+    :returns: A list of :py:class:`vta.loss.data.Loss`.
+    :rtype: list
+    """
+    return [make_loss(f"run{i}", length, seed + i) for i in range(count)]
+
+
+def write_loss_files(directory: str, losses, binary: bool = False) -> list:
+    """Write loss data to files.
+
+    :param str directory: The directory in which to write the files.
+    :param losses: The :py:class:`vta.loss.data.Loss` objects to write.
+    :param bool binary: If ``True``, write binary loss files. Otherwise, write
+        JSON loss files.
+    :returns: The paths of the files, in the order of ``losses``.
+    :rtype: list
+    """
+    file_paths = []
+    for loss in losses:
+        if binary:
+            file_path = os.path.join(
+                directory, loss.label + vta.loss.loss_file.BINARY_EXTENSION
+            )
+            vta.loss.loss_file.write_binary_loss_file(file_path, loss)
+        else:
+            file_path = os.path.join(directory, f"{loss.label}.json")
+            _write_json(file_path, loss)
+        file_paths.append(file_path)
+    return file_paths
+
+
+def write_annotations(file_path: str, count: int, seed: int = 0) -> str:
+    """Write a ground truth annotation file of rectangles.
+
+    :param str file_path: The path of the file to write.
+    :param int count: The number of frames.
+    :param int seed: The seed of the random number generator.
+    :returns: ``file_path``
+    :rtype: str
+    """
+    numpy.savetxt(file_path, make_boxes(count, seed), fmt="%.2f", delimiter=",")
+    return file_path
+
+
+# -----------------------------------------------------------------------------
+#                                                       implementation details
+# -----------------------------------------------------------------------------
+def _write_json(file_path, loss):
+    def array(values):
+        return ",".join(numpy.char.mod("%.6g", values))
+
+    with open(file_path, "w") as loss_file:
+        loss_file.write(
+            f'{{"label": "{loss.label}", "loss": [{array(loss.loss_values)}],'
+            f' "precision": [{array(loss.precision_values)}]}}'
+        )
@@ -0,0 +1,92 @@
+"""Unit tests for reading annotation and result files."""
+
+import os.path
+import tempfile
+import unittest
+
+import numpy
+
+from vta.dataset import annotations
+
+
+class AnnotationsTest(unittest.TestCase):
+    """Test cases for annotation file parsing."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.directory.name, "groundtruth.txt")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _write(self, text):
+        with open(self.file_path, "w") as annotation_file:
+            annotation_file.write(text)
+
+    def test_separators(self):
+        """Validate that commas, tabs, and spaces all separate values."""
+        self._write("1,2,3,4\n5\t6\t7\t8\n9 10 11 12\n")
+        numpy.testing.assert_array_equal(
+            annotations.read_groundtruth(self.file_path),
+            [[1, 2, 3, 4], [5, 6, 7, 8], [9, 10, 11, 12]],
+        )
+
+    def test_polygons(self):
+        """Validate reading polygons, and converting rectangles to polygons."""
+        self._write("1,2,3,4,5,6,7,8\n1,2,3,4\n")
+        numpy.testing.assert_array_equal(
+            annotations.read_groundtruth(self.file_path),
+            [[1, 2, 3, 4, 5, 6, 7, 8], [1, 2, 4, 2, 4, 6, 1, 6]],
+        )
+
+    def test_status_codes(self):
+        """Validate reading VOT status codes from a result file."""
+        self._write("1\n1,2,3,4\n2\n0\n1\n")
+        regions, codes = annotations.read_results(self.file_path)
+        numpy.testing.assert_array_equal(
+            codes,
+            [
+                annotations.INITIALIZATION,
+                annotations.TRACKED,
+                annotations.FAILURE,
+                annotations.SKIPPED,
+                annotations.INITIALIZATION,
+            ],
+        )
+        numpy.testing.assert_array_equal(regions[1], [1, 2, 3, 4])
+        self.assertTrue(numpy.all(numpy.isnan(regions[[0, 2, 3, 4]])))
+        with self.assertRaises(ValueError):
+            annotations.read_groundtruth(self.file_path)
+
+    def test_invalid_files(self):
+        """Validate that malformed lines are rejected."""
+        self._write("1,2,3\n")
+        with self.assertRaises(ValueError):
+            annotations.read_groundtruth(self.file_path)
+        self._write("1,2,three,4\n")
+        with self.assertRaises(ValueError):
+            annotations.read_groundtruth(self.file_path)
+
+    def test_blank_lines(self):
+        """Validate that blank lines are NaN frames, except at the end."""
+        self._write("\n1,2,3,4\n\n \n5,6,7,8\n\n\n")
+        regions = annotations.read_groundtruth(self.file_path)
+        self.assertEqual(regions.shape, (5, 4))
+        numpy.testing.assert_array_equal(regions[[1, 4]], [[1, 2, 3, 4], [5, 6, 7, 8]])
+        self.assertTrue(numpy.all(numpy.isnan(regions[[0, 2, 3]])))
+        for chunk_size in range(1, 7):
+            numpy.testing.assert_array_equal(
+                numpy.concatenate(
+                    list(annotations.iterate_groundtruth(self.file_path, chunk_size))
+                ),
+                regions,
+            )
+
+    def test_chunks(self):
+        """Validate reading a file in chunks."""
+        self._write("".join(f"{i},{i},10,10\n" for i in range(10)))
+        chunks = list(annotations.iterate_groundtruth(self.file_path, 4))
+        self.assertEqual([len(chunk) for chunk in chunks], [4, 4, 2])
+        numpy.testing.assert_array_equal(
+            numpy.concatenate(chunks), annotations.read_groundtruth(self.file_path)
+        )
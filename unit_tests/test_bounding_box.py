@@ -2,6 +2,8 @@
 
 import unittest
 
+import numpy
+
 import vta.iou.bounding_box as bounding_box
 
 
@@ -77,3 +79,65 @@ class BoundingBoxTest(unittest.TestCase):
             bounding_box.Point(15, 5), bounding_box.Size(15, 20)
         )
         self.assertAlmostEqual(bounding_box.calculate_iou(a, b), 0.0)
+
+    def test_iou_of_arrays(self):
+        """Validate that single box arrays give the same IoU as boxes."""
+        a = bounding_box.BoundingBox(
+            bounding_box.Point(5, 10), bounding_box.Size(5, 20)
+        )
+        b = numpy.array([7, 5, 15, 20])
+        self.assertAlmostEqual(bounding_box.calculate_iou(a, b), 0.12676056338)
+        self.assertEqual(bounding_box.calculate_iou(numpy.array([0, 0, 2, 2]), b), 0.0)
+        with self.assertRaises(ValueError):
+            bounding_box.calculate_iou(numpy.array([b, b]), a)
+
+    def test_iou_paths(self):
+        """Validate that boxes and arrays give the same IoU for any pair."""
+        generator = numpy.random.default_rng(7)
+        boxes = generator.integers(-5, 10, (200, 2, 4)).astype(float)
+        boxes[:, :, 2:4] = numpy.abs(boxes[:, :, 2:4])
+        boxes[:20, :, 2] = 0.0
+        boxes[20:30, 1] = boxes[20:30, 0]
+        for a, b in boxes:
+            box_a, box_b = (
+                bounding_box.BoundingBox(
+                    bounding_box.Point(*box[0:2]), bounding_box.Size(*box[2:4])
+                )
+                for box in (a, b)
+            )
+            self.assertEqual(
+                bounding_box.calculate_iou(box_a, box_b),
+                bounding_box.calculate_iou(a, b),
+            )
+
+    def test_iou_batch(self):
+        """Validate calculation of IoU for arrays of boxes."""
+        predicted = numpy.array([[5, 10, 5, 20], [5, 10, 5, 20], [0, 0, 4, 4]])
+        ground_truth = numpy.array([[7, 5, 15, 20], [15, 5, 15, 20], [0, 0, 4, 4]])
+        numpy.testing.assert_allclose(
+            bounding_box.calculate_iou_batch(predicted, ground_truth),
+            [0.12676056338, 0.0, 1.0],
+        )
+
+    def test_iou_batch_shape_mismatch(self):
+        """Validate that the batch IoU rejects arrays of different lengths."""
+        with self.assertRaises(ValueError):
+            bounding_box.calculate_iou_batch(numpy.zeros((2, 4)), numpy.zeros((3, 4)))
+
+    def test_iou_batch_empty_boxes(self):
+        """Validate that boxes with no area have 0 IoU."""
+        boxes = numpy.array([[1, 1, 0, 0], [2, 2, 0, 5]])
+        numpy.testing.assert_array_equal(
+            bounding_box.calculate_iou_batch(boxes, boxes), [0.0, 0.0]
+        )
+
+    def test_iou_matrix(self):
+        """Validate calculation of the pairwise IoU matrix."""
+        a = numpy.array([[5, 10, 5, 20], [15, 5, 15, 20]])
+        b = numpy.array([[7, 5, 15, 20], [5, 10, 5, 20], [100, 100, 1, 1]])
+        matrix = bounding_box.calculate_iou_matrix(a, b)
+        self.assertEqual(matrix.shape, (2, 3))
+        numpy.testing.assert_allclose(
+            matrix,
+            [[0.12676056338, 1.0, 0.0], [140.0 / 460.0, 0.0, 0.0]],
+        )
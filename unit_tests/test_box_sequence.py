@@ -0,0 +1,76 @@
+"""Unit tests for the array backed box sequence."""
+
+import unittest
+
+import numpy
+
+import vta.iou.bounding_box as bounding_box
+from vta.iou.box_sequence import BoxSequence
+
+
+class BoxSequenceTest(unittest.TestCase):
+    """Test cases for BoxSequence functionality."""
+
+    def setUp(self):
+        self.boxes = numpy.array(
+            [[5, 10, 5, 20], [7, 5, 15, 20], [-5, -5, 10, 10]], dtype=numpy.float32
+        )
+
+    def test_storage(self):
+        """Validate that float arrays are stored without a copy."""
+        sequence = BoxSequence(self.boxes)
+        self.assertEqual(len(sequence), 3)
+        self.assertEqual(sequence.dtype, numpy.float32)
+        self.assertTrue(numpy.shares_memory(sequence.boxes, self.boxes))
+        self.assertEqual(BoxSequence([[1, 2, 3, 4]]).dtype, numpy.float64)
+
+    def test_invalid_shape(self):
+        """Validate that arrays which are not (N,4) are rejected."""
+        with self.assertRaises(ValueError):
+            BoxSequence(numpy.zeros((3, 5)))
+        with self.assertRaises(ValueError):
+            BoxSequence(self.boxes, dtype=numpy.int32)
+
+    def test_slicing(self):
+        """Validate that slices share memory with the original sequence."""
+        sequence = BoxSequence(self.boxes)
+        tail = sequence[1:]
+        self.assertIsInstance(tail, BoxSequence)
+        self.assertEqual(len(tail), 2)
+        self.assertTrue(numpy.shares_memory(tail.boxes, self.boxes))
+
+    def test_selection(self):
+        """Validate that arrays, lists, and masks select a new sequence."""
+        sequence = BoxSequence(self.boxes)
+        for index in ([0, 2], numpy.array([0, 2]), numpy.array([True, False, True])):
+            selected = sequence[index]
+            self.assertIsInstance(selected, BoxSequence)
+            numpy.testing.assert_array_equal(selected.area, [100, 100])
+        self.assertEqual(sequence[numpy.int64(1)].area, 300)
+        self.assertEqual(len(sequence[[]]), 0)
+
+    def test_view(self):
+        """Validate that a frame view behaves like a bounding box."""
+        # pylint cannot tell that an integer index gives a BoxView.
+        # pylint: disable=no-member
+        view = BoxSequence(self.boxes)[1]
+        self.assertEqual(view.upper_left_corner.x, 7)
+        self.assertEqual(view.size.height, 20)
+        self.assertEqual(view.area, 300)
+        a = bounding_box.BoundingBox(
+            bounding_box.Point(5, 10), bounding_box.Size(5, 20)
+        )
+        self.assertAlmostEqual(bounding_box.calculate_iou(a, view), 0.12676056338)
+
+    def test_bulk_operations(self):
+        """Validate area, center, and clipping of a whole sequence."""
+        sequence = BoxSequence(self.boxes)
+        numpy.testing.assert_array_equal(sequence.area, [100, 300, 100])
+        numpy.testing.assert_array_equal(sequence.center[0], [7.5, 20])
+        numpy.testing.assert_array_equal(
+            sequence.clip(20, 20).boxes,
+            [[5, 10, 5, 10], [7, 5, 13, 15], [0, 0, 5, 5]],
+        )
+        numpy.testing.assert_allclose(
+            bounding_box.calculate_iou_batch(sequence, sequence), [1, 1, 1]
+        )
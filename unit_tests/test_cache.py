@@ -0,0 +1,62 @@
+"""Unit tests for the annotation cache."""
+
+import os
+import os.path
+import tempfile
+import unittest
+
+import numpy
+
+from vta.dataset.cache import AnnotationCache
+
+
+class AnnotationCacheTest(unittest.TestCase):
+    """Test cases for AnnotationCache functionality."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = AnnotationCache(self.directory.name)
+        self.file_path = os.path.join(self.directory.name, "groundtruth.txt")
+        self._write("1,2,3,4\n5,6,7,8\n", 1000)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _write(self, text, modified):
+        with open(self.file_path, "w") as annotation_file:
+            annotation_file.write(text)
+        os.utime(self.file_path, ns=(modified, modified))
+
+    def test_cached_load(self):
+        """Validate that a second load is memory mapped from the cache."""
+        first = self.cache.groundtruth(self.file_path)
+        second = self.cache.groundtruth(self.file_path)
+        self.assertIsInstance(second, numpy.memmap)
+        numpy.testing.assert_array_equal(first, second)
+        self.assertTrue(os.path.isdir(self.cache.directory))
+
+    def test_changed_contents(self):
+        """Validate that a changed file is parsed again."""
+        self.cache.groundtruth(self.file_path)
+        self._write("9,9,9,9\n", 2000)
+        numpy.testing.assert_array_equal(
+            self.cache.groundtruth(self.file_path), [[9, 9, 9, 9]]
+        )
+
+    def test_same_size_change(self):
+        """Validate that the content hash catches changes of the same size."""
+        self.cache.groundtruth(self.file_path)
+        self._write("1,2,3,4\n5,6,7,9\n", 2000)
+        numpy.testing.assert_array_equal(
+            self.cache.groundtruth(self.file_path)[1], [5, 6, 7, 9]
+        )
+
+    def test_results(self):
+        """Validate that status codes are cached with the regions."""
+        self._write("1\n1,2,3,4\n2\n", 3000)
+        self.cache.results(self.file_path)
+        regions, codes = self.cache.results(self.file_path)
+        numpy.testing.assert_array_equal(codes, [1, -1, 2])
+        self.assertEqual(regions.shape, (3, 4))
+        with self.assertRaises(ValueError):
+            self.cache.groundtruth(self.file_path)
@@ -0,0 +1,65 @@
+"""Unit tests for center error functionality."""
+
+import unittest
+
+import numpy
+
+from vta.iou import center_error
+
+
+class CenterErrorTest(unittest.TestCase):
+    """Test cases for center error functionality."""
+
+    def setUp(self):
+        self.ground_truth = numpy.array(
+            [[0, 0, 10, 20], [0, 0, 10, 20], [0, 0, 10, 20], [0, 0, 0, 20]],
+            dtype=float,
+        )
+        self.predicted = numpy.array(
+            [[3, 4, 10, 20], [0, 0, 10, 20], [numpy.nan] * 4, [0, 0, 10, 20]]
+        )
+
+    def test_centers(self):
+        """Validate the centers of boxes and polygons."""
+        numpy.testing.assert_array_equal(
+            center_error.calculate_centers([[1, 2, 4, 6]]), [[3, 5]]
+        )
+        numpy.testing.assert_array_equal(
+            center_error.calculate_centers([[1, 2, 5, 2, 5, 8, 1, 8]]), [[3, 5]]
+        )
+        with self.assertRaises(ValueError):
+            center_error.calculate_centers(numpy.zeros((2, 5)))
+
+    def test_center_error(self):
+        """Validate the distance between centers."""
+        errors = center_error.calculate_center_error(self.predicted, self.ground_truth)
+        numpy.testing.assert_array_equal(errors, [5, 0, numpy.inf, 5])
+        with self.assertRaises(ValueError):
+            center_error.calculate_center_error(self.predicted[:2], self.ground_truth)
+
+    def test_mixed_regions(self):
+        """Validate that boxes can be compared to polygons."""
+        polygons = numpy.array([[0, 0, 10, 0, 10, 20, 0, 20]], dtype=float)
+        errors = center_error.calculate_normalized_center_error(
+            self.predicted[:1], polygons
+        )
+        numpy.testing.assert_allclose(errors, [numpy.hypot(0.3, 0.2)])
+
+    def test_normalized_center_error(self):
+        """Validate the distance between centers, relative to the size."""
+        errors = center_error.calculate_normalized_center_error(
+            self.predicted, self.ground_truth
+        )
+        numpy.testing.assert_allclose(
+            errors, [numpy.hypot(0.3, 0.2), 0, numpy.inf, numpy.inf]
+        )
+
+    def test_threshold_curve(self):
+        """Validate the fraction of errors within each threshold."""
+        curve = center_error.calculate_threshold_curve(
+            [5, 0, numpy.inf, 5], [0, 4.9, 5, 100]
+        )
+        numpy.testing.assert_array_equal(curve, [0.25, 0.25, 0.75, 0.75])
+        numpy.testing.assert_array_equal(
+            center_error.calculate_threshold_curve([], [0, 1]), [0, 0]
+        )
@@ -0,0 +1,83 @@
+"""Unit tests for the loss data structures."""
+
+import os.path
+import tempfile
+import unittest
+
+import numpy
+
+import vta.loss.data as data
+
+
+class LossTableTest(unittest.TestCase):
+    """Test cases for storing many runs in columns."""
+
+    def setUp(self):
+        self.losses = [
+            data.Loss("a", numpy.array([5.0, 2.0, 1.0]), numpy.array([0.1, 0.2])),
+            data.Loss("b", numpy.array([]), numpy.array([0.3])),
+            data.Loss("c", numpy.array([4.0, numpy.inf]), numpy.array([numpy.nan])),
+        ]
+        self.table = data.LossTable.from_losses(self.losses, ["a.json", None, "c"])
+
+    def test_views(self):
+        """Validate that each run is a view into the table's columns."""
+        self.assertEqual(len(self.table), 3)
+        numpy.testing.assert_array_equal(self.table.loss.offsets, [0, 3, 3, 5])
+        loss = self.table[0]
+        self.assertIs(self.table[0], loss)
+        self.assertEqual(loss.label, "a")
+        self.assertIs(loss.loss_values, self.losses[0].loss_values)
+        numpy.testing.assert_array_equal(loss.precision_values, [0.1, 0.2])
+        values = self.table.loss.values
+        self.assertTrue(numpy.shares_memory(self.table.loss[0], values))
+
+    def test_memory_mapped_rows(self):
+        """Validate that rows are only copied when all values are needed."""
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, "loss.bin")
+            numpy.arange(6.0).tofile(file_path)
+            mapped = numpy.memmap(file_path, dtype=numpy.float64, mode="r")
+            column = data.RaggedArray.from_arrays([mapped[:4], mapped[4:]])
+            table = data.LossTable(["a", "b"], column, column).select([1, 0])
+            self.assertIs(table.loss[1], column[0])
+            numpy.testing.assert_array_equal(table.loss.last(), [5, 3])
+            numpy.testing.assert_array_equal(table.loss.tails(2)[0], [[4, 5], [2, 3]])
+            self.assertIsInstance(table[1].loss_values, numpy.memmap)
+            del mapped, column, table
+
+    def test_statistics(self):
+        """Validate the vectorized statistics of a ragged array."""
+        for column in (self.table.loss, self.table.select([0, 1, 2]).loss):
+            self._check_statistics(column)
+        self.table.loss.values  # pylint: disable=pointless-statement
+        self._check_statistics(self.table.loss)
+
+    def _check_statistics(self, column):
+        numpy.testing.assert_array_equal(column.first(), [5, numpy.nan, 4])
+        numpy.testing.assert_array_equal(column.last(), [1, numpy.nan, numpy.inf])
+        numpy.testing.assert_array_equal(column.reduce(numpy.fmin), [1, numpy.nan, 4])
+        numpy.testing.assert_array_equal(
+            column.prefix_sums()[column.offsets], [0, 8, 8, 12]
+        )
+        tails, present = column.tails(2)
+        numpy.testing.assert_array_equal(present, [[1, 1], [0, 0], [1, 1]])
+        numpy.testing.assert_array_equal(tails[0], [2, 1])
+        rows, epochs = column.find_invalid()
+        numpy.testing.assert_array_equal(rows, [2])
+        numpy.testing.assert_array_equal(epochs, [1])
+
+    def test_validate_and_select(self):
+        """Validate finding invalid runs, and selecting runs."""
+        invalid = self.table.invalid_runs()
+        numpy.testing.assert_array_equal(invalid, [False, False, True])
+        selected = self.table.select([2, 0])
+        self.assertEqual(selected.labels, ["c", "a"])
+        self.assertEqual(selected.sources, ["c", "a.json"])
+        numpy.testing.assert_array_equal(selected.loss.values, [4, numpy.inf, 5, 2, 1])
+        numpy.testing.assert_array_equal(selected.loss.offsets, [0, 2, 5])
+        self.assertEqual(len(self.table.select(~invalid)), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
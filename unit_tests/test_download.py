@@ -0,0 +1,291 @@
+"""Unit tests for downloading sequences from a local HTTP server."""
+
+import functools
+import hashlib
+import http.client
+import http.server
+import io
+import json
+import os
+import os.path
+import tempfile
+import threading
+import unittest
+import unittest.mock
+import zipfile
+
+import vta.dataset.download as download
+import vta.dataset.extract
+import vta.dataset.otb
+import vta.dataset.vot
+
+
+class _Unseekable(io.BytesIO):
+    """A stream that cannot seek, like a socket, so zip members get descriptors."""
+
+    def seek(self, *args):
+        raise io.UnsupportedOperation("seek")
+
+
+def _make_archive(members, compression=zipfile.ZIP_DEFLATED):
+    stream = _Unseekable()
+    with zipfile.ZipFile(stream, "w", compression) as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return stream.getvalue()
+
+
+class _RangeHandler(http.server.SimpleHTTPRequestHandler):
+    """Serves files from a directory, honoring single byte range requests."""
+
+    ranges = []
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Serve a file, or the requested range of a file."""
+        header = self.headers.get("Range")
+        if header is None:
+            super().do_GET()
+            return
+        _RangeHandler.ranges.append(header)
+        with open(self.translate_path(self.path), "rb") as served_file:
+            data = served_file.read()
+        start = int(header[len("bytes=") : -1])
+        if start >= len(data):
+            self.send_error(416)
+            return
+        self.send_response(206)
+        self.send_header("Content-Length", str(len(data) - start))
+        self.end_headers()
+        self.wfile.write(data[start:])
+
+
+class DownloadTest(unittest.TestCase):
+    """Test cases for concurrent, resumable downloads."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.served = tempfile.TemporaryDirectory()
+        handler = functools.partial(_RangeHandler, directory=cls.served.name)
+        cls.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}/"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.served.cleanup()
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.data = bytes(range(256)) * 100
+        self._serve("sequence.zip", self.data)
+        _RangeHandler.ranges.clear()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _serve(self, name, data):
+        with open(os.path.join(self.served.name, name), "wb") as served_file:
+            served_file.write(data)
+
+    def _download(self, checksum=None, extraction=None):
+        return download.Download(
+            f"{self.url}sequence.zip",
+            os.path.join(self.directory.name, "sequence.zip"),
+            checksum,
+            extraction,
+        )
+
+    def _extracted_download(self, checksum=None):
+        self.data = _make_archive({"sequence/img/0001.jpg": b"image"})
+        self._serve("sequence.zip", self.data)
+        extraction = vta.dataset.extract.Extraction(
+            os.path.join(self.directory.name, "sequence"), strip_components=1
+        )
+        return self._download(checksum, extraction)
+
+    def _read(self, file_path):
+        with open(file_path, "rb") as downloaded_file:
+            return downloaded_file.read()
+
+    def test_download_and_skip(self):
+        """Validate that a complete, verified sequence is skipped."""
+        sequence = download.SequenceDownload("sequence", [self._download()])
+        options = download.DownloadOptions()
+        self.assertTrue(download.download_sequence(sequence, options))
+        self.assertEqual(self._read(sequence.downloads[0].file_path), self.data)
+        self.assertFalse(download.download_sequence(sequence, options))
+        options.force = True
+        self.assertTrue(download.download_sequence(sequence, options))
+
+    def test_stream_extract(self):
+        """Validate that an archive is extracted without being saved."""
+        target = self._extracted_download()
+        sequence = download.SequenceDownload("sequence", [target])
+        options = download.DownloadOptions()
+        self.assertTrue(download.download_sequence(sequence, options))
+        image_path = os.path.join(self.directory.name, "sequence", "img", "0001.jpg")
+        self.assertEqual(self._read(image_path), b"image")
+        self.assertFalse(os.path.exists(target.file_path))
+        self.assertTrue(download.is_complete(target))
+        self.assertFalse(download.download_sequence(sequence, options))
+
+    def test_stream_checksum_mismatch(self):
+        """Validate that files extracted from a corrupt archive are removed."""
+        target = self._extracted_download("0" * 40)
+        sequence = download.SequenceDownload("sequence", [target])
+        with self.assertRaises(ValueError):
+            download.download_sequence(sequence, download.DownloadOptions())
+        image_path = os.path.join(self.directory.name, "sequence", "img", "0001.jpg")
+        self.assertFalse(os.path.exists(image_path))
+        self.assertFalse(download.is_complete(target))
+
+    def test_stream_resume(self):
+        """Validate that an interrupted streamed archive is resumed."""
+        target = self._extracted_download(None)
+        with open(f"{target.file_path}.part", "wb") as part_file:
+            part_file.write(self.data[:100])
+        sequence = download.SequenceDownload("sequence", [target])
+        self.assertTrue(
+            download.download_sequence(sequence, download.DownloadOptions())
+        )
+        self.assertEqual(_RangeHandler.ranges, ["bytes=100-"])
+        image_path = os.path.join(self.directory.name, "sequence", "img", "0001.jpg")
+        self.assertEqual(self._read(image_path), b"image")
+        self.assertEqual(os.listdir(self.directory.name), ["sequence"])
+        self.assertTrue(download.is_complete(target))
+
+    def test_stream_fallback(self):
+        """Validate that an archive that cannot be streamed is saved first."""
+        target = self._extracted_download(None)
+        self.data = _make_archive(
+            {"sequence/img/0001.jpg": b"image"}, zipfile.ZIP_STORED
+        )
+        self._serve("sequence.zip", self.data)
+        target.checksum = hashlib.sha256(self.data).hexdigest()
+        sequence = download.SequenceDownload("sequence", [target])
+        self.assertTrue(
+            download.download_sequence(sequence, download.DownloadOptions())
+        )
+        image_path = os.path.join(self.directory.name, "sequence", "img", "0001.jpg")
+        self.assertEqual(self._read(image_path), b"image")
+        self.assertEqual(os.listdir(self.directory.name), ["sequence"])
+        self.assertTrue(download.is_complete(target))
+
+    def test_keep_archives(self):
+        """Validate that a kept archive is saved, then extracted."""
+        target = self._extracted_download()
+        target.checksum = hashlib.md5(self.data).hexdigest()
+        sequence = download.SequenceDownload("sequence", [target])
+        options = download.DownloadOptions(keep_archives=True)
+        self.assertTrue(download.download_sequence(sequence, options))
+        self.assertEqual(self._read(target.file_path), self.data)
+        image_path = os.path.join(self.directory.name, "sequence", "img", "0001.jpg")
+        self.assertEqual(self._read(image_path), b"image")
+        self.assertTrue(download.is_complete(target))
+
+    def test_resume(self):
+        """Validate that a partial download resumes with a range request."""
+        target = self._download(hashlib.sha1(self.data).hexdigest())
+        with open(f"{target.file_path}.part", "wb") as part_file:
+            part_file.write(self.data[:1000])
+        download.download_file(target)
+        self.assertEqual(_RangeHandler.ranges, ["bytes=1000-"])
+        self.assertEqual(self._read(target.file_path), self.data)
+
+    def test_checksum_mismatch(self):
+        """Validate that a file with the wrong checksum is rejected."""
+        target = self._download("0" * 64)
+        with self.assertRaises(ValueError):
+            download.download_file(target)
+        self.assertFalse(os.path.exists(target.file_path))
+        self.assertFalse(os.path.exists(f"{target.file_path}.part"))
+
+    def test_concurrent_sequences(self):
+        """Validate downloading several sequences, reporting failures."""
+        sequences = [
+            download.SequenceDownload("good", [self._download()]),
+            download.SequenceDownload(
+                "missing",
+                [
+                    download.Download(
+                        f"{self.url}missing.zip",
+                        os.path.join(self.directory.name, "missing.zip"),
+                    )
+                ],
+            ),
+        ]
+        self.assertEqual(
+            download.download_sequences(sequences, download.DownloadOptions(jobs=2)), 1
+        )
+        self.assertTrue(download.is_complete(sequences[0].downloads[0]))
+
+    def test_broken_response(self):
+        """Validate that a broken HTTP response only fails its own sequence."""
+        sequences = [
+            download.SequenceDownload("good", [self._download()]),
+            download.SequenceDownload("broken", []),
+        ]
+
+        def download_sequence(sequence, options):
+            if sequence.name == "broken":
+                raise http.client.IncompleteRead(b"", 10)
+            return original(sequence, options)
+
+        original = download.download_sequence
+        with unittest.mock.patch.object(
+            download, "download_sequence", download_sequence
+        ):
+            exit_code = download.download_sequences(
+                sequences, download.DownloadOptions(jobs=2)
+            )
+        self.assertEqual(exit_code, 1)
+        self.assertTrue(download.is_complete(sequences[0].downloads[0]))
+
+    def test_unknown_subsets(self):
+        """Validate that unknown subsets are reported and skipped."""
+        options = download.DownloadOptions(jobs=1)
+        for module in (vta.dataset.otb, vta.dataset.vot):
+            exit_code = module.download_sequences(
+                ["2012"], self.directory.name, None, options
+            )
+            self.assertEqual(exit_code, 1)
+        self.assertEqual(os.listdir(self.directory.name), [])
+
+    def test_vot_description(self):
+        """Validate downloading the sequences listed in a VOT description."""
+        os.makedirs(os.path.join(self.served.name, "vot2017", "main"), exist_ok=True)
+        self._serve(
+            "vot2017/main/ants1.zip", _make_archive({"groundtruth.txt": b"1,2,3,4"})
+        )
+        self._serve("vot2017/main/color.zip", _make_archive({"00000001.jpg": b"image"}))
+        description = {
+            "sequences": [
+                {
+                    "name": "ants1",
+                    "annotations": {"url": "ants1.zip"},
+                    "channels": {"color": {"url": "color.zip"}},
+                }
+            ]
+        }
+        self._serve("vot2017/main/description.json", json.dumps(description).encode())
+        with unittest.mock.patch.object(vta.dataset.vot, "BASE_URL", self.url):
+            exit_code = vta.dataset.vot.download_sequences(
+                ["2017"],
+                self.directory.name,
+                ["ants1"],
+                download.DownloadOptions(jobs=2),
+            )
+        self.assertEqual(exit_code, 0)
+        sequence_directory = os.path.join(self.directory.name, "vot", "2017", "ants1")
+        self.assertEqual(
+            self._read(os.path.join(sequence_directory, "groundtruth.txt")), b"1,2,3,4"
+        )
+        self.assertEqual(
+            self._read(os.path.join(sequence_directory, "color", "00000001.jpg")),
+            b"image",
+        )
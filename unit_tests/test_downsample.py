@@ -0,0 +1,68 @@
+"""Unit tests for downsampling curves."""
+
+import unittest
+
+import numpy
+
+import vta.loss.downsample as downsample
+
+
+class PyramidTest(unittest.TestCase):
+    """Test cases for selecting points from a min/max pyramid."""
+
+    def setUp(self):
+        self.values = numpy.sin(numpy.arange(10007) / 100.0)
+        self.values[5000] = 10.0
+        self.values[7000] = numpy.nan
+
+    def test_extremes(self):
+        """Validate that spikes survive, and NaN values are ignored."""
+        x_data, y_data = downsample.Pyramid(self.values).select(0, 10007, 100)
+        self.assertLessEqual(len(x_data), 2 * 100 + 1 + 128)
+        self.assertEqual(numpy.nanmax(y_data), 10.0)
+        self.assertAlmostEqual(numpy.nanmin(y_data), -1.0, places=3)
+        self.assertFalse(numpy.isnan(y_data).any())
+        self.assertEqual(x_data[0], 0)
+        self.assertEqual(x_data[-1], 10006)
+        self.assertTrue(numpy.all(numpy.diff(x_data) >= 0))
+
+    def test_zoom(self):
+        """Validate that a narrow range returns every point in the range."""
+        x_data, y_data = downsample.Pyramid(self.values).select(1000.5, 1100, 500)
+        numpy.testing.assert_array_equal(x_data, numpy.arange(999, 1102))
+        numpy.testing.assert_array_equal(y_data, self.values[999:1102])
+        x_data, _ = downsample.Pyramid(self.values).select(20000, 30000, 500)
+        self.assertEqual(len(x_data), 0)
+
+    def test_extend(self):
+        """Validate that extending a pyramid matches building it again."""
+        pyramid = downsample.Pyramid(self.values[:10])
+        for size in (17, 1000, 1001, 10007):
+            pyramid.extend(self.values[:size])
+            built = downsample.Pyramid(self.values[:size])
+            for start, stop, buckets in ((0, size, 100), (5, size / 2, 7)):
+                for extended, expected in zip(
+                    pyramid.select(start, stop, buckets),
+                    built.select(start, stop, buckets),
+                ):
+                    numpy.testing.assert_array_equal(extended, expected)
+
+
+class DownsamplerTest(unittest.TestCase):
+    """Test cases for choosing a downsampling algorithm."""
+
+    def test_algorithms(self):
+        """Validate the stride and none algorithms, and unknown names."""
+        values = numpy.arange(1000.0)
+        x_data, y_data = downsample.Downsampler(values, "stride").select(0, 999, 10)
+        self.assertLessEqual(len(x_data), 10)
+        self.assertEqual(x_data[-1], 999)
+        numpy.testing.assert_array_equal(x_data, y_data)
+        x_data, _ = downsample.Downsampler(values, "none").select(0, 10, 10)
+        self.assertEqual(len(x_data), 1000)
+        with self.assertRaises(ValueError):
+            downsample.Downsampler(values, "lttb")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+"""Unit tests for the vta evaluate command."""
+
+import contextlib
+import io
+import json
+import os
+import os.path
+import tempfile
+import unittest
+
+import vta.evaluate.evaluate as evaluate
+import vta.vta
+
+
+class EvaluateCommandTest(unittest.TestCase):
+    """Test cases for running the evaluate command."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.dataset = os.path.join(self.directory.name, "dataset")
+        self.tracker = os.path.join(self.directory.name, "tracker")
+        os.makedirs(self.tracker)
+        for sequence in ("a", "b"):
+            os.makedirs(os.path.join(self.dataset, sequence))
+            self._write(
+                os.path.join(self.dataset, sequence, "groundtruth.txt"),
+                "0,0,10,10\n" * 4,
+            )
+            self._write(
+                os.path.join(self.tracker, f"{sequence}.txt"), "0,0,10,10\n" * 4
+            )
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    @staticmethod
+    def _write(file_path, text):
+        with open(file_path, "w") as written_file:
+            written_file.write(text)
+
+    def _run(self, *options):
+        """Run the command, and return its exit code and what it printed."""
+        arguments = vta.vta.make_parser(["evaluate"]).parse_args(
+            ["evaluate", *options, self.dataset, self.tracker]
+        )
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            exit_code = evaluate.main(arguments)
+        return exit_code, output.getvalue()
+
+    def _summary(self, *options):
+        """Run the command, and return the summary it wrote."""
+        summary_path = os.path.join(self.directory.name, "summary.json")
+        exit_code, _ = self._run("--output", summary_path, *options)
+        self.assertEqual(exit_code, 0)
+        with open(summary_path) as summary_file:
+            return json.load(summary_file)["trackers"]["tracker"]
+
+    def test_output(self):
+        """Validate the printed and written summaries of a perfect tracker."""
+        exit_code, output = self._run("--jobs", "1")
+        self.assertEqual(exit_code, 0)
+        self.assertIn("tracker", output.splitlines()[1])
+        summary = self._summary("--jobs", "1")
+        self.assertEqual(summary["sequences"], 2)
+        self.assertEqual(summary["precision_score"], 1.0)
+        self.assertEqual(summary["success"][:-1], [1.0] * 20)
+
+    def test_jobs(self):
+        """Validate that several processes give the same summary as one."""
+        self._write(os.path.join(self.tracker, "b.txt"), "0,0,10,10\n5,5,10,10\n")
+        self.assertEqual(
+            self._summary("--jobs", "2", "--no-cache"),
+            self._summary("--jobs", "1", "--no-cache"),
+        )
+
+    def test_store(self):
+        """Validate that stored metrics are reused until a result changes."""
+        store = os.path.join(self.directory.name, "store")
+        first = self._summary("--store", store)
+        self.assertTrue(os.path.isfile(os.path.join(store, "metrics.json")))
+        self.assertEqual(self._summary("--store", store), first)
+        self._write(os.path.join(self.tracker, "b.txt"), "20,20,10,10\n" * 4)
+        self.assertEqual(
+            self._summary("--store", store)["precision_score"],
+            self._summary("--no-cache")["precision_score"],
+        )
+        self.assertLess(self._summary("--store", store)["auc"], first["auc"])
+
+    def test_errors(self):
+        """Validate that missing data sets and malformed results are reported."""
+        self._write(os.path.join(self.tracker, "a.txt"), "0,0,ten,10\n")
+        for jobs in ("1", "2"):
+            exit_code, output = self._run("--jobs", jobs, "--no-cache")
+            self.assertEqual(exit_code, 1)
+            self.assertTrue(output.startswith("error:"))
+        self.dataset = os.path.join(self.directory.name, "missing")
+        exit_code, output = self._run()
+        self.assertEqual(exit_code, 1)
+        self.assertTrue(output.startswith("error:"))
+
+
+if __name__ == "__main__":
+    unittest.main()
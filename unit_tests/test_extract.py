@@ -0,0 +1,152 @@
+"""Unit tests for extracting zip archives as they are read."""
+
+import io
+import os.path
+import struct
+import tempfile
+import unittest
+import zipfile
+import zlib
+
+import vta.dataset.extract as extract
+
+
+class _Unseekable(io.RawIOBase):
+    """A write-only stream that cannot seek, like a network socket."""
+
+    def __init__(self):
+        super().__init__()
+        self.data = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.data.extend(data)
+        return len(data)
+
+
+class _Chunked:
+    """Returns at most a few bytes from each read, like a slow network."""
+
+    def __init__(self, data, size=7):
+        self.__stream = io.BytesIO(data)
+        self.__size = size
+
+    def read(self, size=-1):
+        """Read at most the chunk size, and at most ``size`` bytes."""
+        limit = self.__size if size < 0 else min(size, self.__size)
+        return self.__stream.read(limit)
+
+
+def _make_archive(members, compression=zipfile.ZIP_DEFLATED, seekable=True):
+    stream = io.BytesIO() if seekable else _Unseekable()
+    with zipfile.ZipFile(stream, "w", compression) as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return bytes(stream.getvalue() if seekable else stream.data)
+
+
+class ExtractTest(unittest.TestCase):
+    """Test cases for extracting archives from streams and files."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.members = {
+            "Basketball/groundtruth_rect.txt": b"1,2,3,4\n" * 500,
+            "Basketball/img/0001.jpg": bytes(range(256)) * 40,
+        }
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _read(self, *names):
+        with open(os.path.join(self.directory.name, *names), "rb") as read_file:
+            return read_file.read()
+
+    def _assert_extracted(self, extracted, strip_components=0):
+        self.assertEqual(len(extracted), len(self.members))
+        for name, data in self.members.items():
+            self.assertEqual(self._read(*name.split("/")[strip_components:]), data)
+
+    def test_stored(self):
+        """Validate extracting stored members."""
+        archive = _make_archive(self.members, zipfile.ZIP_STORED)
+        extraction = extract.Extraction(self.directory.name)
+        self._assert_extracted(extract.stream_extract(_Chunked(archive), extraction))
+
+    def test_data_descriptors(self):
+        """Validate extracting deflated members whose sizes follow the data."""
+        archive = _make_archive(self.members, seekable=False)
+        extraction = extract.Extraction(self.directory.name, strip_components=1)
+        extracted = extract.stream_extract(_Chunked(archive, 1000), extraction)
+        self._assert_extracted(extracted, strip_components=1)
+
+    def test_unstreamable(self):
+        """Validate that stored members with data descriptors are reported."""
+        archive = _make_archive(self.members, zipfile.ZIP_STORED, seekable=False)
+        extraction = extract.Extraction(self.directory.name)
+        with self.assertRaises(extract.UnstreamableError):
+            extract.stream_extract(io.BytesIO(archive), extraction)
+        file_path = os.path.join(self.directory.name, "sequence.zip")
+        with open(file_path, "wb") as archive_file:
+            archive_file.write(archive)
+        self._assert_extracted(extract.extract_archive(file_path, extraction))
+
+    def test_zip64_compressed_size(self):
+        """Validate a ZIP64 field that only holds the compressed size."""
+        data = b"groundtruth"
+        header = struct.pack(
+            "<4sHHHHHIIIHH",
+            b"PK\x03\x04",
+            45,
+            0,
+            zipfile.ZIP_STORED,
+            0,
+            0,
+            zlib.crc32(data),
+            0xFFFFFFFF,
+            len(data),
+            len(b"a.txt"),
+            12,
+        )
+        archive = header + b"a.txt" + struct.pack("<HHQ", 1, 8, len(data)) + data
+        extraction = extract.Extraction(self.directory.name)
+        extracted = extract.stream_extract(
+            io.BytesIO(archive + b"PK\x05\x06" + bytes(18)), extraction
+        )
+        self.assertEqual(len(extracted), 1)
+        self.assertEqual(self._read("a.txt"), data)
+
+    def test_archive_file(self):
+        """Validate extracting an archive that was saved to disk."""
+        file_path = os.path.join(self.directory.name, "sequence.zip")
+        with open(file_path, "wb") as archive_file:
+            archive_file.write(_make_archive(self.members))
+        extraction = extract.Extraction(self.directory.name, strip_components=1)
+        extracted = extract.extract_archive(file_path, extraction)
+        self._assert_extracted(extracted, strip_components=1)
+
+    def test_corrupt(self):
+        """Validate that corrupt data and non-archives are rejected."""
+        archive = bytearray(_make_archive(self.members, zipfile.ZIP_STORED))
+        archive[100] ^= 0xFF
+        extraction = extract.Extraction(self.directory.name)
+        with self.assertRaises(ValueError):
+            extract.stream_extract(io.BytesIO(bytes(archive)), extraction)
+        with self.assertRaises(ValueError):
+            extract.stream_extract(io.BytesIO(b"not an archive"), extraction)
+
+    def test_outside_directory(self):
+        """Validate that members cannot be extracted outside the directory."""
+        archive = _make_archive({"../escaped.txt": b"data"})
+        extraction = extract.Extraction(os.path.join(self.directory.name, "a"))
+        with self.assertRaises(ValueError):
+            extract.stream_extract(io.BytesIO(archive), extraction)
+        self.assertFalse(
+            os.path.exists(os.path.join(self.directory.name, "escaped.txt"))
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+"""Unit tests for the vta loss command."""
+
+import os
+import os.path
+import tempfile
+import unittest
+
+import numpy
+
+import vta.loss.data
+import vta.loss.loss
+import vta.loss.loss_file
+import vta.vta
+
+
+class LossCommandTest(unittest.TestCase):
+    """Test cases for saving loss graphs without a GUI."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.file_paths = []
+        for group, name in (("a", "run1"), ("a", "run2"), ("b", "run3")):
+            os.makedirs(os.path.join(self.directory.name, group), exist_ok=True)
+            file_path = os.path.join(self.directory.name, group, f"{name}.vtaloss")
+            values = numpy.linspace(1.0, 0.1, 1000)
+            vta.loss.loss_file.write_binary_loss_file(
+                file_path, vta.loss.data.Loss(name, values, 1.0 - values)
+            )
+            self.file_paths.append(file_path)
+        self.configuration = {
+            "loss": {
+                "line_loss": True,
+                "line_precision": True,
+                "scatter_loss": False,
+                "scatter_precision": False,
+                "sort_algorithm": "last",
+                "maximum_graphs": 10,
+                "reject_invalid_data": True,
+            }
+        }
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _run(self, *options):
+        output = os.path.join(self.directory.name, "output")
+        arguments = vta.vta.make_parser().parse_args(
+            ["loss", "--output", output, *options, *self.file_paths]
+        )
+        self.assertEqual(vta.loss.loss.main(arguments, self.configuration), 0)
+        return sorted(os.listdir(output))
+
+    def test_output(self):
+        """Validate saving one graph for all files."""
+        self.assertEqual(self._run("--jobs", "1"), ["loss.png"])
+
+    def test_groups(self):
+        """Validate saving one graph per directory, concurrently."""
+        options = ("--group", "directory", "--format", "svg", "--jobs", "2")
+        self.assertEqual(self._run(*options), ["a.svg", "b.svg"])
+
+    def test_follow_output(self):
+        """Validate that graphs that are saved cannot be followed."""
+        arguments = vta.vta.make_parser().parse_args(
+            ["loss", "--output", self.directory.name, "--follow", *self.file_paths]
+        )
+        self.assertEqual(vta.loss.loss.main(arguments, self.configuration), 1)
+
+    def test_smoothing(self):
+        """Validate that invalid EMA smoothing is rejected."""
+        self.configuration["loss"]["sort_smoothing"] = 0
+        with self.assertRaises(ValueError):
+            self._run("--jobs", "1")
+
+    def test_store(self):
+        """Validate that parsed JSON files are stored and read back."""
+        file_path = os.path.join(self.directory.name, "run4.json")
+        with open(file_path, "w") as json_file:
+            json_file.write(
+                '{"label": "run4", "loss": [3, 2, 1], "precision": [0, 1, 2]}'
+            )
+        store = os.path.join(self.directory.name, "store")
+        read = vta.loss.loss._read_loss_data  # pylint: disable=protected-access
+        for _ in range(2):
+            (loss,) = read([file_path], store_directory=store)
+            self.assertEqual(loss.label, "run4")
+            numpy.testing.assert_array_equal(loss.loss_values, [3, 2, 1])
+            numpy.testing.assert_array_equal(loss.precision_values, [0, 1, 2])
+        self.file_paths.append(file_path)
+        self.assertEqual(self._run("--store", store), ["loss.png"])
+
+    def test_trends(self):
+        """Validate saving graphs with trends drawn over the curves."""
+        for method in ("linear", "moving_average", "ema"):
+            self.configuration["loss"]["trend"] = method
+            self.assertEqual(self._run("--jobs", "1"), ["loss.png"])
+
+
+if __name__ == "__main__":
+    unittest.main()
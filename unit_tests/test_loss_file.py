@@ -0,0 +1,146 @@
+"""Unit tests for reading loss data files."""
+
+import json
+import os.path
+import tempfile
+import unittest
+
+import numpy
+
+import vta.loss.data
+import vta.loss.loss_file as loss_file
+
+
+class LossFileTest(unittest.TestCase):
+    """Test cases for reading loss files."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _write(self, name, text):
+        file_path = os.path.join(self.directory.name, name)
+        with open(file_path, "w") as written_file:
+            written_file.write(text)
+        return file_path
+
+    def test_fast_path(self):
+        """Validate decoding arrays, special values, and escaped labels."""
+        data = {
+            "label": 'run "a" \\ é',
+            "loss": [3.5, 2, float("nan"), float("inf"), -1e-3],
+            "precision": [],
+        }
+        loss = loss_file.read_loss_file(self._write("a.json", json.dumps(data)))
+        self.assertEqual(loss.label, data["label"])
+        numpy.testing.assert_array_equal(loss.loss_values, data["loss"])
+        self.assertEqual(loss.loss_values.dtype, numpy.float64)
+        self.assertEqual(loss.precision_values.shape, (0,))
+
+    def test_fallback(self):
+        """Validate files that must be read with the json module."""
+        file_path = self._write(
+            "b.json", '{"loss": [[1, 2]], "precision": [0.5], "label": 7}'
+        )
+        loss = loss_file.read_loss_file(file_path)
+        self.assertEqual(loss.label, 7)
+        numpy.testing.assert_array_equal(loss.loss_values, [[1, 2]])
+        file_path = self._write("c.json", '{"loss": [1, 2,], "precision": [1]}')
+        with self.assertRaises(ValueError):
+            loss_file.read_loss_file(file_path)
+        with self.assertRaises(KeyError):
+            loss_file.read_loss_file(self._write("d.json", '{"loss": [1]}'))
+
+    def test_null(self):
+        """Validate that arrays with null or booleans are read and followed."""
+        file_path = self._write("e.json", '{"loss": [1, null], "precision": [true]}')
+        loss = loss_file.read_loss_file(file_path)
+        numpy.testing.assert_array_equal(loss.loss_values, [1, numpy.nan])
+        numpy.testing.assert_array_equal(loss.precision_values, [1])
+        follower = loss_file.LossFollower(file_path, loss)
+        self._write("e.json", '{"loss": [1, null, null, 2], "precision": [1, 0]}')
+        self.assertTrue(follower.poll())
+        numpy.testing.assert_array_equal(loss.loss_values, [1, numpy.nan, numpy.nan, 2])
+        numpy.testing.assert_array_equal(loss.precision_values, [1, 0])
+
+    def test_order(self):
+        """Validate that concurrently read files keep their order."""
+        file_paths = [
+            self._write(f"{i}.json", json.dumps({"loss": [i], "precision": [i]}))
+            for i in range(6)
+        ]
+        losses = loss_file.read_loss_files(reversed(file_paths), jobs=2)
+        self.assertEqual([l.label for l in losses], file_paths[::-1])
+        self.assertEqual([l.loss_values[0] for l in losses], list(range(5, -1, -1)))
+
+    def test_binary(self):
+        """Validate converting a JSON file, then mapping the binary file."""
+        data = {"loss": [3.5, 2.0, float("nan")], "precision": [0.25, 0.5, 0.75]}
+        binary_path = loss_file.convert_loss_file(
+            self._write("e.json", json.dumps(data)), self.directory.name
+        )
+        self.assertEqual(binary_path, os.path.join(self.directory.name, "e.vtaloss"))
+        self.assertTrue(loss_file.is_binary_loss_file(binary_path))
+        loss = loss_file.read_loss_files([binary_path])[0]
+        self.assertEqual(loss.label, binary_path)
+        self.assertIsInstance(loss.loss_values, numpy.memmap)
+        numpy.testing.assert_array_equal(loss.loss_values, data["loss"])
+        numpy.testing.assert_array_equal(loss.precision_values, data["precision"])
+
+    def test_binary_label_and_partial_record(self):
+        """Validate labels, and that a partially written record is ignored."""
+        file_path = os.path.join(self.directory.name, "f.vtaloss")
+        loss = vta.loss.data.Loss("ünïcode", numpy.arange(4.0), numpy.ones(4))
+        loss_file.write_binary_loss_file(file_path, loss)
+        with open(file_path, "ab") as appended_file:
+            appended_file.write(b"\0\0")
+        read = loss_file.read_loss_file(file_path)
+        self.assertEqual(read.label, "ünïcode")
+        numpy.testing.assert_array_equal(read.loss_values, numpy.arange(4.0))
+        loss.precision_values = numpy.ones(3)
+        with self.assertRaises(ValueError):
+            loss_file.write_binary_loss_file(file_path, loss)
+
+    def test_follow(self):
+        """Validate following records as they are appended."""
+        file_path = os.path.join(self.directory.name, "g.vtaloss")
+        loss_file.append_loss_records(
+            file_path, vta.loss.data.Loss("run", numpy.arange(3.0), numpy.zeros(3))
+        )
+        loss = loss_file.read_loss_file(file_path)
+        follower = loss_file.LossFollower(file_path, loss)
+        self.assertFalse(follower.poll())
+        with open(file_path, "ab") as appended_file:
+            appended_file.write(b"\0\0")  # An interrupted append.
+        loss_file.append_loss_records(
+            file_path, vta.loss.data.Loss("", numpy.array([3.0, 4.0]), numpy.ones(2))
+        )
+        self.assertTrue(follower.poll())
+        self.assertIs(follower.loss, loss)
+        numpy.testing.assert_array_equal(loss.loss_values, numpy.arange(5.0))
+        numpy.testing.assert_array_equal(loss.precision_values, [0, 0, 0, 1, 1])
+        self.assertEqual(loss.label, "run")
+        self.assertEqual(follower.unchanged, 3)
+
+    def test_follow_json(self):
+        """Validate that only the values appended to a JSON file are decoded."""
+        file_path = self._write("h.json", '{"loss": [1, 2], "precision": [3, 4]}')
+        loss = loss_file.read_loss_file(file_path)
+        follower = loss_file.LossFollower(file_path, loss)
+        for text, unchanged in (
+            ('{"loss": [1, 2, 5], "precision": [3, 4, 6]}', 0),
+            ('{"loss": [1, 2, 5, 7], "precision": [3, 4, 6, 8]}', 2),
+            ('{"loss": [9, 2, 5, 7, 1], "precision": [3, 4, 6, 8, 1]}', 0),
+        ):
+            self._write("h.json", text)
+            self.assertTrue(follower.poll())
+            self.assertEqual(follower.unchanged, unchanged)
+            data = json.loads(text)
+            numpy.testing.assert_array_equal(loss.loss_values, data["loss"])
+            numpy.testing.assert_array_equal(loss.precision_values, data["precision"])
+
+
+if __name__ == "__main__":
+    unittest.main()
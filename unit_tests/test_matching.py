@@ -0,0 +1,51 @@
+"""Unit tests for box matching functionality."""
+
+import unittest
+
+import numpy
+
+from vta.iou import matching
+
+
+class MatchingTest(unittest.TestCase):
+    """Test cases for box matching functionality."""
+
+    def test_overlapping_pairs(self):
+        """Validate that only overlapping boxes of the same frame are paired."""
+        a = numpy.array([[0, 0, 10, 10], [20, 0, 10, 10], [0, 0, 10, 10]])
+        b = numpy.array(
+            [[5, 5, 10, 10], [10, 0, 10, 10], [0, 0, 10, 10], [numpy.nan] * 4]
+        )
+        rows, columns = matching.find_overlapping_pairs(a, b, [0, 0, 1], [0, 0, 1, 1])
+        self.assertEqual(sorted(zip(rows, columns)), [(0, 0), (2, 2)])
+
+    def test_assignment(self):
+        """Validate that the total IoU of the matches is maximized."""
+        predicted = numpy.array([[0, 0, 10, 10], [2, 0, 10, 10], [50, 50, 5, 5]])
+        ground_truth = numpy.array([[1, 0, 10, 10], [3, 0, 10, 10]])
+        matches = matching.match_boxes(predicted, ground_truth, threshold=0.1)
+        numpy.testing.assert_array_equal(matches.predicted, [0, 1])
+        numpy.testing.assert_array_equal(matches.ground_truth, [0, 1])
+        numpy.testing.assert_allclose(matches.iou, [9 / 11, 9 / 11])
+
+    def test_threshold(self):
+        """Validate that pairs below the threshold are not matched."""
+        matches = matching.match_boxes([[0, 0, 10, 10]], [[5, 0, 10, 10]], 0.5)
+        self.assertEqual(len(matches), 0)
+        matches = matching.match_boxes([[0, 0, 10, 10]], [[5, 0, 10, 10]], 0.3)
+        self.assertEqual(len(matches), 1)
+
+    def test_sequence(self):
+        """Validate that boxes are only matched within their frame."""
+        boxes = numpy.array([[0, 0, 10, 10], [0, 0, 10, 10], [1, 0, 10, 10]])
+        matches = matching.match_sequence(boxes, [3, 4, 4], boxes, [4, 3, 4])
+        numpy.testing.assert_array_equal(matches.predicted, [0, 1, 2])
+        numpy.testing.assert_array_equal(matches.ground_truth, [1, 0, 2])
+        numpy.testing.assert_array_equal(matches.frames, [3, 4, 4])
+        numpy.testing.assert_array_equal(matches.iou, [1, 1, 1])
+
+    def test_empty(self):
+        """Validate matching with no boxes."""
+        self.assertEqual(len(matching.match_boxes([], [[0, 0, 10, 10]])), 0)
+        with self.assertRaises(ValueError):
+            matching.match_sequence([[0, 0, 1, 1]], [0, 1], [[0, 0, 1, 1]], [0])
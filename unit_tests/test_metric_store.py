@@ -0,0 +1,113 @@
+"""Unit tests for the persistent metric store."""
+
+import gc
+import os
+import os.path
+import tempfile
+import unittest
+import warnings
+
+import numpy
+
+from vta.utilities.metric_store import MetricStore
+
+
+class MetricStoreTest(unittest.TestCase):
+    """Test cases for MetricStore functionality."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.input_path = os.path.join(self.directory.name, "input.txt")
+        self._write("1,2,3,4\n", 1000)
+        self.calls = 0
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _write(self, text, modified):
+        with open(self.input_path, "w") as input_file:
+            input_file.write(text)
+        os.utime(self.input_path, ns=(modified, modified))
+
+    def _compute(self, store, parameters=None):
+        def function():
+            self.calls += 1
+            return {"value": self.calls}
+
+        return store.compute(
+            ("test", "a"), [self.input_path], parameters or {}, function
+        )
+
+    def test_reuse(self):
+        """Validate that saved metrics are reused by a new store."""
+        store = MetricStore(self.directory.name)
+        self._compute(store)
+        store.save()
+        self.assertTrue(os.path.isfile(store.file_path))
+        self.assertEqual(self._compute(MetricStore(self.directory.name)), {"value": 1})
+        self.assertEqual(self.calls, 1)
+
+    def test_changed_input(self):
+        """Validate that a metric is recalculated when its input changes."""
+        store = MetricStore(self.directory.name)
+        self._compute(store)
+        self._write("1,2,3,5\n", 2000)
+        self.assertEqual(self._compute(store), {"value": 2})
+
+    def test_touched_input(self):
+        """Validate that a new modification time alone does not invalidate."""
+        store = MetricStore(self.directory.name)
+        self._compute(store)
+        self._write("1,2,3,4\n", 2000)
+        self.assertEqual(self._compute(store), {"value": 1})
+
+    def test_changed_parameters(self):
+        """Validate that a metric is recalculated when its parameters change."""
+        store = MetricStore(self.directory.name)
+        self._compute(store, {"threshold": 1})
+        self.assertEqual(self._compute(store, {"threshold": 2}), {"value": 2})
+        self.assertIsNone(store.get(("test", "a"), [self.input_path], {"threshold": 1}))
+
+    def _reopen(self):
+        store = MetricStore(self.directory.name)
+        self._compute(store)
+        store.save()
+        return MetricStore(self.directory.name)
+
+    def test_arrays(self):
+        """Validate that arrays are stored, and other objects are rejected."""
+        store = MetricStore(self.directory.name)
+        values = {"curve": numpy.linspace(0.0, 1.0, 5), "label": "run"}
+        store.put(("test", "b"), [self.input_path], {}, values)
+        store.save()
+        stored = MetricStore(self.directory.name).get(
+            ("test", "b"), [self.input_path], {}
+        )
+        numpy.testing.assert_array_equal(stored["curve"], values["curve"])
+        self.assertEqual(str(stored["label"]), "run")
+        with self.assertRaises(ValueError):
+            store.put(("test", "c"), [self.input_path], {}, {"value": object()})
+
+    def test_damaged_index(self):
+        """Validate that an index that cannot be read is an empty store."""
+        for text in (b"\x80\x04not json", b"[]", b'{"entries": [{"key": 1}]}'):
+            self._reopen()
+            with open(os.path.join(self.directory.name, "metrics.json"), "wb") as f:
+                f.write(text)
+            self.assertEqual(
+                self._compute(MetricStore(self.directory.name)), {"value": 2}
+            )
+            self.calls = 0
+
+    def test_damaged_values(self):
+        """Validate that arrays that cannot be read are recalculated."""
+        store = self._reopen()
+        values_directory = os.path.join(self.directory.name, "values")
+        for name in os.listdir(values_directory):
+            with open(os.path.join(values_directory, name), "wb") as values_file:
+                values_file.write(b"PK\x03\x04")
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always", ResourceWarning)
+            self.assertEqual(self._compute(store), {"value": 2})
+            gc.collect()
+        self.assertFalse([w for w in caught if w.category is ResourceWarning])
@@ -0,0 +1,60 @@
+"""Unit tests for one pass evaluation."""
+
+import unittest
+
+import numpy
+
+import vta.evaluate.ope as ope
+
+
+class OpeTest(unittest.TestCase):
+    """Test cases for one pass evaluation functionality."""
+
+    def test_success_curve(self):
+        """Validate the success curve against a loop over thresholds."""
+        overlaps = numpy.random.default_rng(3).uniform(0, 1, 500)
+        overlaps[:10] = ope.SUCCESS_THRESHOLDS[:10]
+        expected = [numpy.mean(overlaps > t) for t in ope.SUCCESS_THRESHOLDS]
+        numpy.testing.assert_allclose(ope.calculate_success_curve(overlaps), expected)
+
+    def test_precision_curve(self):
+        """Validate the precision curve against a loop over thresholds."""
+        errors = numpy.random.default_rng(4).uniform(0, 60, 500)
+        errors[:5] = numpy.inf
+        errors[5:10] = 20
+        expected = [numpy.mean(errors <= t) for t in ope.PRECISION_THRESHOLDS]
+        numpy.testing.assert_allclose(ope.calculate_precision_curve(errors), expected)
+
+    def test_empty_curves(self):
+        """Validate that curves of no frames are 0."""
+        self.assertFalse(numpy.any(ope.calculate_success_curve([])))
+        self.assertFalse(numpy.any(ope.calculate_precision_curve([])))
+
+    def test_evaluate_sequence(self):
+        """Validate evaluation of a sequence with missing and invalid frames."""
+        ground_truth = numpy.array(
+            [[0, 0, 10, 10], [0, 0, 10, 10], [numpy.nan] * 4, [0, 0, 10, 10]]
+        )
+        results = numpy.array([[0, 0, 10, 10], [5, 0, 10, 10], [0, 0, 1, 1]])
+        frames, success, precision = ope.evaluate_sequence(ground_truth, results)
+        self.assertEqual(frames, 3)
+        self.assertAlmostEqual(success[0], 2 / 3)
+        self.assertAlmostEqual(success[-1], 0)
+        self.assertAlmostEqual(precision[0], 1 / 3)
+        self.assertAlmostEqual(precision[5], 2 / 3)
+
+    def test_summarize(self):
+        """Validate averaging sequence evaluations per tracker."""
+        curve = numpy.ones(len(ope.SUCCESS_THRESHOLDS))
+        precision = numpy.ones(len(ope.PRECISION_THRESHOLDS))
+        summary = ope.summarize(
+            [
+                ope.SequenceEvaluation("a", "s1", 10, curve, precision),
+                ope.SequenceEvaluation("a", "s2", 10, curve * 0, precision * 0),
+                ope.SequenceEvaluation("b", "s1", 10, curve, precision),
+            ]
+        )
+        self.assertAlmostEqual(summary["a"]["auc"], 0.5)
+        self.assertAlmostEqual(summary["a"]["precision_score"], 0.5)
+        self.assertEqual(summary["a"]["sequences"], 2)
+        self.assertAlmostEqual(summary["b"]["auc"], 1.0)
@@ -0,0 +1,91 @@
+"""Unit tests for polygon overlap functionality."""
+
+import unittest
+import unittest.mock
+
+import numpy
+
+from vta.iou import polygon
+
+
+def _rotated_rectangle(center, size, angle):
+    corners = numpy.array([[-1, -1], [1, -1], [1, 1], [-1, 1]]) * size / 2
+    rotation = numpy.array(
+        [[numpy.cos(angle), -numpy.sin(angle)], [numpy.sin(angle), numpy.cos(angle)]]
+    )
+    return (corners @ rotation.T + center).ravel()
+
+
+class PolygonTest(unittest.TestCase):
+    """Test cases for polygon overlap functionality."""
+
+    def setUp(self):
+        self.a = numpy.array(
+            [
+                _rotated_rectangle([0, 0], [2, 2], numpy.pi / 4),
+                _rotated_rectangle([0, 0], [2, 2], numpy.pi / 4),
+                [numpy.nan] * 8,
+            ]
+        )
+        self.b = numpy.array(
+            [
+                _rotated_rectangle([0, 0], [2, 2], numpy.pi / 4),
+                _rotated_rectangle([0, 0], [2, 2], 0),
+                _rotated_rectangle([0, 0], [2, 2], 0),
+            ]
+        )
+
+    def test_conversion(self):
+        """Validate conversion between rectangles and polygons."""
+        polygons = polygon.rectangle_to_polygon([[1, 2, 3, 4]])
+        numpy.testing.assert_array_equal(polygons, [[1, 2, 4, 2, 4, 6, 1, 6]])
+        numpy.testing.assert_array_equal(
+            polygon.polygon_to_rectangle(polygons), [[1, 2, 3, 4]]
+        )
+        numpy.testing.assert_allclose(polygon.calculate_polygon_area(self.b), 4)
+
+    def test_exact(self):
+        """Validate exact overlap of rotated rectangles."""
+        overlaps, methods = polygon.calculate_polygon_iou(self.a, self.b, "exact")
+        numpy.testing.assert_allclose(overlaps, [1, numpy.sqrt(0.5), 0])
+        numpy.testing.assert_array_equal(methods, polygon.METHODS.index("exact"))
+
+    def test_raster(self):
+        """Validate that the raster method approximates the exact method."""
+        overlaps, methods = polygon.calculate_polygon_iou(
+            self.a, self.b, "raster", resolution=200
+        )
+        numpy.testing.assert_allclose(overlaps, [1, numpy.sqrt(0.5), 0], atol=0.01)
+        numpy.testing.assert_array_equal(methods, polygon.METHODS.index("raster"))
+
+    def test_raster_bands(self):
+        """Validate that rasterizing in small bands gives the same overlaps."""
+        expected, _ = polygon.calculate_polygon_iou(self.a, self.b, "raster", 50)
+        with unittest.mock.patch.object(polygon, "_RASTER_POINTS", 70):
+            overlaps, _ = polygon.calculate_polygon_iou(self.a, self.b, "raster", 50)
+        numpy.testing.assert_array_equal(overlaps, expected)
+        with self.assertRaises(ValueError):
+            polygon.calculate_polygon_iou(self.a, self.b, "raster", 0)
+
+    def test_auto(self):
+        """Validate that axis aligned frames use the bounds method."""
+        rectangles = numpy.array([[5, 10, 5, 20], [0, 0, 2, 2], [0, 0, 2, 2]])
+        regions = numpy.concatenate((polygon.rectangle_to_polygon(rectangles), self.a))
+        others = numpy.concatenate(
+            (
+                polygon.rectangle_to_polygon(rectangles[[0, 0, 1]] + [2, -5, 10, 0]),
+                self.b,
+            )
+        )
+        overlaps, methods = polygon.calculate_polygon_iou(regions, others)
+        numpy.testing.assert_allclose(
+            overlaps[[0, 3, 4, 5]], [0.12676056338, 1, numpy.sqrt(0.5), 0]
+        )
+        numpy.testing.assert_array_equal(methods, [1, 1, 1, 0, 0, 0])
+
+    def test_bounds_of_rectangles(self):
+        """Validate that rectangles are accepted in place of polygons."""
+        overlaps, _ = polygon.calculate_polygon_iou(
+            [[5, 10, 5, 20]], [[7, 5, 15, 20]], "bounds"
+        )
+        numpy.testing.assert_allclose(overlaps, [0.12676056338])
@@ -0,0 +1,71 @@
+"""Unit tests for timing the phases of commands."""
+
+import json
+import os.path
+import pstats
+import tempfile
+import threading
+import tracemalloc
+import unittest
+
+import numpy
+
+import vta.utilities.profiling as profiling
+
+
+class ProfilingTest(unittest.TestCase):
+    """Test cases for recording phases."""
+
+    def tearDown(self):
+        with tempfile.TemporaryDirectory() as directory:
+            profiling.stop(directory)
+
+    def test_disabled(self):
+        """Validate that phases are not measured unless profiling started."""
+        with profiling.phase("read") as record:
+            self.assertIsNone(record)
+
+    def test_phases(self):
+        """Validate the timeline of nested phases, and of other threads."""
+        profiler = profiling.start()
+        with profiling.phase("command"):
+            with profiling.phase("read"):
+                data = numpy.ones(1 << 20)
+            del data
+            with profiling.phase("plot"):
+                thread = threading.Thread(target=self._work, name="worker")
+                thread.start()
+                thread.join()
+        phases = {record.name: record for record in profiler.phases}
+        self.assertEqual(
+            [record.name for record in profiler.phases],
+            ["command", "read", "plot", "download"],
+        )
+        self.assertEqual(phases["read"].depth, 1)
+        self.assertGreaterEqual(phases["read"].peak_memory, 8 << 20)
+        if hasattr(tracemalloc, "reset_peak"):
+            self.assertLess(phases["plot"].peak_memory, 8 << 20)
+        self.assertGreaterEqual(phases["command"].peak_memory, 8 << 20)
+        self.assertGreaterEqual(phases["command"].wall_time, phases["plot"].wall_time)
+        self.assertEqual(phases["download"].thread, "worker")
+        self.assertIsNone(phases["download"].peak_memory)
+
+    def test_write(self):
+        """Validate writing the timeline and the profile statistics."""
+        profiling.start()
+        with profiling.phase("read"):
+            sum(range(1000))
+        with tempfile.TemporaryDirectory() as directory:
+            profiling.stop(directory)
+            with open(os.path.join(directory, profiling.TIMELINE_FILE)) as timeline:
+                self.assertEqual(json.load(timeline)[0]["name"], "read")
+            pstats.Stats(os.path.join(directory, profiling.STATISTICS_FILE))
+
+    @staticmethod
+    def _work():
+        with profiling.phase("download"):
+            sum(range(1000))
+
+
+if __name__ == "__main__":
+    unittest.main()
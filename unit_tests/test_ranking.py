@@ -0,0 +1,85 @@
+"""Unit tests for ranking training runs."""
+
+import unittest
+
+import numpy
+
+import vta.loss.data
+import vta.loss.ranking as ranking
+
+
+def _loss(label, values):
+    values = numpy.array(values, dtype=numpy.float64)
+    return vta.loss.data.Loss(label, values, 1.0 - values)
+
+
+class RankingTest(unittest.TestCase):
+    """Test cases for scoring and ranking runs."""
+
+    def setUp(self):
+        self.losses = [
+            _loss("a", [5, 2, 1, 2]),
+            _loss("b", [4, 3, 2, 1]),
+            _loss("c", [9, 0, 9, 9]),
+            _loss("d", []),
+        ]
+        self.table = vta.loss.data.LossTable.from_losses(self.losses)
+
+    def _score(self, algorithm, **options):
+        options = ranking.RankingOptions(algorithm, **options)
+        return ranking.score(self.table, "loss", options)
+
+    def test_scores(self):
+        """Validate the score of each algorithm."""
+        numpy.testing.assert_array_equal(self._score("last"), [2, 1, 9, numpy.nan])
+        numpy.testing.assert_array_equal(
+            self._score("mean_last", window=2), [1.5, 1.5, 9, numpy.nan]
+        )
+        numpy.testing.assert_array_equal(self._score("minimum"), [1, 1, 0, numpy.nan])
+        numpy.testing.assert_array_equal(self._score("auc"), [6.5, 7.5, 18, numpy.nan])
+        weights = numpy.array([0.125, 0.25, 0.5, 1.0])
+        expected = numpy.dot(weights, [5, 2, 1, 2]) / weights.sum()
+        self.assertAlmostEqual(self._score("ema", smoothing=0.5)[0], expected)
+        with self.assertRaises(ValueError):
+            self._score("median")
+
+    def test_invalid_values(self):
+        """Validate that invalid values only affect the score of their run."""
+        self.table = vta.loss.data.LossTable.from_losses(
+            [
+                _loss("a", [5, 4, 3]),
+                _loss("b", [1, numpy.nan, 1]),
+                _loss("c", [numpy.inf, 2, 2]),
+                _loss("d", [1, 1, 1]),
+            ]
+        )
+        numpy.testing.assert_array_equal(
+            self._score("mean_last", window=3), [4, 1, 2, 1]
+        )
+        numpy.testing.assert_array_equal(self._score("auc"), [8, 1, 2, 2])
+
+    def test_rank(self):
+        """Validate top-k selection, direction, ties, and NaN scores."""
+        options = ranking.RankingOptions("minimum")
+        order = ranking.rank(self.table, "loss", options, 2)
+        numpy.testing.assert_array_equal(order, [2, 0])
+        order = ranking.rank(self.table, "loss", options)
+        numpy.testing.assert_array_equal(order, [2, 0, 1, 3])
+        order = ranking.rank(self.table, "precision", options, 3)
+        numpy.testing.assert_array_equal(order, [2, 0, 1])
+        vta.loss.data.sort_by_loss(self.losses, "last")
+        self.assertEqual([l.label for l in self.losses], ["b", "a", "c", "d"])
+
+    def test_smoothing(self):
+        """Validate that the EMA smoothing must be in (0, 1]."""
+        for smoothing in (0, -0.5, 1.5):
+            with self.assertRaises(ValueError):
+                ranking.RankingOptions("ema", smoothing=smoothing)
+        numpy.testing.assert_array_equal(
+            ranking.score(self.table, "loss", ranking.RankingOptions("ema", 3, 1)),
+            ranking.score(self.table, "loss", ranking.RankingOptions("last")),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
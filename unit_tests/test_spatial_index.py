@@ -0,0 +1,81 @@
+"""Unit tests for spatial index functionality."""
+
+import os.path
+import tempfile
+import unittest
+
+import numpy
+
+from vta.iou import spatial_index
+
+
+class SpatialIndexTest(unittest.TestCase):
+    """Test cases for spatial index functionality."""
+
+    def setUp(self):
+        # A 20 x 20 grid of 5 x 5 boxes, 10 pixels apart, and one invalid box.
+        corners = numpy.stack(
+            numpy.meshgrid(numpy.arange(20.0), numpy.arange(20.0)), axis=-1
+        ).reshape(-1, 2)
+        self.boxes = numpy.vstack(
+            (numpy.hstack((corners * 10, numpy.full_like(corners, 5))), [numpy.nan] * 4)
+        )
+        self.index = spatial_index.SpatialIndex(self.boxes, node_size=4)
+
+    def _expected(self, region):
+        right = numpy.minimum(
+            self.boxes[:, 0] + self.boxes[:, 2], region[0] + region[2]
+        )
+        bottom = numpy.minimum(
+            self.boxes[:, 1] + self.boxes[:, 3], region[1] + region[3]
+        )
+        return numpy.flatnonzero(
+            (right > numpy.maximum(self.boxes[:, 0], region[0]))
+            & (bottom > numpy.maximum(self.boxes[:, 1], region[1]))
+        )
+
+    def test_query(self):
+        """Validate that exactly the overlapping boxes are found."""
+        self.assertEqual(len(self.index), 400)
+        for region in ([12, 12, 20, 20], [0, 0, 200, 200], [6, 6, 3, 3]):
+            numpy.testing.assert_array_equal(
+                self.index.query(region), self._expected(region)
+            )
+        rows, boxes = self.index.query_many([[6, 6, 3, 3], [0, 0, 6, 6]])
+        numpy.testing.assert_array_equal(rows, [1])
+        numpy.testing.assert_array_equal(boxes, [0])
+
+    def test_query_iou(self):
+        """Validate that boxes are found by IoU."""
+        numpy.testing.assert_array_equal(
+            self.index.query_iou([11, 10, 5, 5], 0.5), [21]
+        )
+        self.assertEqual(len(self.index.query_iou([11, 10, 5, 5], 0.9)), 0)
+
+    def test_nearest(self):
+        """Validate that the nearest boxes are found in order."""
+        numpy.testing.assert_array_equal(self.index.nearest([2, 2]), [0])
+        numpy.testing.assert_array_equal(self.index.nearest([17, 2], 3), [1, 2, 21])
+        self.assertEqual(len(self.index.nearest([0, 0], 1000)), 400)
+        self.assertEqual(len(self.index.nearest([0, 0], 0)), 0)
+
+    def test_save(self):
+        """Validate that a loaded index answers like the saved index."""
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, "a" + spatial_index.INDEX_EXTENSION)
+            self.index.save(file_path)
+            loaded = spatial_index.SpatialIndex.load(file_path)
+        numpy.testing.assert_array_equal(loaded.boxes, self.boxes)
+        self.assertEqual(loaded.node_size, 4)
+        numpy.testing.assert_array_equal(
+            loaded.query([12, 12, 20, 20]), self.index.query([12, 12, 20, 20])
+        )
+        numpy.testing.assert_array_equal(loaded.nearest([17, 2], 3), [1, 2, 21])
+
+    def test_empty(self):
+        """Validate an index without valid boxes."""
+        index = spatial_index.SpatialIndex(numpy.full((2, 4), numpy.nan))
+        self.assertEqual(len(index.query([0, 0, 10, 10])), 0)
+        self.assertEqual(len(index.nearest([0, 0], 2)), 0)
+        with self.assertRaises(ValueError):
+            spatial_index.SpatialIndex(numpy.zeros((2, 3)))
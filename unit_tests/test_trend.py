@@ -0,0 +1,114 @@
+"""Unit tests for fitting trends to loss curves."""
+
+import unittest
+
+import numpy
+
+import vta.loss.data
+import vta.loss.trend as trend
+
+NAN = numpy.nan
+
+
+class TrendTest(unittest.TestCase):
+    """Test cases for fitting lines and smoothing curves."""
+
+    def setUp(self):
+        self.column = vta.loss.data.RaggedArray.from_arrays(
+            [
+                numpy.array([1.0, 3.0, 5.0, 7.0]),
+                numpy.array([2.0, NAN, 2.0]),
+                numpy.array([4.0]),
+                numpy.array([]),
+            ]
+        )
+
+    def _trends(self, method):
+        options = trend.TrendOptions(method, window=2, smoothing=0.5)
+        fitted = trend.trends(self.column, options)
+        numpy.testing.assert_array_equal(fitted.offsets, self.column.offsets)
+        return fitted.pad()
+
+    def test_pad(self):
+        """Validate padding ragged rows into a two dimensional array."""
+        padded = self.column.pad()
+        self.assertEqual(padded.shape, (4, 4))
+        numpy.testing.assert_array_equal(padded[1], [2, NAN, 2, NAN])
+
+    def test_fit_lines(self):
+        """Validate fitting lines, ignoring values that are not finite."""
+        slopes, intercepts = trend.fit_lines(self.column.pad())
+        numpy.testing.assert_allclose(slopes, [2, 0, 0, NAN])
+        numpy.testing.assert_allclose(intercepts, [1, 2, 4, NAN])
+        numpy.testing.assert_allclose(
+            self._trends("linear"),
+            [[1, 3, 5, 7], [2, 2, 2, NAN], [4, NAN, NAN, NAN], [NAN] * 4],
+        )
+
+    def test_moving_average(self):
+        """Validate the moving average of each row."""
+        numpy.testing.assert_allclose(
+            self._trends("moving_average"),
+            [[1, 2, 4, 6], [2, 2, 2, NAN], [4, NAN, NAN, NAN], [NAN] * 4],
+        )
+
+    def test_ema(self):
+        """Validate the bias corrected exponential moving average."""
+        fitted = self._trends("ema")
+        numpy.testing.assert_allclose(fitted[0, :2], [1, 3.5 / 1.5])
+        numpy.testing.assert_allclose(fitted[1], [2, 2, 2, NAN])
+        with self.assertRaises(ValueError):
+            self._trends("spline")
+
+    def test_smoothing(self):
+        """Validate that the EMA smoothing must be in (0, 1]."""
+        for smoothing in (0, -0.5, 1.5):
+            with self.assertRaises(ValueError):
+                trend.TrendOptions("ema", smoothing=smoothing)
+        fitted = trend.trends(self.column, trend.TrendOptions("ema", smoothing=1))
+        numpy.testing.assert_array_equal(fitted.values, self.column.values)
+
+    def test_batches(self):
+        """Validate fitting rows of very different lengths together."""
+        values = numpy.sin(numpy.arange(5000) / 10.0)
+        rows = [values[:3], values, values[:700], values[:2]]
+        column = vta.loss.data.RaggedArray.from_arrays(rows)
+        for method in trend.METHODS:
+            options = trend.TrendOptions(method, window=20, smoothing=0.1)
+            fitted = trend.trends(column, options)
+            for row, row_values in enumerate(rows):
+                numpy.testing.assert_allclose(
+                    fitted[row], self._fit(row_values, options), atol=1e-9
+                )
+
+    def test_follower(self):
+        """Validate that extending a trend matches fitting it again."""
+        values = numpy.sin(numpy.arange(500) / 10.0)
+        values[200] = NAN
+        changed = values.copy()
+        changed[100:] += 1.0
+        for method in trend.METHODS:
+            options = trend.TrendOptions(method, window=20, smoothing=0.1)
+            follower = trend.TrendFollower(
+                options, values[:10], self._fit(values[:10], options)
+            )
+            for curve, unchanged in (
+                (values[:11], 10),
+                (values[:300], 11),
+                (values, 300),
+                (changed, 100),
+            ):
+                numpy.testing.assert_allclose(
+                    follower.update(curve, unchanged),
+                    self._fit(curve, options),
+                    atol=1e-9,
+                )
+
+    @staticmethod
+    def _fit(values, options):
+        column = vta.loss.data.RaggedArray.from_arrays([values])
+        return trend.trends(column, options)[0]
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+"""Unit tests for finding and repairing invalid loss data."""
+
+import unittest
+
+import numpy
+
+import vta.loss.data
+import vta.loss.validation as validation
+
+NAN = numpy.nan
+INF = numpy.inf
+
+
+class ValidationTest(unittest.TestCase):
+    """Test cases for finding and repairing invalid values."""
+
+    def setUp(self):
+        losses = [
+            vta.loss.data.Loss("good", numpy.array([3.0, 2.0]), numpy.array([1.0])),
+            vta.loss.data.Loss(
+                "diverged", numpy.array([3.0, NAN, 2.0, INF]), numpy.array([1.0] * 4)
+            ),
+            vta.loss.data.Loss(
+                "early", numpy.array([NAN, 3.0]), numpy.array([1.0, -INF])
+            ),
+            vta.loss.data.Loss("broken", numpy.array([NAN]), numpy.array([NAN])),
+        ]
+        self.table = vta.loss.data.LossTable.from_losses(losses, list("abcd"))
+
+    def _repair(self, policy):
+        return validation.repair(self.table, policy)
+
+    def test_find_invalid_values(self):
+        """Validate that the position of every invalid value is found."""
+        loss, precision = validation.find_invalid_values(self.table)
+        self.assertEqual(loss.kind, "loss")
+        numpy.testing.assert_array_equal(loss.rows, [1, 1, 2, 3])
+        numpy.testing.assert_array_equal(loss.epochs, [1, 3, 0, 0])
+        numpy.testing.assert_array_equal(loss.epochs_of(1), [1, 3])
+        numpy.testing.assert_array_equal(loss.epochs_of(0), [])
+        numpy.testing.assert_array_equal(precision.rows, [2, 3])
+        numpy.testing.assert_array_equal(precision.epochs, [1, 0])
+
+    def test_reject(self):
+        """Validate that runs with invalid values are rejected."""
+        repaired = self._repair("reject")
+        self.assertEqual(repaired.labels, ["good"])
+        self.assertEqual(repaired.sources, ["a"])
+
+    def test_truncate(self):
+        """Validate that runs are truncated at their first invalid value."""
+        repaired = self._repair("truncate")
+        self.assertEqual(repaired.labels, ["good", "diverged"])
+        self.assertEqual(repaired.sources, ["a", "b"])
+        numpy.testing.assert_array_equal(repaired[1].loss_values, [3])
+        numpy.testing.assert_array_equal(repaired[1].precision_values, [1])
+        numpy.testing.assert_array_equal(repaired[0].loss_values, [3, 2])
+
+    def test_forward_fill(self):
+        """Validate that invalid values are replaced by earlier values."""
+        repaired = self._repair("forward_fill")
+        self.assertEqual(repaired.labels, ["good", "diverged", "early"])
+        numpy.testing.assert_array_equal(repaired[1].loss_values, [3, 3, 2, 2])
+        numpy.testing.assert_array_equal(repaired[2].loss_values, [NAN, 3])
+        numpy.testing.assert_array_equal(repaired[2].precision_values, [1, 1])
+
+    def test_mask(self):
+        """Validate that invalid values are replaced by NaN."""
+        repaired = self._repair("mask")
+        self.assertEqual(len(repaired), 3)
+        numpy.testing.assert_array_equal(repaired[1].loss_values, [3, NAN, 2, NAN])
+        numpy.testing.assert_array_equal(repaired[2].precision_values, [1, NAN])
+        numpy.testing.assert_array_equal(self.table[1].loss_values, [3, NAN, 2, INF])
+
+    def test_valid_table(self):
+        """Validate that a table without invalid values is not copied."""
+        table = self.table.select([0])
+        self.assertIs(validation.repair(table, "truncate"), table)
+        with self.assertRaises(ValueError):
+            validation.repair(table, "ignore")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+"""Unit tests for VOT accuracy, robustness, and EAO evaluation."""
+
+import unittest
+
+import numpy
+
+import vta.dataset.vot_evaluation as vot_evaluation
+from vta.dataset.annotations import FAILURE, INITIALIZATION, SKIPPED, TRACKED
+
+_segments = vot_evaluation._segments  # pylint: disable=protected-access
+
+
+def _brute_force_eao(sequences, maximum_length):
+    curve = numpy.full(maximum_length + 1, numpy.nan)
+    segments = []
+    for overlaps, codes in sequences:
+        segments.extend(_segments(overlaps, codes))
+    for length in range(1, maximum_length + 1):
+        values = []
+        for segment, failed in segments:
+            if failed or segment.size >= length:
+                padded = numpy.zeros(length)
+                padded[: min(length, segment.size)] = segment[:length]
+                values.append(padded.mean())
+        if values:
+            curve[length] = numpy.mean(values)
+    return curve
+
+
+class VotEvaluationTest(unittest.TestCase):
+    """Test cases for VOT evaluation functionality."""
+
+    def setUp(self):
+        self.codes = numpy.array(
+            [INITIALIZATION]
+            + [TRACKED] * 14
+            + [FAILURE]
+            + [SKIPPED] * 5
+            + [INITIALIZATION]
+            + [TRACKED] * 11
+        )
+        self.overlaps = numpy.where(self.codes == TRACKED, 0.5, numpy.nan)
+        self.overlaps[self.codes == INITIALIZATION] = 1.0
+        self.overlaps[12] = 0.0
+
+    def test_accuracy(self):
+        """Validate that burn-in frames are excluded from accuracy."""
+        accuracy = vot_evaluation.calculate_accuracy(self.overlaps, self.codes, 10)
+        self.assertAlmostEqual(accuracy, 3.0 / 7)
+        self.assertTrue(
+            numpy.isnan(
+                vot_evaluation.calculate_accuracy(self.overlaps, self.codes, 50)
+            )
+        )
+        self.assertEqual(vot_evaluation.count_failures(self.codes), 1)
+
+    def test_overlaps(self):
+        """Validate the overlap of initialization and failure frames."""
+        regions = numpy.array([[numpy.nan] * 4, [0, 0, 10, 10], [numpy.nan] * 4])
+        ground_truth = numpy.array([[0, 0, 10, 10], [0, 0, 10, 20], [0, 0, 1, 1]])
+        codes = numpy.array([INITIALIZATION, TRACKED, FAILURE])
+        overlaps = vot_evaluation.calculate_overlaps(ground_truth, regions, codes)
+        numpy.testing.assert_allclose(overlaps, [1.0, 0.5, numpy.nan])
+
+    def test_simulated_reinitialization(self):
+        """Validate reinitialization of a one pass run."""
+        overlaps = numpy.array([1, 0.5, 0, 0, 0.5, 0.5, 0, 0.5, 0.5, 0.5])
+        codes = vot_evaluation.simulate_reinitialization(overlaps, skip=2)
+        numpy.testing.assert_array_equal(codes, [1, -1, 2, 0, 0, 1, 2, 0, 0, 1])
+
+    def test_eao_curve(self):
+        """Validate the EAO curve against a direct calculation."""
+        rng = numpy.random.default_rng(5)
+        sequences = [(self.overlaps, self.codes)]
+        for _ in range(5):
+            overlaps = rng.uniform(0, 1, rng.integers(20, 80))
+            overlaps[rng.integers(0, overlaps.size, 3)] = 0
+            codes = vot_evaluation.simulate_reinitialization(overlaps)
+            sequences.append((overlaps, codes))
+        numpy.testing.assert_allclose(
+            vot_evaluation.calculate_eao_curve(sequences, 100),
+            _brute_force_eao(sequences, 100),
+        )
+
+    def test_eao(self):
+        """Validate averaging the EAO curve over an interval."""
+        curve = numpy.array([numpy.nan, 1.0, 0.5, 0.25, numpy.nan])
+        self.assertAlmostEqual(vot_evaluation.calculate_eao(curve, (2, 4)), 0.375)
+
+    def test_ranking(self):
+        """Validate accuracy-robustness ranking with ties."""
+        accuracy, robustness, overall = vot_evaluation.rank_trackers(
+            [0.5, 0.6, 0.5], [3, 1, 2]
+        )
+        numpy.testing.assert_array_equal(accuracy, [2.5, 1, 2.5])
+        numpy.testing.assert_array_equal(robustness, [3, 1, 2])
+        numpy.testing.assert_array_equal(overall, [2.75, 1, 2.25])
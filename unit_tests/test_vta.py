@@ -0,0 +1,65 @@
+"""Unit tests for the root VTA command."""
+
+import subprocess
+import sys
+import unittest
+
+import vta.vta
+
+
+class CommandRegistryTest(unittest.TestCase):
+    """Test cases for importing command modules only when they run."""
+
+    def test_lazy_imports(self):
+        """Validate that building one command's parser imports only its module."""
+        imported = _imported(
+            "dataset", ("vta.dataset.dataset", "vta.loss.loss", "matplotlib", "yaml")
+        )
+        self.assertEqual(imported, ["vta.dataset.dataset"])
+
+    def test_loss_imports(self):
+        """Validate that the loss command does not import SciPy until it smooths."""
+        self.assertEqual(
+            _imported("loss", ("vta.loss.loss", "scipy.signal")), ["vta.loss.loss"]
+        )
+
+    def test_summaries(self):
+        """Validate that commands that are not imported can still be listed."""
+        parser = vta.vta.make_parser([])
+        self.assertIn("Analyze data related", parser.format_help())
+        arguments = parser.parse_args(["loss"])
+        self.assertEqual(arguments.command, "loss")
+
+    def test_full_parser(self):
+        """Validate that every command's parser is added by default."""
+        arguments = vta.vta.make_parser().parse_args(["loss", "a.json"])
+        self.assertEqual(arguments.file, ["a.json"])
+
+    def test_profile_option(self):
+        """Validate that the profile directory is not taken for the command."""
+        argv = ["--profile", "dataset", "loss", "a.json"]
+        commands = vta.vta._find_commands(argv)  # pylint: disable=protected-access
+        self.assertEqual(commands, ["loss"])
+        arguments = vta.vta.make_parser(commands).parse_args(argv)
+        self.assertEqual(arguments.profile, "dataset")
+        self.assertEqual(arguments.command, "loss")
+
+
+def _imported(command, modules):
+    """Return which of some modules building the parser of a command imports."""
+    script = (
+        "import sys, vta.vta\n"
+        f"vta.vta.make_parser([{command!r}])\n"
+        f"print(*sorted(m for m in sys.modules if m in {modules!r}))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", script],
+        check=True,
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+    ).stdout
+    return output.split()
+
+
+if __name__ == "__main__":
+    unittest.main()
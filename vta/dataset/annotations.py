@@ -0,0 +1,217 @@
+"""Functions for reading ground truth and tracker result files.
+
+Tracking data sets annotate each frame of a sequence with one line of text in a
+file such as *groundtruth.txt* or *groundtruth_rect.txt*. Trackers write their
+results in the same format. These functions read such files directly into NumPy
+arrays. Each line can be
+
+* an axis aligned rectangle, ``x,y,width,height``, as used by OTB and VOT 2013
+  and 2014, or
+* a polygon of four corners, ``x1,y1,x2,y2,x3,y3,x4,y4``, as used by VOT 2015
+  and later, or
+* a single VOT status code, in tracker result files. See :py:data:`SKIPPED`,
+  :py:data:`INITIALIZATION`, and :py:data:`FAILURE`.
+
+Values can be separated by commas, tabs, or spaces. A blank line is a frame
+without a region: it reads as a NaN row, so the frames after it keep their
+numbers. Blank lines at the end of a file are ignored. The whole file is
+converted in a few NumPy operations, rather than one line at a time.
+
+.. code-block:: python
+
+    from vta.dataset import annotations
+
+    ground_truth = annotations.read_groundtruth("vot/2017/ants1/groundtruth.txt")
+    boxes, codes = annotations.read_results("results/ants1_001.txt")
+    failures = numpy.count_nonzero(codes == annotations.FAILURE)
+"""
+
+import itertools
+
+import numpy
+
+import vta.iou.polygon
+
+SKIPPED = 0
+"""The VOT code for a frame skipped between a failure and reinitialization."""
+
+INITIALIZATION = 1
+"""The VOT code for a frame in which the tracker was (re)initialized."""
+
+FAILURE = 2
+"""The VOT code for a frame in which the tracker failed."""
+
+TRACKED = -1
+"""The code used by this module for a frame that has a region."""
+
+
+def read_groundtruth(file_path: str) -> numpy.ndarray:
+    """Read a ground truth annotation file.
+
+    :param str file_path: The path to the annotation file.
+    :returns: An (N,4) array of rectangles, or an (N,8) array of polygons if any
+        line in the file is a polygon. Rectangles in a file with polygons are
+        converted to polygons.
+    :rtype: numpy.ndarray
+    :raises ValueError: if the file is not a valid annotation file, or if it
+        contains VOT status codes.
+    :raises OSError: if the file cannot be read.
+    """
+    with open(file_path) as annotation_file:
+        text = annotation_file.read()
+    return _regions_only(_parse(text, file_path), file_path)
+
+
+def read_results(file_path: str):
+    """Read a tracker result file.
+
+    :param str file_path: The path to the result file.
+    :returns: A tuple of two arrays. The first is an (N,4) or (N,8) array of
+        regions, as for :py:func:`read_groundtruth`. Rows for frames with a
+        status code are NaN. The second is an (N,) array of status codes; it is
+        :py:data:`TRACKED` for frames that have a region.
+    :rtype: tuple(numpy.ndarray, numpy.ndarray)
+    :raises ValueError: if the file is not a valid result file.
+    :raises OSError: if the file cannot be read.
+    """
+    with open(file_path) as result_file:
+        text = result_file.read()
+    return _parse(text, file_path)
+
+
+def iterate_groundtruth(file_path: str, chunk_size: int = 4096):
+    """Read a ground truth annotation file a chunk of frames at a time.
+
+    :param str file_path: The path to the annotation file.
+    :param int chunk_size: The maximum number of frames in each chunk.
+    :returns: A generator that yields arrays of at most ``chunk_size`` regions,
+        in the format returned by :py:func:`read_groundtruth`.
+    :raises ValueError: if the file is not a valid annotation file.
+    :raises OSError: if the file cannot be read.
+
+    Only one chunk of the file is in memory at a time. The width of each chunk
+    is decided on its own, so a file that mixes rectangles and polygons can
+    yield chunks of both widths.
+    """
+    for regions, codes in iterate_results(file_path, chunk_size):
+        yield _regions_only((regions, codes), file_path)
+
+
+def iterate_results(file_path: str, chunk_size: int = 4096):
+    """Read a tracker result file a chunk of frames at a time.
+
+    :param str file_path: The path to the result file.
+    :param int chunk_size: The maximum number of frames in each chunk.
+    :returns: A generator that yields tuples of regions and status codes, in the
+        format returned by :py:func:`read_results`.
+    :raises ValueError: if the file is not a valid result file.
+    :raises OSError: if the file cannot be read.
+    """
+    if chunk_size < 1:
+        raise ValueError(f"chunk size must be positive, not {chunk_size}")
+    with open(file_path) as result_file:
+        for text, final in _chunks(result_file, chunk_size):
+            yield _parse(text, file_path, final)
+
+
+# -----------------------------------------------------------------------------
+#                                                       implementation details
+# -----------------------------------------------------------------------------
+_SEPARATORS = str.maketrans(",\t\r", "   ")
+
+
+def _chunks(lines, chunk_size):
+    """Yield the text of each chunk of lines, and whether it ends the file.
+
+    A chunk is followed only by blank lines if it ends the file, so its own
+    trailing blank lines are ignored, and the blank chunks after it are not
+    yielded.
+    """
+    chunk = "".join(itertools.islice(lines, chunk_size))
+    while chunk:
+        blank = []
+        following = "".join(itertools.islice(lines, chunk_size))
+        while following and not following.strip():
+            blank.append(following)
+            following = "".join(itertools.islice(lines, chunk_size))
+        yield chunk, not following
+        if following:
+            yield from ((text, False) for text in blank)
+        chunk = following
+
+
+def _parse(text, file_path, final=True):
+    """Parse lines of text into regions and codes.
+
+    Blank lines become NaN rows, except at the end of the text if it is
+    ``final``.
+    """
+    text = text.translate(_SEPARATORS)
+    counts = _count_values_per_line(text, final)
+    if counts.size == 0:
+        return numpy.empty((0, 4)), numpy.empty(0, dtype=numpy.int8)
+    try:
+        values = numpy.fromstring(text, sep=" ") if counts.any() else numpy.empty(0)
+    except ValueError:
+        values = None
+    if values is None or values.size != counts.sum():
+        raise ValueError(f"{file_path} contains values that are not numbers")
+    offsets = numpy.cumsum(counts) - counts
+    valid = numpy.isin(counts, (0, 1, 4, 8))
+    if not numpy.all(valid):
+        line = numpy.flatnonzero(~valid)[0] + 1
+        raise ValueError(
+            f"{file_path}:{line}: expected 1, 4, or 8 values, found"
+            f" {counts[line - 1]}"
+        )
+    if numpy.all(counts == counts[0]) and counts[0] > 1:
+        regions = values.reshape(-1, counts[0])
+        return regions, numpy.full(regions.shape[0], TRACKED, dtype=numpy.int8)
+    return _assemble_rows(values, counts, offsets)
+
+
+def _count_values_per_line(text, final):
+    """Count the values on each line of normalized text, without a Python loop.
+
+    The text after the last newline is a line only if it is not empty; if the
+    text is ``final``, the blank lines at its end are dropped.
+    """
+    characters = numpy.frombuffer(text.encode("latin-1", "replace"), numpy.uint8)
+    if characters.size == 0:
+        return numpy.zeros(0, dtype=numpy.intp)
+    newlines = characters == ord("\n")
+    separators = newlines | (characters == ord(" "))
+    starts = ~separators
+    starts[1:] &= separators[:-1]
+    lines = numpy.cumsum(newlines)
+    counts = numpy.bincount(lines[starts], minlength=lines[-1] + 1)
+    if newlines[-1]:
+        counts = counts[:-1]
+    if final:
+        counts = counts[: numpy.flatnonzero(counts)[-1] + 1 if counts.any() else 0]
+    return counts
+
+
+def _assemble_rows(values, counts, offsets):
+    width = 8 if numpy.any(counts == 8) else 4
+    regions = numpy.full((counts.size, width), numpy.nan)
+    codes = numpy.full(counts.size, TRACKED, dtype=numpy.int8)
+    for count in (4, 8):
+        rows = numpy.flatnonzero(counts == count)
+        if rows.size == 0:
+            continue
+        columns = offsets[rows, numpy.newaxis] + numpy.arange(count)
+        if count == width:
+            regions[rows] = values[columns]
+        else:
+            regions[rows] = vta.iou.polygon.rectangle_to_polygon(values[columns])
+    rows = numpy.flatnonzero(counts == 1)
+    codes[rows] = values[offsets[rows]]
+    return regions, codes
+
+
+def _regions_only(parsed, file_path):
+    regions, codes = parsed
+    if numpy.any(codes != TRACKED):
+        raise ValueError(f"{file_path} contains VOT status codes")
+    return regions
@@ -0,0 +1,144 @@
+"""Provides an on disk cache of parsed annotation files.
+
+Parsing thousands of text annotation files dominates the start up time of short
+evaluation runs. The :py:class:`AnnotationCache` stores each parsed file as
+binary NumPy arrays, under the same root directory used by ``vta dataset``. On
+later loads, the arrays are memory mapped instead of parsed again.
+
+.. code-block:: python
+
+    from vta.dataset.cache import AnnotationCache
+
+    cache = AnnotationCache("~/Videos")
+    ground_truth = cache.groundtruth("~/Videos/otb/Basketball/groundtruth_rect.txt")
+"""
+
+import hashlib
+import json
+import os
+import os.path
+
+import numpy
+
+import vta.dataset.annotations
+import vta.utilities.file_utilities
+
+CACHE_DIRECTORY = ".vta_cache"
+"""The name of the cache directory created in the root directory."""
+
+
+class AnnotationCache:
+    """A cache of parsed annotation files, stored in a root directory.
+
+    :param str root_directory: The directory that holds the data sets, such as
+        the ``--root-directory`` of ``vta dataset``. The cache is kept in the
+        :py:data:`CACHE_DIRECTORY` subdirectory of this directory.
+
+    Each cached file is stored as a memory mappable *.npy* array, along with a
+    small JSON record of the source file's modification time, size, and content
+    hash. A cache entry is used only if the source file still matches the
+    record. If only the modification time changed, the content hash is checked
+    before the source file is parsed again. Arrays returned from the cache are
+    read only.
+    """
+
+    def __init__(self, root_directory: str):
+        self.__directory = os.path.join(
+            os.path.expanduser(root_directory), CACHE_DIRECTORY
+        )
+
+    @property
+    def directory(self) -> str:
+        """Get the directory in which cache entries are stored."""
+        return self.__directory
+
+    def groundtruth(self, file_path: str) -> numpy.ndarray:
+        """Load a ground truth annotation file through the cache.
+
+        :param str file_path: The path to the annotation file.
+        :returns: The regions, as for
+            :py:func:`vta.dataset.annotations.read_groundtruth`.
+        :rtype: numpy.ndarray
+        :raises ValueError: if the file is not a valid annotation file, or if it
+            contains VOT status codes.
+        :raises OSError: if the file cannot be read.
+        """
+        regions, codes = self.results(file_path)
+        if numpy.any(codes != vta.dataset.annotations.TRACKED):
+            raise ValueError(f"{file_path} contains VOT status codes")
+        return regions
+
+    def results(self, file_path: str):
+        """Load a tracker result file through the cache.
+
+        :param str file_path: The path to the result file.
+        :returns: The regions and status codes, as for
+            :py:func:`vta.dataset.annotations.read_results`.
+        :rtype: tuple(numpy.ndarray, numpy.ndarray)
+        :raises ValueError: if the file is not a valid result file.
+        :raises OSError: if the file cannot be read.
+        """
+        file_path = os.path.realpath(os.path.expanduser(file_path))
+        entry = os.path.join(self.__directory, _entry_name(file_path))
+        status = os.stat(file_path)
+        record = _read_record(entry)
+        if not _is_current(record, file_path, status):
+            _save_entry(entry, *vta.dataset.annotations.read_results(file_path))
+            record = {"source": file_path}
+        elif record["modified"] == status.st_mtime_ns:
+            return _load_entry(entry)
+        record.update(
+            modified=status.st_mtime_ns,
+            size=status.st_size,
+            hash=record.get("hash")
+            or vta.utilities.file_utilities.hash_file(file_path),
+        )
+        _write_record(entry, record)
+        return _load_entry(entry)
+
+
+# -----------------------------------------------------------------------------
+#                                                       implementation details
+# -----------------------------------------------------------------------------
+def _entry_name(file_path):
+    return hashlib.sha1(file_path.encode("utf-8")).hexdigest()
+
+
+def _read_record(entry):
+    try:
+        with open(f"{entry}.json") as record_file:
+            return json.load(record_file)
+    except (OSError, ValueError):
+        return None
+
+
+def _is_current(record, file_path, status):
+    """Determine if a cache record still describes the source file."""
+    if record is None or record.get("source") != file_path:
+        return False
+    if record["size"] != status.st_size:
+        return False
+    if record["modified"] == status.st_mtime_ns:
+        return True
+    return record["hash"] == vta.utilities.file_utilities.hash_file(file_path)
+
+
+def _write_record(entry, record):
+    temporary_path = f"{entry}.json.{os.getpid()}"
+    with open(temporary_path, "w") as record_file:
+        json.dump(record, record_file)
+    os.replace(temporary_path, f"{entry}.json")
+
+
+def _save_entry(entry, regions, codes):
+    """Save regions and codes as one array, with the codes in the last column."""
+    os.makedirs(os.path.dirname(entry), exist_ok=True)
+    temporary_path = f"{entry}.npy.{os.getpid()}"
+    with open(temporary_path, "wb") as array_file:
+        numpy.save(array_file, numpy.column_stack((regions, codes)))
+    os.replace(temporary_path, f"{entry}.npy")
+
+
+def _load_entry(entry):
+    array = numpy.load(f"{entry}.npy", mmap_mode="r")
+    return array[:, :-1], array[:, -1].astype(numpy.int8)
@@ -1,11 +1,13 @@
 """The entry module for the VTA dataset command."""
 
+import argparse
 import os.path
 import sys
+import vta.dataset.download
+import vta.dataset.otb
 import vta.dataset.vot
 import vta.utilities.file_utilities
 
-
 SUBSETS = {"otb": ["tb50", "tb100"], "vot": ["2013", "2014", "2015", "2016", "2017"]}
 
 
@@ -74,6 +76,19 @@ def make_parser(subparsers):
         " continue.",
         metavar="SEQUENCE",
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=4,
+        help="The maximum number of sequences to download at the same time.",
+    )
+    parser.add_argument(
+        "--keep-archives",
+        action="store_true",
+        help="If present, save each archive, then extract it, and keep it. By"
+        " default, archives are extracted as they download, and are deleted once"
+        " they are extracted.",
+    )
 
 
 def main(arguments):
@@ -92,52 +107,26 @@ def main(arguments):
     :rtype: int
     """
     _print_summary(arguments)
-    if arguments.dataset == "vot":
-        return vta.dataset.vot.download_sequences()
-        # return vta.dataset.vot.download_sequences(
-        #    arguments.subsets,
-        #    arguments.root_directory,
-        #    arguments.force,
-        #    arguments.sequences,
-        # )
-    print("Dataset", arguments.dataset, "is not yet implemented.")
-    return 1
+    module = vta.dataset.vot if arguments.dataset == "vot" else vta.dataset.otb
+    return module.download_sequences(
+        arguments.subsets,
+        arguments.root_directory,
+        arguments.sequences,
+        vta.dataset.download.DownloadOptions(
+            arguments.force, arguments.jobs, arguments.keep_archives
+        ),
+    )
 
 
 # -----------------------------------------------------------------------------
 #                                                       implementation details
 # -----------------------------------------------------------------------------
-# The PyLint suppressions are necessary. This class implements the
-# argparse.Action interface, so it must be this way.
-class _SubsetLister:  # pylint: disable=too-many-instance-attributes,too-few-public-methods
+# This class implements the argparse.Action interface, which has no public
+# methods in older versions of Python.
+class _SubsetLister(argparse.Action):  # pylint: disable=too-few-public-methods
     """Validates that a command argument represents a legitimate directory."""
 
-    # #lizard forgives
-    def __init__(  # pylint: disable=too-many-arguments
-        self,
-        option_strings,
-        dest,
-        nargs=None,
-        const=None,
-        default=None,
-        type=None,  # pylint: disable=redefined-builtin
-        choices=None,
-        required=False,
-        help=None,  # pylint: disable=redefined-builtin
-        metavar=None,
-    ):
-        self.option_strings = option_strings
-        self.dest = dest
-        self.nargs = nargs
-        self.const = const
-        self.default = default
-        self.type = type
-        self.choices = choices
-        self.required = required
-        self.help = help
-        self.metavar = metavar
-
-    def __call__(self, parser, namespace, values, option_string):
+    def __call__(self, parser, namespace, values, option_string=None):
         for subset in SUBSETS[namespace.dataset]:
             print(subset)
         sys.exit(0)
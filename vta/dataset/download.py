@@ -0,0 +1,391 @@
+"""Functions for downloading data set sequences concurrently.
+
+Sequences are downloaded by a bounded pool of threads. Each worker downloads,
+verifies, and extracts one sequence at a time, so extracting one sequence
+overlaps with downloading others.
+
+Archives are normally extracted as they download, with
+:py:func:`vta.dataset.extract.stream_extract`, so the archive is never read back
+from disk. Once the archive's checksum is verified, a marker file recording the
+checksum is written to the extraction directory.
+
+Every file is first written to a *.part* file beside its destination; a
+streamed archive too, whose *.part* file is deleted once it is extracted. If a
+download is interrupted, the next attempt resumes the *.part* file with an HTTP
+range request. A file is complete once its checksum is verified; it is then
+renamed to its destination, and its SHA-256 digest is recorded in a *.sha256*
+file beside it. A resumed archive, or an archive with members that cannot be
+extracted as they are read, is extracted from its file once it is complete.
+
+Later downloads skip sequences whose files all match their checksums.
+"""
+
+import concurrent.futures
+import hashlib
+import http.client
+import os
+import os.path
+import urllib.error
+import urllib.request
+
+import vta.dataset.extract
+import vta.utilities.file_utilities
+import vta.utilities.profiling
+
+CHUNK_SIZE = 1 << 20
+"""The number of bytes read from the network at a time."""
+
+TIMEOUT = 60
+"""The number of seconds to wait for a server to respond."""
+
+
+class Download:
+    """Describes one file to download.
+
+    .. py:attribute:: url
+        The URL of the file.
+
+    .. py:attribute:: file_path
+        The path to which the file is downloaded.
+
+    .. py:attribute:: checksum
+        The expected hexadecimal MD5, SHA-1, or SHA-256 digest of the file, or
+        ``None`` if the source does not publish one.
+
+    .. py:attribute:: extraction
+        A :py:class:`vta.dataset.extract.Extraction` describing where to
+        extract the file, or ``None`` if the file is not an archive. The
+        archive itself is only written to ``file_path`` when archives are kept.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        file_path: str,
+        checksum: str = None,
+        extraction: vta.dataset.extract.Extraction = None,
+    ):
+        self.url = url
+        self.file_path = file_path
+        self.checksum = checksum
+        self.extraction = extraction
+
+
+class DownloadOptions:
+    """Options that control how sequences are downloaded.
+
+    .. py:attribute:: force
+        If ``True``, download every file, even if it is already complete.
+
+    .. py:attribute:: jobs
+        The maximum number of sequences to download at once.
+
+    .. py:attribute:: keep_archives
+        If ``True``, download archives, then extract them, and keep them. If
+        ``False``, extract archives as they download, and delete them once
+        they are extracted.
+    """
+
+    def __init__(self, force: bool = False, jobs: int = 4, keep_archives=False):
+        self.force = force
+        self.jobs = jobs
+        self.keep_archives = keep_archives
+
+
+class SequenceDownload:
+    """Describes the files that make up one sequence.
+
+    .. py:attribute:: name
+        The name of the sequence.
+
+    .. py:attribute:: downloads
+        A list of :py:class:`Download` objects, one per file of the sequence.
+    """
+
+    def __init__(self, name: str, downloads: list):
+        self.name = name
+        self.downloads = downloads
+
+
+def download_sequences(sequences, options: DownloadOptions) -> int:
+    """Download sequences concurrently.
+
+    :param sequences: An iterable of :py:class:`SequenceDownload` objects.
+    :param DownloadOptions options: Options that control the downloads.
+    :return: An exit code following Unix command conventions. 0 indicates that
+        every sequence was downloaded or skipped. 1 indicates that at least one
+        sequence failed; the error is printed and other sequences continue.
+    :rtype: int
+    """
+    exit_code = 0
+    with concurrent.futures.ThreadPoolExecutor(max_workers=options.jobs) as executor:
+        futures = {
+            executor.submit(download_sequence, sequence, options): sequence
+            for sequence in sequences
+        }
+        for future in concurrent.futures.as_completed(futures):
+            name = futures[future].name
+            try:
+                downloaded = future.result()
+            except (OSError, ValueError, http.client.HTTPException) as error:
+                print(f"error: could not download {name}: {error}")
+                exit_code = 1
+                continue
+            print("Downloaded" if downloaded else "Skipped", name)
+    return exit_code
+
+
+def download_sequence(sequence: SequenceDownload, options: DownloadOptions) -> bool:
+    """Download, verify, and extract the files of one sequence.
+
+    :param SequenceDownload sequence: The sequence to download.
+    :param DownloadOptions options: Options that control the download.
+    :returns: ``True`` if any file was downloaded, ``False`` if every file was
+        already complete.
+    :rtype: bool
+    :raises OSError: if a file cannot be downloaded or written.
+    :raises http.client.HTTPException: if a server's response is broken, such
+        as a response that ends early.
+    :raises ValueError: if a downloaded file does not match its checksum, or
+        cannot be extracted.
+    """
+    downloaded = False
+    for download in sequence.downloads:
+        if not options.force and is_complete(download):
+            continue
+        if download.extraction is None:
+            download_file(download, options.force)
+        elif options.keep_archives:
+            if options.force or not _is_downloaded(download):
+                download_file(download, options.force)
+            _extract_file(download)
+        else:
+            with vta.utilities.profiling.phase("download and extract"):
+                _stream_download(download, options.force)
+        downloaded = True
+    return downloaded
+
+
+def download_file(download: Download, force: bool = False) -> None:
+    """Download one file, resuming a previous partial download.
+
+    :param Download download: The file to download.
+    :param bool force: If ``True``, discard any partial download and start
+        again.
+    :returns: None
+    :raises OSError: if the file cannot be downloaded or written.
+    :raises ValueError: if the downloaded file does not match its checksum. The
+        partial file is deleted, so the next attempt starts again.
+    """
+    part_path = f"{download.file_path}.part"
+    os.makedirs(os.path.dirname(os.path.abspath(part_path)), exist_ok=True)
+    if force and os.path.exists(part_path):
+        os.remove(part_path)
+    with vta.utilities.profiling.phase("download"):
+        _fetch(download.url, part_path)
+    with vta.utilities.profiling.phase("verify"):
+        digest = vta.utilities.file_utilities.hash_file(part_path)
+        valid = download.checksum is None or _matches(
+            part_path, download.checksum, digest
+        )
+    if not valid:
+        os.remove(part_path)
+        raise ValueError(f"{download.url} does not match its checksum")
+    os.replace(part_path, download.file_path)
+    with open(f"{download.file_path}.sha256", "w") as digest_file:
+        digest_file.write(digest)
+
+
+def select_sequences(names, sequences):
+    """Select the requested sequences from those available.
+
+    :param list names: The names of the available sequences.
+    :param list sequences: The names of the requested sequences, or ``None`` to
+        select every available sequence.
+    :returns: A tuple of the selected names, in the order of ``names``, and an
+        exit code. The exit code is 1 if any requested sequence is not
+        available; an error is printed for each such sequence.
+    :rtype: tuple(list, int)
+    """
+    if sequences is None:
+        return list(names), 0
+    exit_code = 0
+    for sequence in sequences:
+        if sequence not in names:
+            print(f"error: {sequence} is not in the requested data set")
+            exit_code = 1
+    return [name for name in names if name in sequences], exit_code
+
+
+def is_complete(download: Download) -> bool:
+    """Determine if a file has already been downloaded and verified.
+
+    :param Download download: The file to check.
+    :returns: For an archive, ``True`` if it has been extracted and verified.
+        For any other file, ``True`` if the file exists and matches either its
+        published checksum or the digest recorded when it was downloaded.
+    :rtype: bool
+    """
+    if download.extraction is None:
+        return _is_downloaded(download)
+    try:
+        with open(_marker_path(download)) as marker_file:
+            recorded = marker_file.read().strip()
+    except OSError:
+        return False
+    return download.checksum is None or recorded == download.checksum.lower()
+
+
+# -----------------------------------------------------------------------------
+#                                                       implementation details
+# -----------------------------------------------------------------------------
+_ALGORITHMS = {32: "md5", 40: "sha1", 64: "sha256"}
+
+
+def _is_downloaded(download):
+    if not os.path.isfile(download.file_path):
+        return False
+    checksum = download.checksum
+    if checksum is None:
+        try:
+            with open(f"{download.file_path}.sha256") as digest_file:
+                checksum = digest_file.read().strip()
+        except OSError:
+            return False
+    return _matches(download.file_path, checksum)
+
+
+def _marker_path(download):
+    name = os.path.basename(download.file_path)
+    return os.path.join(download.extraction.directory, f".{name}.complete")
+
+
+def _write_marker(download, sha256):
+    os.makedirs(download.extraction.directory, exist_ok=True)
+    with open(_marker_path(download), "w") as marker_file:
+        marker_file.write((download.checksum or sha256).lower())
+
+
+def _extract_file(download):
+    """Extract a downloaded archive, and record that it is complete."""
+    with vta.utilities.profiling.phase("extract"):
+        vta.dataset.extract.extract_archive(download.file_path, download.extraction)
+        _write_marker(
+            download, vta.utilities.file_utilities.hash_file(download.file_path)
+        )
+
+
+def _stream_download(download, force):
+    """Extract an archive while it downloads, then verify its checksum.
+
+    The archive is also written to its *.part* file, which is deleted once the
+    archive is extracted. If the checksum does not match, the extracted files
+    are deleted. If the download was interrupted before, or if the archive
+    cannot be streamed, the rest of the *.part* file is downloaded and the
+    archive is extracted from it.
+    """
+    part_path = f"{download.file_path}.part"
+    if force and os.path.exists(part_path):
+        os.remove(part_path)
+    if os.path.exists(part_path):
+        _resume_archive(download)
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(part_path)), exist_ok=True)
+    with urllib.request.urlopen(download.url, timeout=TIMEOUT) as response:
+        with open(part_path, "wb") as part_file:
+            stream = _HashingStream(response, download.checksum, part_file)
+            try:
+                extracted = vta.dataset.extract.stream_extract(
+                    stream, download.extraction
+                )
+            except vta.dataset.extract.UnstreamableError:
+                extracted = None
+            except ValueError:
+                part_file.close()
+                os.remove(part_path)
+                raise
+    if extracted is None:
+        _resume_archive(download)
+        return
+    os.remove(part_path)
+    if download.checksum is not None and not stream.matches(download.checksum):
+        for file_path in extracted:
+            os.remove(file_path)
+        raise ValueError(f"{download.url} does not match its checksum")
+    _write_marker(download, stream.sha256())
+
+
+def _resume_archive(download):
+    """Finish downloading an archive to its file, extract it, and delete it."""
+    download_file(download)
+    _extract_file(download)
+    os.remove(download.file_path)
+    os.remove(f"{download.file_path}.sha256")
+
+
+class _HashingStream:
+    """Wraps a stream, hashing the bytes read from it and copying them to a file."""
+
+    def __init__(self, stream, checksum, copy):
+        self.__stream = stream
+        self.__copy = copy
+        self.__sha256 = hashlib.sha256()
+        algorithm = _ALGORITHMS.get(len(checksum)) if checksum else None
+        self.__checksum = hashlib.new(algorithm) if algorithm else None
+
+    def read(self, size=-1):
+        """Read, hash, and copy at most ``size`` bytes, or all if it is -1."""
+        data = self.__stream.read(size)
+        self.__copy.write(data)
+        self.__sha256.update(data)
+        if self.__checksum is not None:
+            self.__checksum.update(data)
+        return data
+
+    def sha256(self):
+        """Return the SHA-256 digest of the bytes read so far, in hex."""
+        return self.__sha256.hexdigest()
+
+    def matches(self, checksum):
+        """Return whether the bytes read so far have the given checksum."""
+        if self.__checksum is None:
+            raise ValueError(f"unrecognized checksum {checksum}")
+        return self.__checksum.hexdigest() == checksum.lower()
+
+
+def _matches(file_path, checksum, sha256=None):
+    algorithm = _ALGORITHMS.get(len(checksum))
+    if algorithm is None:
+        raise ValueError(f"unrecognized checksum {checksum}")
+    if algorithm == "sha256":
+        digest = sha256 or vta.utilities.file_utilities.hash_file(file_path)
+    else:
+        digest = _hash_file(file_path, algorithm)
+    return digest == checksum.lower()
+
+
+def _hash_file(file_path, algorithm):
+    digest = hashlib.new(algorithm)
+    with open(file_path, "rb") as hashed_file:
+        for chunk in iter(lambda: hashed_file.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _fetch(url, part_path):
+    """Download url to part_path, resuming from the end of part_path."""
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    request = urllib.request.Request(url)
+    if offset:
+        request.add_header("Range", f"bytes={offset}-")
+    try:
+        response = urllib.request.urlopen(request, timeout=TIMEOUT)
+    except urllib.error.HTTPError as error:
+        if error.code == 416 and offset:
+            return  # The partial file is already complete.
+        raise
+    with response:
+        mode = "ab" if offset and response.status == 206 else "wb"
+        with open(part_path, mode) as part_file:
+            for chunk in iter(lambda: response.read(CHUNK_SIZE), b""):
+                part_file.write(chunk)
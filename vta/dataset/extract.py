@@ -0,0 +1,273 @@
+"""Functions for extracting zip archives as they are read.
+
+A zip archive lists its members in a central directory at the end of the file,
+but every member is also preceded by a local header. :py:func:`stream_extract`
+reads those local headers in order, so members can be written to disk while the
+archive is still downloading, without saving a copy of the archive first.
+Stored and deflated members are supported, including deflated members whose
+sizes are given in a data descriptor after the data, and ZIP64 sizes. Archives
+with other members raise :py:class:`UnstreamableError`; they can be saved, and
+extracted with :py:func:`extract_archive`.
+"""
+
+import os
+import os.path
+import shutil
+import struct
+import zipfile
+import zlib
+
+CHUNK_SIZE = 1 << 20
+"""The number of bytes read from the archive at a time."""
+
+
+class UnstreamableError(ValueError):
+    """Raised when a member of an archive cannot be extracted as it is read.
+
+    A stored member whose size follows its data is one example. The archive can
+    still be saved, then extracted with :py:func:`extract_archive`.
+    """
+
+
+class Extraction:
+    """Describes where the members of an archive are extracted.
+
+    .. py:attribute:: directory
+        The directory into which the members are extracted.
+
+    .. py:attribute:: strip_components
+        The number of leading path components removed from each member name.
+        For example, with a value of 1, the member *Basketball/img/0001.jpg*
+        is extracted to *directory/img/0001.jpg*.
+    """
+
+    def __init__(self, directory: str, strip_components: int = 0):
+        self.directory = directory
+        self.strip_components = strip_components
+
+
+def stream_extract(stream, extraction: Extraction) -> list:
+    """Extract a zip archive from a stream of bytes.
+
+    :param stream: A binary file-like object with a ``read`` method, such as an
+        HTTP response. It is read to the end.
+    :param Extraction extraction: Where to extract the members.
+    :returns: The paths of the extracted files.
+    :rtype: list
+    :raises UnstreamableError: if a member cannot be extracted in a single
+        pass. The members before it are extracted, and the stream is not read
+        to the end.
+    :raises ValueError: if the stream is not a zip archive, if a member fails
+        its CRC check, or if a member would be extracted outside the extraction
+        directory.
+    :raises OSError: if a member cannot be written.
+    """
+    reader = _Reader(stream)
+    extracted = []
+    while True:
+        signature = reader.peek(4)
+        if len(signature) < 4 or signature != _LOCAL_SIGNATURE:
+            break
+        file_path = _extract_member(reader, extraction)
+        if file_path is not None:
+            extracted.append(file_path)
+    if not extracted and reader.peek(4) not in (_CENTRAL_SIGNATURE, _END_SIGNATURE):
+        raise ValueError("the stream is not a zip archive")
+    reader.drain()
+    return extracted
+
+
+def extract_archive(file_path: str, extraction: Extraction) -> list:
+    """Extract a zip archive from a file.
+
+    :param str file_path: The path to the archive.
+    :param Extraction extraction: Where to extract the members.
+    :returns: The paths of the extracted files.
+    :rtype: list
+    :raises ValueError: if the file is not a zip archive, or if a member would
+        be extracted outside the extraction directory.
+    :raises OSError: if a member cannot be written.
+    """
+    extracted = []
+    try:
+        with zipfile.ZipFile(file_path) as archive:
+            for member in archive.infolist():
+                target = _target_path(member.filename, extraction)
+                if target is None or member.is_dir():
+                    continue
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                with archive.open(member) as source, open(target, "wb") as output:
+                    shutil.copyfileobj(source, output, CHUNK_SIZE)
+                extracted.append(target)
+    except zipfile.BadZipFile as error:
+        raise ValueError(f"{file_path} is not a zip archive") from error
+    return extracted
+
+
+# -----------------------------------------------------------------------------
+#                                                       implementation details
+# -----------------------------------------------------------------------------
+_LOCAL_SIGNATURE = b"PK\x03\x04"
+_CENTRAL_SIGNATURE = b"PK\x01\x02"
+_END_SIGNATURE = b"PK\x05\x06"
+_DESCRIPTOR_SIGNATURE = b"PK\x07\x08"
+_LOCAL_HEADER = struct.Struct("<4sHHHHHIIIHH")
+_ZIP64_EXTRA = 0x0001
+_FLAG_ENCRYPTED = 0x1
+_FLAG_DESCRIPTOR = 0x8
+_FLAG_UTF8 = 0x800
+
+
+class _Reader:
+    """Buffers a stream, so that bytes read past the end of a member can be
+    returned to it."""
+
+    def __init__(self, stream):
+        self.__stream = stream
+        self.__buffer = bytearray()
+
+    def peek(self, size):
+        """Return at most ``size`` bytes, without consuming them."""
+        while len(self.__buffer) < size:
+            chunk = self.__stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            self.__buffer += chunk
+        return bytes(self.__buffer[:size])
+
+    def read_exactly(self, size):
+        """Consume and return ``size`` bytes, or raise ValueError at the end."""
+        data = self.peek(size)
+        if len(data) < size:
+            raise ValueError("the archive ended unexpectedly")
+        del self.__buffer[:size]
+        return data
+
+    def read_some(self, limit=CHUNK_SIZE):
+        """Consume and return at most ``limit`` bytes; empty at the end."""
+        if not self.__buffer:
+            self.__buffer += self.__stream.read(CHUNK_SIZE)
+        data = bytes(self.__buffer[:limit])
+        del self.__buffer[:limit]
+        return data
+
+    def unread(self, data):
+        """Return bytes to the front of the buffer, to be read again."""
+        self.__buffer[:0] = data
+
+    def drain(self):
+        """Discard the rest of the stream."""
+        self.__buffer.clear()
+        while self.__stream.read(CHUNK_SIZE):
+            pass
+
+
+def _extract_member(reader, extraction):
+    name, flags, method, crc, compressed_size, zip64 = _read_local_header(reader)
+    if flags & _FLAG_ENCRYPTED:
+        raise ValueError(f"{name} is encrypted")
+    target = _target_path(name, extraction)
+    if target is not None and not name.endswith("/"):
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "wb") as output:
+            actual_crc = _copy_member(reader, output, method, flags, compressed_size)
+    else:
+        with open(os.devnull, "wb") as output:
+            actual_crc = _copy_member(reader, output, method, flags, compressed_size)
+    if flags & _FLAG_DESCRIPTOR:
+        crc = _read_descriptor(reader, zip64)
+    if actual_crc != crc:
+        raise ValueError(f"{name} failed its CRC check")
+    return None if name.endswith("/") else target
+
+
+def _read_local_header(reader):
+    """Read a local header.
+
+    Returns the name, flags, method, CRC, and compressed size of the member,
+    and whether it has ZIP64 sizes, which are also 8 bytes in its descriptor.
+    """
+    fields = _LOCAL_HEADER.unpack(reader.read_exactly(_LOCAL_HEADER.size))
+    _, _, flags, method, _, _, crc, compressed_size, size, name_size, extra_size = (
+        fields
+    )
+    raw_name = reader.read_exactly(name_size)
+    name = raw_name.decode("utf-8" if flags & _FLAG_UTF8 else "cp437")
+    extra = reader.read_exactly(extra_size)
+    compressed_size = _compressed_size(extra, size, compressed_size)
+    return name, flags, method, crc, compressed_size, _zip64_data(extra) is not None
+
+
+def _copy_member(reader, output, method, flags, compressed_size):
+    crc = 0
+    if method == zipfile.ZIP_STORED:
+        if flags & _FLAG_DESCRIPTOR:
+            raise UnstreamableError(
+                "stored members with data descriptors cannot be streamed"
+            )
+        remaining = compressed_size
+        while remaining:
+            data = reader.read_some(min(remaining, CHUNK_SIZE))
+            if not data:
+                raise ValueError("the archive ended unexpectedly")
+            remaining -= len(data)
+            crc = zlib.crc32(data, crc)
+            output.write(data)
+        return crc
+    if method != zipfile.ZIP_DEFLATED:
+        raise UnstreamableError(f"compression method {method} cannot be streamed")
+    decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+    while not decompressor.eof:
+        data = reader.read_some()
+        if not data:
+            raise ValueError("the archive ended unexpectedly")
+        data = decompressor.decompress(data)
+        crc = zlib.crc32(data, crc)
+        output.write(data)
+    reader.unread(decompressor.unused_data)
+    return crc
+
+
+def _read_descriptor(reader, zip64):
+    if reader.peek(4) == _DESCRIPTOR_SIGNATURE:
+        reader.read_exactly(4)
+    crc = struct.unpack("<I", reader.read_exactly(4))[0]
+    reader.read_exactly(16 if zip64 else 8)
+    return crc
+
+
+def _zip64_data(extra):
+    """Get the data of the ZIP64 extra field, or None if there is none."""
+    offset = 0
+    while offset + 4 <= len(extra):
+        header, size = struct.unpack("<HH", extra[offset : offset + 4])
+        if header == _ZIP64_EXTRA:
+            return extra[offset + 4 : offset + 4 + size]
+        offset += 4 + size
+    return None
+
+
+def _compressed_size(extra, size, compressed_size):
+    """Get the compressed size of a member, from its ZIP64 field if needed.
+
+    The ZIP64 field only holds the sizes whose header fields are 0xFFFFFFFF:
+    first the uncompressed size, if it overflowed, then the compressed size.
+    """
+    if compressed_size != 0xFFFFFFFF:
+        return compressed_size
+    data = _zip64_data(extra) or b""
+    offset = 8 if size == 0xFFFFFFFF else 0
+    if len(data) < offset + 8:
+        raise ValueError("a member has no ZIP64 compressed size")
+    return struct.unpack_from("<Q", data, offset)[0]
+
+
+def _target_path(name, extraction):
+    """Map a member name to its extraction path, or None to skip the member."""
+    parts = [part for part in name.replace("\\", "/").split("/") if part]
+    parts = parts[extraction.strip_components :]
+    if not parts:
+        return None
+    if os.path.isabs(name) or ".." in parts:
+        raise ValueError(f"{name} would be extracted outside {extraction.directory}")
+    return os.path.join(extraction.directory, *parts)
@@ -0,0 +1,83 @@
+"""Functionality for downloading OTB sequences."""
+
+import os.path
+
+import vta.dataset.download
+import vta.dataset.extract
+
+BASE_URL = "http://cvlab.hanyang.ac.kr/tracker_benchmark/seq/"
+"""The URL from which OTB sequence archives are downloaded."""
+
+TB50 = [
+    "Basketball", "Biker", "Bird1", "BlurBody", "BlurCar2", "BlurFace",
+    "BlurOwl", "Bolt", "Box", "Car1", "Car4", "CarDark", "CarScale", "ClifBar",
+    "Couple", "Crowds", "David", "Deer", "Diving", "DragonBaby", "Dudek",
+    "Football", "Freeman4", "Girl", "Human3", "Human4", "Human6", "Human9",
+    "Ironman", "Jump", "Jumping", "Liquor", "Matrix", "MotorRolling", "Panda",
+    "RedTeam", "Shaking", "Singer2", "Skating1", "Skating2", "Skiing", "Soccer",
+    "Surfer", "Sylvester", "Tiger2", "Trellis", "Walking", "Walking2", "Woman",
+]  # fmt: skip
+"""The sequences of the TB-50 subset. Skating2 has two targets."""
+
+TB100 = sorted(
+    TB50
+    + [
+        "Bird2", "BlurCar1", "BlurCar3", "BlurCar4", "Board", "Bolt2", "Boy",
+        "Car2", "Car24", "Coke", "Coupon", "Crossing", "Dancer", "Dancer2",
+        "David2", "David3", "Dog", "Dog1", "Doll", "FaceOcc1", "FaceOcc2", "Fish",
+        "FleetFace", "Football1", "Freeman1", "Freeman3", "Girl2", "Gym",
+        "Human2", "Human5", "Human7", "Human8", "Jogging", "KiteSurf", "Lemming",
+        "Man", "Mhyang", "MountainBike", "Rubik", "Singer1", "Skater", "Skater2",
+        "Subway", "Suv", "Tiger1", "Toy", "Trans", "Twinnings", "Vase",
+    ]  # fmt: skip
+)
+"""The sequences of the TB-100 subset. Jogging and Skating2 have two targets."""
+
+SUBSETS = {"tb50": TB50, "tb100": TB100}
+
+
+def download_sequences(subsets, root_directory, sequences, options):
+    """Downloads the requested sequences from the OTB dataset.
+
+    :param list subsets: An optional list of subsets of OTB to download. If this
+        is ``None``, all subsets will be downloaded. An error is printed for
+        each subset that is not in :py:data:`SUBSETS`, and it is skipped.
+    :param str root_directory: The root directory into which to download the
+        sequences. *otb* is appended to this; so sequences are ultimately
+        extracted to *root_directory/otb/sequence*.
+    :param list sequences: Specific sequences to download. The sequence names
+        must match exactly. If this is ``None``, all sequences are downloaded.
+    :param vta.dataset.download.DownloadOptions options: Options that control
+        the downloads, such as whether to download sequences that already exist
+        in ``root_directory``.
+
+    :return: An exit code following Unix command conventions.
+    :rtype: int
+    """
+    exit_code = 0
+    for subset in subsets or []:
+        if subset not in SUBSETS:
+            print(f"error: {subset} is not an OTB subset")
+            exit_code = 1
+    names = sorted(
+        {name for s in subsets or SUBSETS if s in SUBSETS for name in SUBSETS[s]}
+    )
+    names, select_code = vta.dataset.download.select_sequences(names, sequences)
+    directory = os.path.join(root_directory, "otb")
+    downloads = [
+        vta.dataset.download.SequenceDownload(
+            name,
+            [
+                vta.dataset.download.Download(
+                    f"{BASE_URL}{name}.zip",
+                    os.path.join(directory, f"{name}.zip"),
+                    extraction=vta.dataset.extract.Extraction(
+                        os.path.join(directory, name), strip_components=1
+                    ),
+                )
+            ],
+        )
+        for name in names
+    ]
+    download_code = vta.dataset.download.download_sequences(downloads, options)
+    return exit_code or select_code or download_code
@@ -1,22 +1,108 @@
 """Functionality for downloading VOT sequences."""
 
-# def download_sequences(subsets, root_directory, force, sequences):
-def download_sequences():
+import http.client
+import json
+import os.path
+import urllib.parse
+import urllib.request
+
+import vta.dataset.download
+import vta.dataset.extract
+
+BASE_URL = "http://data.votchallenge.net/"
+"""The URL under which the VOT data sets are published."""
+
+YEARS = ["2013", "2014", "2015", "2016", "2017"]
+"""The VOT subsets that can be downloaded."""
+
+
+def download_sequences(subsets, root_directory, sequences, options):
     """Downloads the requested sequences from the VOT dataset.
 
     :param list subsets: An optional list of subsets of VOT to download. If this
-        is ``None``, all subsets will be downloaded.
+        is ``None``, all subsets will be downloaded. An error is printed for
+        each subset that is not in :py:data:`YEARS`, and it is skipped.
     :param str root_directory: The root directory into which to download the
         sequences. *vot* is appended to this; so sequences are ultimately
-        downloaded to *root_directory/vot*.
-    :param bool force: If ``True``, sequences will be downloaded even if they
-        already exists in ``root_directory``. If ``False``, existing sequences
-        will not be downloaded again.
+        extracted to *root_directory/vot/subset/sequence*.
     :param list sequences: Specific sequences to download. The sequence names
         must match exactly. If this is ``None``, all sequences are downloaded.
+    :param vta.dataset.download.DownloadOptions options: Options that control
+        the downloads, such as whether to download sequences that already exist
+        in ``root_directory``.
 
-    :return: Nothing
+    :return: An exit code following Unix command conventions.
+    :rtype: int
     """
-    print("Downloading vot")
-    # os.makedirs(os.path.join(root_directory, "vot"), exist_ok=True)
-    return 0
+    exit_code = 0
+    for year in subsets or YEARS:
+        if year not in YEARS:
+            print(f"error: {year} is not a VOT subset")
+            exit_code = 1
+            continue
+        directory = os.path.join(root_directory, "vot", year)
+        try:
+            available = describe_sequences(year, directory)
+        except (OSError, ValueError, http.client.HTTPException) as error:
+            print(f"error: could not read the VOT{year} description: {error}")
+            exit_code = 1
+            continue
+        names, select_code = vta.dataset.download.select_sequences(
+            list(available), sequences
+        )
+        download_code = vta.dataset.download.download_sequences(
+            [available[name] for name in names], options
+        )
+        exit_code = exit_code or select_code or download_code
+    return exit_code
+
+
+def describe_sequences(year: str, directory: str) -> dict:
+    """Read the list of sequences in a VOT subset.
+
+    :param str year: The VOT subset, such as "2017".
+    :param str directory: The directory into which the subset is downloaded.
+    :returns: A dictionary mapping each sequence name to a
+        :py:class:`vta.dataset.download.SequenceDownload`. Each sequence has an
+        archive of annotations, extracted to the sequence directory, and one
+        archive per image channel, extracted to a subdirectory named for the
+        channel.
+    :rtype: dict
+    :raises OSError: if the description cannot be downloaded.
+    :raises http.client.HTTPException: if the server's response is broken.
+    :raises ValueError: if the description is not valid.
+    """
+    url = urllib.parse.urljoin(BASE_URL, f"vot{year}/main/description.json")
+    with urllib.request.urlopen(url, timeout=vta.dataset.download.TIMEOUT) as response:
+        description = json.load(response)
+    try:
+        return {
+            sequence["name"]: _describe_sequence(url, directory, sequence)
+            for sequence in description["sequences"]
+        }
+    except (KeyError, TypeError) as error:
+        raise ValueError(f"{url} is not a VOT data set description") from error
+
+
+# -----------------------------------------------------------------------------
+#                                                       implementation details
+# -----------------------------------------------------------------------------
+def _describe_sequence(url, directory, sequence):
+    sequence_directory = os.path.join(directory, sequence["name"])
+    archives = [("annotations", sequence["annotations"], sequence_directory)]
+    archives.extend(
+        (name, channel, os.path.join(sequence_directory, name))
+        for name, channel in sequence.get("channels", {}).items()
+    )
+    return vta.dataset.download.SequenceDownload(
+        sequence["name"],
+        [
+            vta.dataset.download.Download(
+                urllib.parse.urljoin(url, archive["url"]),
+                os.path.join(sequence_directory, f"{name}.zip"),
+                archive.get("checksum"),
+                vta.dataset.extract.Extraction(extraction_directory),
+            )
+            for name, archive, extraction_directory in archives
+        ],
+    )
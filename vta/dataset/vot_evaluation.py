@@ -0,0 +1,223 @@
+"""Functions for VOT style accuracy, robustness, and EAO evaluation.
+
+The VOT challenge runs a tracker with supervision: when the tracker fails, it is
+reinitialized a few frames later. Tracker result files record this with status
+codes; see :py:mod:`vta.dataset.annotations`. From those results, VOT measures
+
+:accuracy: The mean overlap of the frames in which the tracker had a region,
+    excluding a burn-in period after each (re)initialization.
+:robustness: The number of times the tracker failed.
+:expected average overlap: The average overlap a tracker is expected to attain
+    on sequences of a given length, calculated from the segments between
+    initializations. Segments that end with a failure count as zero overlap
+    after the failure.
+
+.. code-block:: python
+
+    regions, codes = annotations.read_results("results/ants1_001.txt")
+    ground_truth = annotations.read_groundtruth("vot/2017/ants1/groundtruth.txt")
+    overlaps = calculate_overlaps(ground_truth, regions, codes)
+    accuracy = calculate_accuracy(overlaps, codes)
+    curve = calculate_eao_curve([(overlaps, codes)], 1000)
+    score = calculate_eao(curve)
+"""
+
+import numpy
+
+import vta.iou.polygon
+from vta.dataset.annotations import FAILURE, INITIALIZATION, SKIPPED, TRACKED
+
+BURN_IN = 10
+"""The number of frames after an initialization excluded from accuracy."""
+
+SKIP_FRAMES = 5
+"""The number of frames between a failure and the following reinitialization."""
+
+EAO_INTERVAL = (100, 356)
+"""The inclusive range of sequence lengths averaged for the EAO score."""
+
+
+def calculate_overlaps(ground_truth, regions, codes) -> numpy.ndarray:
+    """Calculate the overlap of each frame of a supervised tracker run.
+
+    :param numpy.ndarray ground_truth: The (N,4) or (N,8) ground truth regions.
+    :param numpy.ndarray regions: The (N,4) or (N,8) regions reported by the
+        tracker.
+    :param numpy.ndarray codes: The (N,) status codes of the tracker results.
+    :returns: An (N,) array of overlaps. Initialization frames have an overlap
+        of 1, because the tracker is given the ground truth. Failure and skipped
+        frames are NaN.
+    :rtype: numpy.ndarray
+    """
+    overlaps, _ = vta.iou.polygon.calculate_polygon_iou(regions, ground_truth)
+    overlaps[codes == INITIALIZATION] = 1.0
+    overlaps[(codes == FAILURE) | (codes == SKIPPED)] = numpy.nan
+    return overlaps
+
+
+def calculate_accuracy(overlaps, codes, burn_in: int = BURN_IN) -> float:
+    """Calculate the VOT accuracy of one sequence.
+
+    :param numpy.ndarray overlaps: The per-frame overlaps, as returned by
+        :py:func:`calculate_overlaps`.
+    :param numpy.ndarray codes: The per-frame status codes.
+    :param int burn_in: The number of frames, starting with each
+        initialization, that are not included in the accuracy.
+    :returns: The mean overlap of the included frames, or NaN if no frame is
+        included.
+    :rtype: float
+    """
+    codes = numpy.asarray(codes)
+    excluded = numpy.zeros(codes.size + burn_in, dtype=int)
+    starts = numpy.flatnonzero(codes == INITIALIZATION)
+    numpy.add.at(excluded, starts, 1)
+    numpy.add.at(excluded, starts + burn_in, -1)
+    included = (numpy.cumsum(excluded)[: codes.size] == 0) & (codes == TRACKED)
+    if not numpy.any(included):
+        return numpy.nan
+    return float(numpy.mean(overlaps[included]))
+
+
+def count_failures(codes) -> int:
+    """Count the number of times a tracker failed.
+
+    :param numpy.ndarray codes: The per-frame status codes.
+    :returns: The number of failure frames.
+    :rtype: int
+    """
+    return int(numpy.count_nonzero(numpy.asarray(codes) == FAILURE))
+
+
+def simulate_reinitialization(
+    overlaps, skip: int = SKIP_FRAMES, threshold: float = 0.0
+) -> numpy.ndarray:
+    """Apply the VOT reinitialization protocol to an unsupervised run.
+
+    :param numpy.ndarray overlaps: The per-frame overlaps of a tracker that ran
+        once over the whole sequence without reinitialization.
+    :param int skip: The number of frames skipped after each failure.
+    :param float threshold: A frame whose overlap is not greater than this is a
+        failure.
+    :returns: An (N,) array of status codes, as if the tracker had been run
+        under VOT supervision.
+    :rtype: numpy.ndarray
+
+    The tracker is not run again, so the frames after each simulated
+    reinitialization use the regions of the original run. This is an
+    approximation of supervised evaluation. It is useful for comparing
+    trackers that only have one pass results. Each failure is found with a
+    binary search, so the cost grows with the number of failures rather than
+    the number of frames.
+    """
+    overlaps = numpy.asarray(overlaps, dtype=float)
+    codes = numpy.full(overlaps.size, TRACKED, dtype=numpy.int8)
+    failures = numpy.flatnonzero(~(overlaps > threshold))
+    start = 0
+    while start < overlaps.size:
+        codes[start] = INITIALIZATION
+        index = numpy.searchsorted(failures, start + 1)
+        if index == failures.size:
+            break
+        failure = failures[index]
+        codes[failure] = FAILURE
+        codes[failure + 1 : failure + 1 + skip] = SKIPPED
+        start = failure + 1 + skip
+    return codes
+
+
+def calculate_eao_curve(sequences, maximum_length: int) -> numpy.ndarray:
+    """Calculate the expected average overlap for every sequence length.
+
+    :param sequences: An iterable of (overlaps, codes) pairs, one per sequence.
+    :param int maximum_length: The longest sequence length to calculate.
+    :returns: An array of ``maximum_length + 1`` values. Element *n* is the
+        expected average overlap on sequences of *n* frames. Element 0, and
+        lengths that no segment covers, are NaN.
+    :rtype: numpy.ndarray
+
+    Each segment contributes the prefix sums of its overlaps to every length it
+    covers. A segment that ends with a failure also covers every longer length,
+    with a constant sum; those contributions are added with difference arrays.
+    The cost is therefore linear in the number of frames, plus the maximum
+    length, rather than their product.
+    """
+    totals = numpy.zeros(maximum_length + 2)
+    constant = numpy.zeros(maximum_length + 2)
+    counts = numpy.zeros(maximum_length + 2)
+    for overlaps, codes in sequences:
+        for segment, failed in _segments(overlaps, codes):
+            _accumulate(segment, failed, maximum_length, (totals, constant, counts))
+    totals = (totals + numpy.cumsum(constant))[: maximum_length + 1]
+    counts = numpy.cumsum(counts)[: maximum_length + 1]
+    lengths = numpy.arange(maximum_length + 1)
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        curve = totals / lengths / counts
+    curve[0] = numpy.nan
+    return curve
+
+
+def calculate_eao(curve, interval=EAO_INTERVAL) -> float:
+    """Calculate the expected average overlap score from an EAO curve.
+
+    :param numpy.ndarray curve: The curve returned by
+        :py:func:`calculate_eao_curve`.
+    :param tuple interval: The inclusive range of sequence lengths to average.
+    :returns: The mean of the curve over ``interval``, ignoring NaN values.
+    :rtype: float
+    """
+    low, high = interval
+    values = numpy.asarray(curve)[low : high + 1]
+    values = values[numpy.isfinite(values)]
+    return float(values.mean()) if values.size else numpy.nan
+
+
+def rank_trackers(accuracies, failures):
+    """Rank trackers by accuracy and by robustness.
+
+    :param numpy.ndarray accuracies: The accuracy of each tracker.
+    :param numpy.ndarray failures: The number of failures of each tracker.
+    :returns: A tuple of three arrays: the accuracy rank, the robustness rank,
+        and the mean of the two. Rank 1 is best. Tied trackers share the mean of
+        the ranks they span.
+    :rtype: tuple(numpy.ndarray, numpy.ndarray, numpy.ndarray)
+    """
+    accuracy_ranks = _rank(-numpy.asarray(accuracies, dtype=float))
+    robustness_ranks = _rank(numpy.asarray(failures, dtype=float))
+    return accuracy_ranks, robustness_ranks, (accuracy_ranks + robustness_ranks) / 2
+
+
+# -----------------------------------------------------------------------------
+#                                                       implementation details
+# -----------------------------------------------------------------------------
+def _segments(overlaps, codes):
+    """Split a sequence into the segments between initializations."""
+    overlaps = numpy.nan_to_num(numpy.asarray(overlaps, dtype=float))
+    codes = numpy.asarray(codes)
+    starts = numpy.flatnonzero(codes == INITIALIZATION)
+    ends = numpy.append(starts[1:], codes.size)
+    failures = numpy.flatnonzero(codes == FAILURE)
+    for start, end in zip(starts, ends):
+        index = numpy.searchsorted(failures, start)
+        if index < failures.size and failures[index] < end:
+            yield overlaps[start : failures[index]], True
+        else:
+            yield overlaps[start:end], False
+
+
+def _accumulate(segment, failed, maximum_length, accumulators):
+    totals, constant, counts = accumulators
+    covered = min(segment.size, maximum_length)
+    prefix = numpy.cumsum(segment[:covered])
+    totals[1 : covered + 1] += prefix
+    counts[1] += 1
+    if failed:
+        if segment.size < maximum_length:
+            constant[segment.size + 1] += prefix[-1] if covered else 0.0
+    else:
+        counts[covered + 1] -= 1
+
+
+def _rank(values):
+    _, inverse, counts = numpy.unique(values, return_inverse=True, return_counts=True)
+    first = numpy.cumsum(counts) - counts + 1
+    return (first + (counts - 1) / 2)[inverse]
@@ -0,0 +1,259 @@
+"""The entry module for the vta evaluate command."""
+
+import argparse
+import concurrent.futures
+import functools
+import json
+import os
+import os.path
+
+import vta.dataset.annotations
+import vta.dataset.cache
+import vta.evaluate.ope
+import vta.utilities.metric_store
+
+GROUND_TRUTH_FILES = ("groundtruth_rect.txt", "groundtruth.txt")
+"""The names of ground truth files, in order of preference."""
+
+
+def main(arguments):
+    """Runs the vta evaluate command.
+
+    This is the main entry point for the VTA evaluate command. It calculates
+    one pass evaluation success and precision curves for each tracker, over
+    every sequence in a data set.
+
+    :param argparse.Namespace arguments: The command line arguments, as parsed
+        by the :py:mod:`argparse` module. Run `vta evaluate --help` for details.
+    :return: An exit code following Unix command conventions. 0 indicates that
+        command processing succeeded. Any other value indicates that an error
+        occurred.
+    :rtype: int
+    """
+    try:
+        sequences = find_sequences(arguments.dataset)
+    except OSError as error:
+        print(f"error: could not read the data set: {error}")
+        return 1
+    if not sequences:
+        print("error: no sequences found in", arguments.dataset)
+        return 1
+    cache_root = None if arguments.no_cache else arguments.dataset
+    tasks = _make_tasks(arguments.trackers, sequences, cache_root)
+    try:
+        if arguments.store:
+            evaluations = _run_stored_tasks(tasks, arguments.jobs, arguments.store)
+        else:
+            evaluations = _run_tasks(tasks, arguments.jobs)
+    except (OSError, ValueError) as error:
+        print(f"error: could not evaluate the results: {error}")
+        return 1
+    summary = vta.evaluate.ope.summarize(evaluations)
+    _print_summary(summary)
+    if arguments.output:
+        _write_summary(arguments.output, summary)
+    return 0
+
+
+def make_parser(subparsers):
+    """Creates an argument parser for the VTA evaluate command.
+
+    :param subparsers: The subparsers object returned by a call to
+        :py:func:`argparse.ArgumentParser.add_subparsers`. The evaluate
+        argument parser will be added to this.
+
+    :return: Nothing
+    """
+    parser = subparsers.add_parser(
+        "evaluate",
+        help="Evaluate tracker results with OTB one pass evaluation.",
+        prog="vta evaluate",
+        description="This command calculates one pass evaluation success and"
+        " precision plots for tracker results over a data set. The data set"
+        " directory must have one subdirectory per sequence, each with a"
+        " ground truth file. Each tracker directory must have one result file"
+        " per sequence, named SEQUENCE.txt.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("dataset", help="The data set directory.", metavar="DATASET")
+    parser.add_argument(
+        "trackers",
+        help="The directories of tracker results. The name of each directory is"
+        " used as the name of the tracker.",
+        nargs="+",
+        metavar="TRACKER",
+    )
+    parser.add_argument(
+        "--jobs",
+        help="The number of processes used to evaluate sequences.",
+        type=int,
+        default=os.cpu_count(),
+    )
+    parser.add_argument(
+        "--output", help="Write the success and precision curves to this JSON file."
+    )
+    parser.add_argument(
+        "--no-cache",
+        help="Parse every annotation file, instead of using the annotation"
+        " cache in the data set directory.",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--store",
+        help="Keep the metrics of each tracker and sequence in this directory."
+        " Later evaluations only recalculate the metrics whose result files,"
+        " ground truth, or evaluation parameters changed.",
+        metavar="DIR",
+    )
+
+
+def find_sequences(dataset_directory: str) -> dict:
+    """Find the ground truth file of each sequence in a data set.
+
+    :param str dataset_directory: The data set directory. Each subdirectory that
+        contains one of the :py:data:`GROUND_TRUTH_FILES` is a sequence.
+    :returns: A dictionary mapping sequence names to ground truth file paths,
+        sorted by sequence name.
+    :rtype: dict
+    :raises OSError: if the data set directory cannot be read.
+    """
+    sequences = {}
+    with os.scandir(os.path.expanduser(dataset_directory)) as entries:
+        for entry in sorted(entries, key=lambda e: e.name):
+            if not entry.is_dir() or entry.name.startswith("."):
+                continue
+            for file_name in GROUND_TRUTH_FILES:
+                file_path = os.path.join(entry.path, file_name)
+                if os.path.isfile(file_path):
+                    sequences[entry.name] = file_path
+                    break
+    return sequences
+
+
+# -----------------------------------------------------------------------------
+#                                                       implementation details
+# -----------------------------------------------------------------------------
+def _make_tasks(tracker_directories, sequences, cache_root):
+    """Make one task per (tracker, sequence) pair.
+
+    The tasks are ordered by sequence, so that consecutive tasks given to a
+    worker process share the ground truth it has already loaded.
+    """
+    tasks = []
+    trackers = [
+        (os.path.basename(os.path.normpath(directory)), directory)
+        for directory in tracker_directories
+    ]
+    for sequence, ground_truth_path in sequences.items():
+        for tracker, tracker_directory in trackers:
+            result_path = os.path.join(tracker_directory, f"{sequence}.txt")
+            if not os.path.isfile(result_path):
+                print(f"warning: {tracker} has no results for {sequence}")
+                continue
+            tasks.append(
+                (tracker, sequence, ground_truth_path, result_path, cache_root)
+            )
+    return tasks
+
+
+def _run_tasks(tasks, jobs):
+    if jobs is None or jobs <= 1 or len(tasks) <= 1:
+        return [_evaluate_task(task) for task in tasks]
+    chunk_size = max(1, len(tasks) // (jobs * 4))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(_evaluate_task, tasks, chunksize=chunk_size))
+
+
+def _run_stored_tasks(tasks, jobs, store_directory):
+    """Run only the tasks whose metrics are missing from the store."""
+    store = vta.utilities.metric_store.MetricStore(store_directory)
+    evaluations = [
+        _stored_evaluation(task, store.get(*_store_arguments(task))) for task in tasks
+    ]
+    stale = [index for index, values in enumerate(evaluations) if values is None]
+    for index, evaluation in zip(stale, _run_tasks([tasks[i] for i in stale], jobs)):
+        evaluations[index] = evaluation
+        store.put(
+            *_store_arguments(tasks[index]),
+            {
+                "frames": evaluation.frames,
+                "success": evaluation.success,
+                "precision": evaluation.precision,
+            },
+        )
+    store.save()
+    return evaluations
+
+
+def _stored_evaluation(task, values):
+    """Make an evaluation from the values stored for a task, if there are any."""
+    if values is None:
+        return None
+    tracker, sequence = task[:2]
+    return vta.evaluate.ope.SequenceEvaluation(
+        tracker,
+        sequence,
+        int(values["frames"]),
+        values["success"],
+        values["precision"],
+    )
+
+
+def _store_arguments(task):
+    tracker, sequence, ground_truth_path, result_path, _ = task
+    return (
+        ("ope", tracker, sequence),
+        [ground_truth_path, result_path],
+        {
+            "success_thresholds": vta.evaluate.ope.SUCCESS_THRESHOLDS.tolist(),
+            "precision_thresholds": vta.evaluate.ope.PRECISION_THRESHOLDS.tolist(),
+        },
+    )
+
+
+def _evaluate_task(task):
+    tracker, sequence, ground_truth_path, result_path, cache_root = task
+    ground_truth = _load_ground_truth(ground_truth_path, cache_root)
+    if cache_root is None:
+        results, _ = vta.dataset.annotations.read_results(result_path)
+    else:
+        results, _ = vta.dataset.cache.AnnotationCache(cache_root).results(result_path)
+    frames, success, precision = vta.evaluate.ope.evaluate_sequence(
+        ground_truth, results
+    )
+    return vta.evaluate.ope.SequenceEvaluation(
+        tracker, sequence, frames, success, precision
+    )
+
+
+@functools.lru_cache(maxsize=16)
+def _load_ground_truth(file_path, cache_root):
+    if cache_root is None:
+        return vta.dataset.annotations.read_groundtruth(file_path)
+    return vta.dataset.cache.AnnotationCache(cache_root).groundtruth(file_path)
+
+
+def _print_summary(summary):
+    print(f"{'Tracker':<30} {'Success AUC':>12} {'Precision':>10} {'Sequences':>10}")
+    ranked = sorted(summary.items(), key=lambda item: item[1]["auc"], reverse=True)
+    for tracker, result in ranked:
+        print(
+            f"{tracker:<30} {result['auc']:>12.3f} {result['precision_score']:>10.3f}"
+            f" {result['sequences']:>10}"
+        )
+
+
+def _write_summary(file_path, summary):
+    document = {
+        "success_thresholds": vta.evaluate.ope.SUCCESS_THRESHOLDS.tolist(),
+        "precision_thresholds": vta.evaluate.ope.PRECISION_THRESHOLDS.tolist(),
+        "trackers": {
+            tracker: {
+                key: value.tolist() if hasattr(value, "tolist") else value
+                for key, value in result.items()
+            }
+            for tracker, result in summary.items()
+        },
+    }
+    with open(file_path, "w") as summary_file:
+        json.dump(document, summary_file, indent=2)
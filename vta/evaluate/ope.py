@@ -0,0 +1,167 @@
+"""Functions for one pass evaluation (OPE) of trackers.
+
+One pass evaluation, introduced by the OTB benchmark, runs a tracker once over
+each sequence and summarizes its results with two curves:
+
+:success: The fraction of frames in which the IoU of the tracker's box and the
+    ground truth exceeds a threshold, for thresholds from 0 to 1. The area under
+    this curve (AUC) ranks trackers.
+:precision: The fraction of frames in which the distance between the centers of
+    the tracker's box and the ground truth is within a threshold, for
+    thresholds from 0 to 50 pixels. The value at 20 pixels ranks trackers.
+
+Each curve is calculated from one sorted copy of the per-frame values, so the
+cost does not depend on the number of thresholds.
+"""
+
+import numpy
+
+import vta.iou.bounding_box
+import vta.iou.center_error
+import vta.iou.polygon
+
+SUCCESS_THRESHOLDS = numpy.linspace(0.0, 1.0, 21)
+"""The IoU thresholds of the OTB success plot."""
+
+PRECISION_THRESHOLDS = numpy.arange(0.0, 51.0)
+"""The center error thresholds, in pixels, of the OTB precision plot."""
+
+PRECISION_RANK_THRESHOLD = 20.0
+"""The center error threshold used to rank trackers by precision."""
+
+
+class SequenceEvaluation:
+    """Encapsulates the evaluation of one tracker on one sequence.
+
+    .. py:attribute:: tracker
+        The name of the tracker.
+
+    .. py:attribute:: sequence
+        The name of the sequence.
+
+    .. py:attribute:: frames
+        The number of frames evaluated.
+
+    .. py:attribute:: success
+        The success curve, sampled at :py:data:`SUCCESS_THRESHOLDS`.
+
+    .. py:attribute:: precision
+        The precision curve, sampled at :py:data:`PRECISION_THRESHOLDS`.
+    """
+
+    def __init__(
+        self,
+        tracker: str,
+        sequence: str,
+        frames: int,
+        success: numpy.ndarray,
+        precision: numpy.ndarray,
+    ):  # pylint: disable=too-many-arguments
+        self.tracker = tracker
+        self.sequence = sequence
+        self.frames = frames
+        self.success = success
+        self.precision = precision
+
+
+def calculate_success_curve(overlaps, thresholds=SUCCESS_THRESHOLDS) -> numpy.ndarray:
+    """Calculate the fraction of overlaps greater than each threshold.
+
+    :param numpy.ndarray overlaps: The per-frame IoU values.
+    :param numpy.ndarray thresholds: The thresholds at which to sample the
+        curve.
+    :returns: An array with one success rate per threshold. If there are no
+        overlaps, every rate is 0.
+    :rtype: numpy.ndarray
+    """
+    overlaps = numpy.sort(numpy.asarray(overlaps, dtype=float))
+    if overlaps.size == 0:
+        return numpy.zeros(len(thresholds))
+    passed = overlaps.size - numpy.searchsorted(overlaps, thresholds, side="right")
+    return passed / overlaps.size
+
+
+def calculate_precision_curve(errors, thresholds=PRECISION_THRESHOLDS) -> numpy.ndarray:
+    """Calculate the fraction of center errors within each threshold.
+
+    :param numpy.ndarray errors: The per-frame center errors. Frames in which
+        the tracker has no box should have an error of infinity.
+    :param numpy.ndarray thresholds: The thresholds at which to sample the
+        curve.
+    :returns: An array with one precision per threshold. If there are no
+        errors, every precision is 0.
+    :rtype: numpy.ndarray
+    """
+    return vta.iou.center_error.calculate_threshold_curve(errors, thresholds)
+
+
+def evaluate_sequence(ground_truth, results):
+    """Calculate the success and precision curves of one sequence.
+
+    :param numpy.ndarray ground_truth: The (N,4) or (N,8) ground truth regions.
+    :param numpy.ndarray results: The tracker's (M,4) or (M,8) regions. If M is
+        less than N, the missing frames count as failures. Extra frames are
+        ignored.
+    :returns: A tuple of the number of frames evaluated, the success curve, and
+        the precision curve. Frames with no valid ground truth are not
+        evaluated.
+    :rtype: tuple(int, numpy.ndarray, numpy.ndarray)
+    """
+    ground_truth, results = _align(ground_truth, results)
+    overlaps = _calculate_overlaps(ground_truth, results)
+    errors = vta.iou.center_error.calculate_center_error(results, ground_truth)
+    return (
+        overlaps.size,
+        calculate_success_curve(overlaps),
+        calculate_precision_curve(errors),
+    )
+
+
+def summarize(evaluations):
+    """Average per-sequence evaluations into one result per tracker.
+
+    :param evaluations: An iterable of :py:class:`SequenceEvaluation` objects.
+    :returns: A dictionary mapping each tracker name to a dictionary with the
+        keys ``success`` and ``precision`` (the mean curves over sequences),
+        ``auc`` (the area under the success curve), ``precision_score`` (the
+        precision at :py:data:`PRECISION_RANK_THRESHOLD`), and ``sequences``
+        (the number of sequences averaged).
+    :rtype: dict
+    """
+    grouped = {}
+    for evaluation in evaluations:
+        grouped.setdefault(evaluation.tracker, []).append(evaluation)
+    rank_index = numpy.searchsorted(PRECISION_THRESHOLDS, PRECISION_RANK_THRESHOLD)
+    summary = {}
+    for tracker, tracker_evaluations in grouped.items():
+        success = numpy.mean([e.success for e in tracker_evaluations], axis=0)
+        precision = numpy.mean([e.precision for e in tracker_evaluations], axis=0)
+        summary[tracker] = {
+            "success": success,
+            "precision": precision,
+            "auc": float(success.mean()),
+            "precision_score": float(precision[rank_index]),
+            "sequences": len(tracker_evaluations),
+        }
+    return summary
+
+
+# -----------------------------------------------------------------------------
+#                                                       implementation details
+# -----------------------------------------------------------------------------
+def _align(ground_truth, results):
+    ground_truth = numpy.asarray(ground_truth, dtype=float)
+    results = numpy.asarray(results, dtype=float)[: ground_truth.shape[0]]
+    if results.shape[0] < ground_truth.shape[0]:
+        missing = numpy.full(
+            (ground_truth.shape[0] - results.shape[0], results.shape[1]), numpy.nan
+        )
+        results = numpy.concatenate((results, missing))
+    valid = numpy.all(numpy.isfinite(ground_truth), axis=1)
+    return ground_truth[valid], results[valid]
+
+
+def _calculate_overlaps(ground_truth, results):
+    if ground_truth.shape[1] == 4 and results.shape[1] == 4:
+        return vta.iou.bounding_box.calculate_iou_batch(results, ground_truth)
+    return vta.iou.polygon.calculate_polygon_iou(results, ground_truth)[0]
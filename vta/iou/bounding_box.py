@@ -1,9 +1,21 @@
-"""Provides the BoundingBox class and related algorithms."""
+"""Provides the BoundingBox class and related algorithms.
+
+The scalar functions in this module work with one pair of
+:py:class:`BoundingBox` objects at a time. The batch functions work with NumPy
+arrays of boxes. Each row of such an array is one box, stored as
+``[x, y, width, height]``; the (x, y) coordinate is the upper left corner of the
+box. This is the same layout used by the annotation files of common tracking
+data sets.
+"""
+
+import numpy
 
 
 class Point:
     """Encapsulates a Cartesian (x,y) point."""
 
+    __slots__ = ("__x", "__y")
+
     def __init__(self, x=0, y=0):
         self.__x = x
         self.__y = y
@@ -22,6 +34,8 @@ class Point:
 class Size:
     """Encapsulates a size in two dimensions."""
 
+    __slots__ = ("__width", "__height")
+
     def __init__(self, width=0, height=0):
         self.__width = width
         self.__height = height
@@ -40,6 +54,8 @@ class Size:
 class BoundingBox:
     """Defines a bounding box."""
 
+    __slots__ = ("__upper_left_corner", "__size", "__area")
+
     def __init__(self, upper_left_corner: Point, size: Size):
         self.__upper_left_corner = upper_left_corner
         self.__size = size
@@ -61,15 +77,95 @@ class BoundingBox:
         return self.__area
 
 
-def calculate_iou(a: BoundingBox, b: BoundingBox) -> float:
+def calculate_iou(a, b) -> float:
     """Calculate the intersection-over-union of two bounding boxes.
 
-    :param BoundingBox a: The first bounding box.
-    :param BoundingBox b: The second Bounding box.
-    :returns iou: The intersection-over-union value of ``a`` and ``b``.
+    :param a: The first box, as a :py:class:`BoundingBox`, or as a
+        ``[x, y, width, height]`` :py:class:`numpy.ndarray` of one box.
+    :param b: The second box, in either form.
+    :returns iou: The intersection-over-union value of ``a`` and ``b``. A pair
+        of boxes with no area at all has an IoU of 0.
     :rtype: float
+    :raises ValueError: if an array does not hold exactly one box.
+
+    If either box is an array, this is a wrapper around
+    :py:func:`calculate_iou_batch`. Two :py:class:`BoundingBox` objects are
+    instead compared with plain Python arithmetic, following the same formula:
+    per-frame code calls this once per pair, and building arrays for one pair
+    is several times slower than the whole calculation. Use
+    :py:func:`calculate_iou_batch` directly when you have more than one pair of
+    boxes.
+    """
+    if not isinstance(a, numpy.ndarray) and not isinstance(b, numpy.ndarray):
+        return _calculate_iou_boxes(_box_values(a), _box_values(b))
+    a = _as_box_array(a) if isinstance(a, numpy.ndarray) else box_to_array(a)
+    b = _as_box_array(b) if isinstance(b, numpy.ndarray) else box_to_array(b)
+    if a.shape[0] != 1 or b.shape[0] != 1:
+        raise ValueError("expected one box in each array")
+    return float(calculate_iou_batch(a, b)[0])
+
+
+def calculate_iou_batch(predicted, ground_truth) -> numpy.ndarray:
+    """Calculate the intersection-over-union of corresponding boxes.
+
+    :param numpy.ndarray predicted: An (N,4) array of boxes, typically the
+        output of a tracker.
+    :param numpy.ndarray ground_truth: An (N,4) array of boxes, typically the
+        ground truth annotations. Row *i* of this array is compared to row *i*
+        of ``predicted``.
+    :returns: An (N,) array of IoU values. A pair of boxes with no area at all
+        has an IoU of 0.
+    :rtype: numpy.ndarray
+    :raises ValueError: if the arrays do not have the same number of boxes.
+
+    .. code-block:: python
+
+        predicted = numpy.array([[5, 10, 5, 20], [15, 5, 15, 20]])
+        ground_truth = numpy.array([[7, 5, 15, 20], [5, 10, 5, 20]])
+        calculate_iou_batch(predicted, ground_truth)  # [0.1268, 0.0]
+    """
+    predicted = _as_box_array(predicted)
+    ground_truth = _as_box_array(ground_truth)
+    if predicted.shape != ground_truth.shape:
+        raise ValueError(
+            f"cannot compare {predicted.shape[0]} boxes to"
+            f" {ground_truth.shape[0]} boxes"
+        )
+    return _calculate_iou_arrays(predicted, ground_truth)
+
+
+def calculate_iou_matrix(a, b) -> numpy.ndarray:
+    """Calculate the intersection-over-union of every pair of boxes.
+
+    :param numpy.ndarray a: An (N,4) array of boxes.
+    :param numpy.ndarray b: An (M,4) array of boxes.
+    :returns: An (N,M) array. Element *(i, j)* is the IoU of ``a[i]`` and
+        ``b[j]``.
+    :rtype: numpy.ndarray
+    """
+    a = _as_box_array(a)
+    b = _as_box_array(b)
+    return _calculate_iou_arrays(a[:, numpy.newaxis, :], b[numpy.newaxis, :, :])
+
+
+def box_to_array(box: BoundingBox) -> numpy.ndarray:
+    """Convert a bounding box to a (1,4) array for the batch functions.
+
+    :param BoundingBox box: The bounding box to convert.
+    :returns: The array ``[[x, y, width, height]]``.
+    :rtype: numpy.ndarray
     """
-    return float(calculate_intersection(a, b)) / float(calculate_union(a, b))
+    return numpy.array(
+        [
+            [
+                box.upper_left_corner.x,
+                box.upper_left_corner.y,
+                box.size.width,
+                box.size.height,
+            ]
+        ],
+        dtype=float,
+    )
 
 
 def calculate_intersection(a: BoundingBox, b: BoundingBox) -> int:
@@ -100,3 +196,47 @@ def calculate_union(a: BoundingBox, b: BoundingBox) -> int:
     :rtype: int
     """
     return a.area + b.area - calculate_intersection(a, b)
+
+
+# -----------------------------------------------------------------------------
+#                                                       implementation details
+# -----------------------------------------------------------------------------
+def _as_box_array(boxes) -> numpy.ndarray:
+    boxes = numpy.asarray(boxes, dtype=float)
+    if boxes.ndim == 1:
+        boxes = boxes.reshape(1, -1)
+    if boxes.ndim != 2 or boxes.shape[1] != 4:
+        raise ValueError(f"expected an (N,4) array of boxes, not {boxes.shape}")
+    return boxes
+
+
+def _box_values(box):
+    corner = box.upper_left_corner
+    size = box.size
+    return corner.x, corner.y, size.width, size.height
+
+
+def _calculate_iou_boxes(a, b):
+    """Calculate IoU for two ``(x, y, width, height)`` tuples.
+
+    This must stay the same formula as :py:func:`_calculate_iou_arrays`; the
+    unit tests compare the two.
+    """
+    width = min(a[0] + a[2], b[0] + b[2]) - max(a[0], b[0])
+    height = min(a[1] + a[3], b[1] + b[3]) - max(a[1], b[1])
+    intersection = max(width, 0.0) * max(height, 0.0)
+    union = a[2] * a[3] + b[2] * b[3] - intersection
+    return float(intersection / union) if union > 0 else 0.0
+
+
+def _calculate_iou_arrays(a, b):
+    """Calculate IoU for two broadcast compatible arrays of boxes."""
+    width = numpy.minimum(a[..., 0] + a[..., 2], b[..., 0] + b[..., 2])
+    width -= numpy.maximum(a[..., 0], b[..., 0])
+    height = numpy.minimum(a[..., 1] + a[..., 3], b[..., 1] + b[..., 3])
+    height -= numpy.maximum(a[..., 1], b[..., 1])
+    intersection = numpy.clip(width, 0, None) * numpy.clip(height, 0, None)
+    union = a[..., 2] * a[..., 3] + b[..., 2] * b[..., 3] - intersection
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        iou = intersection / union
+    return numpy.where(union > 0, iou, 0.0)
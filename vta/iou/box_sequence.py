@@ -0,0 +1,188 @@
+"""Provides the BoxSequence class for storing a trajectory of boxes.
+
+A :py:class:`BoxSequence` stores every box of a trajectory in a single (N,4)
+NumPy array, using the ``[x, y, width, height]`` layout of
+:py:mod:`vta.iou.bounding_box`. Individual frames are exposed as
+:py:class:`BoxView` objects, which provide the same interface as
+:py:class:`vta.iou.bounding_box.BoundingBox` without copying any data.
+
+.. code-block:: python
+
+    import numpy
+    from vta.iou.box_sequence import BoxSequence
+
+    trajectory = BoxSequence(numpy.loadtxt("groundtruth_rect.txt", delimiter=","))
+    first_half = trajectory[: len(trajectory) // 2]  # No data is copied.
+    print(trajectory[0].upper_left_corner.x, first_half.area.mean())
+"""
+
+import operator
+
+import numpy
+
+from vta.iou.bounding_box import BoundingBox, Point, Size
+
+
+class BoxView:
+    """A view of one row of a :py:class:`BoxSequence`.
+
+    This has the same interface as
+    :py:class:`vta.iou.bounding_box.BoundingBox`, so it can be passed to any
+    function that expects one. The :py:class:`~vta.iou.bounding_box.Point` and
+    :py:class:`~vta.iou.bounding_box.Size` objects are created when they are
+    requested; they are not stored. Changes to the underlying array are visible
+    through the view.
+    """
+
+    __slots__ = ("__row",)
+
+    def __init__(self, row: numpy.ndarray):
+        self.__row = row
+
+    @property
+    def upper_left_corner(self) -> Point:
+        """Get the location of the upper left corner of the bounding box."""
+        return Point(self.__row[0].item(), self.__row[1].item())
+
+    @property
+    def size(self) -> Size:
+        """Get the size of the bounding box."""
+        return Size(self.__row[2].item(), self.__row[3].item())
+
+    @property
+    def area(self) -> float:
+        """Get the area of the bounding box."""
+        return (self.__row[2] * self.__row[3]).item()
+
+    def to_bounding_box(self) -> BoundingBox:
+        """Copy the view into an independent bounding box object.
+
+        :returns: A bounding box with the same corner and size as the view.
+        :rtype: BoundingBox
+        """
+        return BoundingBox(self.upper_left_corner, self.size)
+
+
+class BoxSequence:
+    """A trajectory of bounding boxes backed by one (N,4) array.
+
+    :param boxes: The boxes of the trajectory. This can be anything that NumPy
+        can convert to an (N,4) array, including another
+        :py:class:`BoxSequence`.
+    :param dtype: The floating point type used to store the boxes. This must be
+        ``numpy.float32`` or ``numpy.float64``. If it is ``None``, float32 and
+        float64 input is stored as is, and anything else is stored as float64.
+    :raises ValueError: if ``boxes`` is not an (N,4) array, or if ``dtype`` is
+        not a supported type.
+
+    If ``boxes`` is already a NumPy array of the requested type, it is used
+    directly instead of being copied. Indexing a sequence with an integer
+    returns a :py:class:`BoxView`. Indexing it with a slice returns a new
+    :py:class:`BoxSequence` that shares memory with the original, and indexing
+    it with an array or list of indices, or a boolean mask, returns a new
+    :py:class:`BoxSequence` of copies of the selected boxes.
+
+    A :py:class:`BoxSequence` can be used anywhere a NumPy array of boxes is
+    expected, such as :py:func:`vta.iou.bounding_box.calculate_iou_batch`.
+    """
+
+    __slots__ = ("__boxes",)
+
+    def __init__(self, boxes, dtype=None):
+        if dtype is None:
+            dtype = getattr(boxes, "dtype", None)
+            if dtype is None or dtype not in _DTYPES:
+                dtype = numpy.float64
+        elif numpy.dtype(dtype) not in _DTYPES:
+            raise ValueError(f"BoxSequence cannot store boxes as {dtype}")
+        boxes = numpy.asarray(boxes, dtype=dtype)
+        if boxes.ndim == 1 and boxes.size == 0:
+            boxes = boxes.reshape(0, 4)
+        if boxes.ndim != 2 or boxes.shape[1] != 4:
+            raise ValueError(f"expected an (N,4) array of boxes, not {boxes.shape}")
+        self.__boxes = boxes
+
+    @classmethod
+    def from_bounding_boxes(cls, boxes, dtype=numpy.float64):
+        """Create a sequence from bounding box objects.
+
+        :param boxes: An iterable of
+            :py:class:`~vta.iou.bounding_box.BoundingBox` objects.
+        :param dtype: The floating point type used to store the boxes.
+        :returns: A new sequence holding a copy of each box.
+        :rtype: BoxSequence
+        """
+        return cls(
+            [
+                [
+                    box.upper_left_corner.x,
+                    box.upper_left_corner.y,
+                    box.size.width,
+                    box.size.height,
+                ]
+                for box in boxes
+            ],
+            dtype,
+        )
+
+    @property
+    def boxes(self) -> numpy.ndarray:
+        """Get the (N,4) array that stores the boxes."""
+        return self.__boxes
+
+    @property
+    def dtype(self) -> numpy.dtype:
+        """Get the type used to store the boxes."""
+        return self.__boxes.dtype
+
+    @property
+    def area(self) -> numpy.ndarray:
+        """Get an (N,) array of the area of every box."""
+        return self.__boxes[:, 2] * self.__boxes[:, 3]
+
+    @property
+    def center(self) -> numpy.ndarray:
+        """Get an (N,2) array of the (x, y) center of every box."""
+        return self.__boxes[:, 0:2] + self.__boxes[:, 2:4] / 2
+
+    def clip(self, width, height) -> "BoxSequence":
+        """Clip every box to the bounds of an image.
+
+        :param width: The width of the image.
+        :param height: The height of the image.
+        :returns: A new sequence in which every box lies inside the rectangle
+            from (0, 0) to (``width``, ``height``). A box that lies entirely
+            outside the image becomes a box with no area on the image border.
+        :rtype: BoxSequence
+        """
+        limits = numpy.array([width, height], dtype=self.dtype)
+        upper_left = numpy.clip(self.__boxes[:, 0:2], 0, limits)
+        lower_right = numpy.clip(self.__boxes[:, 0:2] + self.__boxes[:, 2:4], 0, limits)
+        return BoxSequence(
+            numpy.concatenate((upper_left, lower_right - upper_left), axis=1)
+        )
+
+    def __len__(self):
+        return self.__boxes.shape[0]
+
+    def __getitem__(self, index):
+        try:
+            row = operator.index(index)
+        except TypeError:
+            return BoxSequence(self.__boxes[index])
+        return BoxView(self.__boxes[row])
+
+    def __iter__(self):
+        for row in self.__boxes:
+            yield BoxView(row)
+
+    def __array__(self, dtype=None, copy=None):
+        if copy:
+            return numpy.array(self.__boxes, dtype=dtype)
+        return numpy.asarray(self.__boxes, dtype=dtype)
+
+
+# -----------------------------------------------------------------------------
+#                                                       implementation details
+# -----------------------------------------------------------------------------
+_DTYPES = (numpy.dtype(numpy.float32), numpy.dtype(numpy.float64))
@@ -0,0 +1,136 @@
+"""Provides center location error for batches of regions.
+
+Center location error is the distance, in pixels, between the center of a
+tracker's region and the center of the ground truth. The OTB precision plot is
+built from it. Normalized center error first divides the difference of the
+centers by the width and height of the ground truth, as LaSOT and TrackingNet
+normalized precision do, so that small and large targets are judged alike.
+
+Every function works on whole sequences at once. Regions are (N,4) arrays of
+``[x, y, width, height]`` boxes, or (N,8) arrays of polygons, as in
+:py:mod:`vta.iou.polygon`. The size of a polygon is the size of its axis aligned
+bounding box.
+
+.. code-block:: python
+
+    errors = calculate_center_error(results, ground_truth)
+    precision = calculate_threshold_curve(errors, numpy.arange(0.0, 51.0))
+"""
+
+import numpy
+
+from vta.iou.polygon import polygon_to_rectangle
+
+NORMALIZED_THRESHOLDS = numpy.linspace(0.0, 0.5, 51)
+"""The normalized center error thresholds of the LaSOT normalized precision
+plot."""
+
+
+def calculate_centers(regions) -> numpy.ndarray:
+    """Calculate the centers of regions.
+
+    :param numpy.ndarray regions: An (N,4) array of boxes, or an (N,8) array of
+        polygons.
+    :returns: An (N,2) array of ``[x, y]`` centers. The center of a polygon is
+        the mean of its corners.
+    :rtype: numpy.ndarray
+    :raises ValueError: if the array is not an array of boxes or polygons.
+    """
+    regions = _as_regions(regions)
+    if regions.shape[1] == 4:
+        return regions[:, 0:2] + regions[:, 2:4] / 2
+    return regions.reshape(-1, 4, 2).mean(axis=1)
+
+
+def calculate_center_error(predicted, ground_truth) -> numpy.ndarray:
+    """Calculate the distance between the centers of corresponding regions.
+
+    :param numpy.ndarray predicted: An (N,4) or (N,8) array of regions,
+        typically the output of a tracker.
+    :param numpy.ndarray ground_truth: An (N,4) or (N,8) array of regions. Row
+        *i* of this array is compared to row *i* of ``predicted``.
+    :returns: An (N,) array of distances, in pixels. Frames in which either
+        region has NaN coordinates, such as frames in which a tracker failed,
+        have an error of infinity, so they fail every threshold.
+    :rtype: numpy.ndarray
+    :raises ValueError: if the arrays do not have the same number of regions.
+    """
+    offsets = _center_offsets(predicted, ground_truth)
+    return _finite_or_inf(numpy.hypot(offsets[:, 0], offsets[:, 1]))
+
+
+def calculate_normalized_center_error(predicted, ground_truth) -> numpy.ndarray:
+    """Calculate the distance between centers, relative to the ground truth size.
+
+    The difference of the centers is divided by the width and the height of
+    the ground truth before its length is taken.
+
+    :param numpy.ndarray predicted: An (N,4) or (N,8) array of regions.
+    :param numpy.ndarray ground_truth: An (N,4) or (N,8) array of regions. Row
+        *i* of this array is compared to row *i* of ``predicted``.
+    :returns: An (N,) array of normalized distances. A distance of 0.5 means
+        that the centers are half the size of the ground truth apart. Frames in
+        which either region has NaN coordinates, or in which the ground truth
+        has no width or no height, have an error of infinity.
+    :rtype: numpy.ndarray
+    :raises ValueError: if the arrays do not have the same number of regions.
+    """
+    offsets = _center_offsets(predicted, ground_truth)
+    sizes = _sizes(_as_regions(ground_truth))
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        scaled = offsets / sizes
+        errors = numpy.hypot(scaled[:, 0], scaled[:, 1])
+    return _finite_or_inf(numpy.where(numpy.all(sizes > 0, axis=1), errors, numpy.inf))
+
+
+def calculate_threshold_curve(errors, thresholds) -> numpy.ndarray:
+    """Calculate the fraction of errors within each threshold.
+
+    The errors are sorted once, and every threshold is located in them with one
+    call to :py:func:`numpy.searchsorted`; so the cost barely depends on the
+    number of thresholds.
+
+    :param numpy.ndarray errors: The per-frame errors.
+    :param numpy.ndarray thresholds: The thresholds at which to sample the
+        curve.
+    :returns: An array with the fraction of errors less than or equal to each
+        threshold. If there are no errors, every fraction is 0.
+    :rtype: numpy.ndarray
+    """
+    errors = numpy.sort(numpy.asarray(errors, dtype=float).ravel())
+    if errors.size == 0:
+        return numpy.zeros(len(thresholds))
+    return numpy.searchsorted(errors, thresholds, side="right") / errors.size
+
+
+# -----------------------------------------------------------------------------
+#                                                       implementation details
+# -----------------------------------------------------------------------------
+def _as_regions(regions):
+    regions = numpy.asarray(regions, dtype=float)
+    if regions.ndim == 1:
+        regions = regions.reshape(1, -1)
+    if regions.ndim != 2 or regions.shape[1] not in (4, 8):
+        raise ValueError(f"expected an (N,4) or (N,8) array, not {regions.shape}")
+    return regions
+
+
+def _center_offsets(predicted, ground_truth):
+    predicted = calculate_centers(predicted)
+    ground_truth = calculate_centers(ground_truth)
+    if predicted.shape != ground_truth.shape:
+        raise ValueError(
+            f"cannot compare {predicted.shape[0]} regions to"
+            f" {ground_truth.shape[0]} regions"
+        )
+    return predicted - ground_truth
+
+
+def _sizes(regions):
+    if regions.shape[1] == 8:
+        regions = polygon_to_rectangle(regions)
+    return regions[:, 2:4]
+
+
+def _finite_or_inf(errors):
+    return numpy.where(numpy.isnan(errors), numpy.inf, errors)
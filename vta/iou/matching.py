@@ -0,0 +1,254 @@
+"""Provides one-to-one matching of predicted boxes to ground truth boxes.
+
+Multiple object trackers, and trackers that report several candidates, output
+any number of boxes per frame. To score them, each predicted box is matched to
+at most one ground truth box of the same frame, and vice versa, so that the
+total IoU of the matched pairs is as large as possible. This is the assignment
+problem, which is solved with the Hungarian algorithm of
+:py:func:`scipy.optimize.linear_sum_assignment`.
+
+A whole sequence is matched at once. Boxes are given as (N,4) arrays, in the
+layout of :py:mod:`vta.iou.bounding_box`, with the frame number of each box in
+a separate array. Most boxes overlap few others, so the work is kept small:
+
+#. The pairs of boxes that overlap are found with a sort and sweep over the x
+   intervals of the boxes. The IoU of other pairs is never calculated.
+#. A pair whose boxes are in no other pair, which is the usual case, is matched
+   without solving anything.
+#. The assignment problem is solved only for the frames that are left, and
+   only with the boxes that take part in more than one pair.
+
+.. code-block:: python
+
+    matches = match_sequence(boxes, box_frames, ground_truth, ground_truth_frames)
+    true_positives = len(matches)
+"""
+
+import numpy
+import scipy.optimize
+
+from vta.iou.bounding_box import calculate_iou_batch, calculate_iou_matrix
+
+
+class Matches:
+    """Matched pairs of predicted and ground truth boxes.
+
+    Each attribute is an array with one element per pair, ordered by the index
+    of the predicted box.
+
+    .. py:attribute:: predicted
+        The index of the predicted box of each pair.
+
+    .. py:attribute:: ground_truth
+        The index of the ground truth box of each pair.
+
+    .. py:attribute:: iou
+        The intersection-over-union of each pair.
+
+    .. py:attribute:: frames
+        The frame of each pair.
+    """
+
+    def __init__(self, predicted, ground_truth, iou, frames):
+        self.predicted = predicted
+        self.ground_truth = ground_truth
+        self.iou = iou
+        self.frames = frames
+
+    def __len__(self) -> int:
+        """Get the number of matched pairs."""
+        return len(self.predicted)
+
+
+def find_overlapping_pairs(a, b, a_frames=None, b_frames=None) -> tuple:
+    """Find the pairs of boxes that overlap, with a sort and sweep.
+
+    The boxes of ``b`` are sorted by frame, then by their left edge. For each
+    box of ``a``, a binary search then bounds the boxes of ``b`` whose x
+    intervals could overlap it, and only those are tested.
+
+    :param numpy.ndarray a: An (N,4) array of boxes.
+    :param numpy.ndarray b: An (M,4) array of boxes.
+    :param numpy.ndarray a_frames: The frame of each box of ``a``. If it is
+        ``None``, every box is in the same frame.
+    :param numpy.ndarray b_frames: The frame of each box of ``b``.
+    :returns: A tuple of two arrays, with the index in ``a`` and the index in
+        ``b`` of each pair of boxes in the same frame with an intersection
+        larger than 0. Boxes with no area, or with coordinates that are not
+        finite, are in no pair.
+    :rtype: tuple(numpy.ndarray, numpy.ndarray)
+    :raises ValueError: if an array is not an array of boxes, or if the frames
+        do not match the boxes.
+    """
+    a, a_frames = _as_boxes(a, a_frames)
+    b, b_frames = _as_boxes(b, b_frames)
+    a_rows = numpy.flatnonzero(_is_valid(a))
+    b_rows = numpy.flatnonzero(_is_valid(b))
+    if a_rows.size == 0 or b_rows.size == 0:
+        return numpy.zeros(0, dtype=numpy.intp), numpy.zeros(0, dtype=numpy.intp)
+    a_keys, b_keys, widest = _sweep_keys(a[a_rows], a_frames[a_rows], b, b_frames)
+    b_rows = b_rows[numpy.argsort(b_keys[b_rows], kind="stable")]
+    rows, columns = _sweep(a_keys, a[a_rows, 2], b_keys[b_rows], widest)
+    rows, columns = a_rows[rows], b_rows[columns]
+    overlap = (a_frames[rows] == b_frames[columns]) & _intersect(a[rows], b[columns])
+    return rows[overlap], columns[overlap]
+
+
+def match_sequence(
+    predicted, predicted_frames, ground_truth, ground_truth_frames, threshold=0.5
+) -> Matches:
+    """Match the predicted boxes to the ground truth boxes of each frame.
+
+    :param numpy.ndarray predicted: An (N,4) array of predicted boxes, from any
+        number of frames.
+    :param numpy.ndarray predicted_frames: The (N,) frame numbers of the
+        predicted boxes.
+    :param numpy.ndarray ground_truth: An (M,4) array of ground truth boxes.
+    :param numpy.ndarray ground_truth_frames: The (M,) frame numbers of the
+        ground truth boxes.
+    :param float threshold: The smallest IoU of a matched pair. Pairs whose
+        boxes do not overlap are never matched, even if this is 0.
+    :returns: The pairs that maximize the total IoU in each frame.
+    :rtype: Matches
+    :raises ValueError: if an array is not an array of boxes, or if the frames
+        do not match the boxes.
+    """
+    predicted, predicted_frames = _as_boxes(predicted, predicted_frames)
+    ground_truth, ground_truth_frames = _as_boxes(ground_truth, ground_truth_frames)
+    rows, columns = find_overlapping_pairs(
+        predicted, ground_truth, predicted_frames, ground_truth_frames
+    )
+    iou = calculate_iou_batch(predicted[rows], ground_truth[columns])
+    eligible = iou >= threshold
+    rows, columns, iou = rows[eligible], columns[eligible], iou[eligible]
+    isolated = (_degrees(rows, len(predicted)) == 1) & (
+        _degrees(columns, len(ground_truth)) == 1
+    )
+    pairs = [(rows[isolated], columns[isolated])]
+    pairs.extend(
+        _assign(predicted, ground_truth, frame_rows, frame_columns, threshold)
+        for frame_rows, frame_columns in _group_by_frame(
+            rows[~isolated], columns[~isolated], predicted_frames
+        )
+    )
+    rows = numpy.concatenate([p[0] for p in pairs])
+    columns = numpy.concatenate([p[1] for p in pairs])
+    order = numpy.argsort(rows, kind="stable")
+    rows, columns = rows[order], columns[order]
+    return Matches(
+        rows,
+        columns,
+        calculate_iou_batch(predicted[rows], ground_truth[columns]),
+        predicted_frames[rows],
+    )
+
+
+def match_boxes(predicted, ground_truth, threshold=0.5) -> Matches:
+    """Match the predicted boxes of one frame to its ground truth boxes.
+
+    :param numpy.ndarray predicted: An (N,4) array of predicted boxes.
+    :param numpy.ndarray ground_truth: An (M,4) array of ground truth boxes.
+    :param float threshold: The smallest IoU of a matched pair.
+    :returns: The pairs that maximize the total IoU. Every frame is 0.
+    :rtype: Matches
+    :raises ValueError: if an array is not an array of boxes.
+    """
+    predicted, predicted_frames = _as_boxes(predicted, None)
+    ground_truth, ground_truth_frames = _as_boxes(ground_truth, None)
+    return match_sequence(
+        predicted, predicted_frames, ground_truth, ground_truth_frames, threshold
+    )
+
+
+# -----------------------------------------------------------------------------
+#                                                       implementation details
+# -----------------------------------------------------------------------------
+def _as_boxes(boxes, frames):
+    boxes = numpy.asarray(boxes, dtype=float)
+    if boxes.ndim == 1 and boxes.size == 0:
+        boxes = boxes.reshape(0, 4)
+    if boxes.ndim != 2 or boxes.shape[1] != 4:
+        raise ValueError(f"expected an (N,4) array of boxes, not {boxes.shape}")
+    if frames is None:
+        return boxes, numpy.zeros(len(boxes), dtype=numpy.int64)
+    frames = numpy.asarray(frames, dtype=numpy.int64)
+    if frames.shape != (len(boxes),):
+        raise ValueError(f"expected {len(boxes)} frame numbers, not {frames.shape}")
+    return boxes, frames
+
+
+def _is_valid(boxes):
+    return numpy.all(numpy.isfinite(boxes), axis=1) & numpy.all(
+        boxes[:, 2:4] > 0, axis=1
+    )
+
+
+def _sweep_keys(a, a_frames, b, b_frames):
+    """Return sort keys of the frame and the left edge of each box.
+
+    The frames are spaced far enough apart that no box of one frame is within
+    the sweep of a box of another frame.
+    """
+    valid = _is_valid(b)
+    origin = min(a[:, 0].min(), b[valid, 0].min())
+    widest = b[valid, 2].max()
+    right = max((a[:, 0] + a[:, 2]).max(), (b[valid, 0] + b[valid, 2]).max())
+    span = right - origin + widest + 1.0
+    return (
+        a_frames * span + (a[:, 0] - origin),
+        b_frames * span + (b[:, 0] - origin),
+        widest,
+    )
+
+
+def _sweep(a_keys, a_widths, b_keys, widest):
+    """Return the positions of the pairs whose x intervals could overlap."""
+    # b[j] can only overlap a[i] if a.left - b.width < b.left < a.right.
+    starts = numpy.searchsorted(b_keys, a_keys - widest, side="right")
+    stops = numpy.searchsorted(b_keys, a_keys + a_widths, side="left")
+    counts = numpy.maximum(stops - starts, 0)
+    return numpy.repeat(numpy.arange(len(a_keys)), counts), _ranges(starts, counts)
+
+
+def _ranges(starts, counts):
+    """Concatenate ``arange(start, start + count)`` for each start and count."""
+    total = counts.sum()
+    ends = numpy.cumsum(counts)
+    return numpy.repeat(starts - (ends - counts), counts) + numpy.arange(total)
+
+
+def _intersect(a, b):
+    return (
+        numpy.minimum(a[:, 0] + a[:, 2], b[:, 0] + b[:, 2])
+        > numpy.maximum(a[:, 0], b[:, 0])
+    ) & (
+        numpy.minimum(a[:, 1] + a[:, 3], b[:, 1] + b[:, 3])
+        > numpy.maximum(a[:, 1], b[:, 1])
+    )
+
+
+def _degrees(indices, count):
+    return numpy.bincount(indices, minlength=count)[indices]
+
+
+def _group_by_frame(rows, columns, frames):
+    """Yield the unique rows and columns of the pairs of each frame."""
+    order = numpy.argsort(frames[rows], kind="stable")
+    rows, columns = rows[order], columns[order]
+    boundaries = numpy.flatnonzero(numpy.diff(frames[rows])) + 1
+    for frame_rows, frame_columns in zip(
+        numpy.split(rows, boundaries), numpy.split(columns, boundaries)
+    ):
+        if frame_rows.size:
+            yield numpy.unique(frame_rows), numpy.unique(frame_columns)
+
+
+def _assign(predicted, ground_truth, rows, columns, threshold):
+    """Solve the assignment problem of one frame, and return global indices."""
+    iou = calculate_iou_matrix(predicted[rows], ground_truth[columns])
+    iou[iou < threshold] = 0.0
+    matched_rows, matched_columns = scipy.optimize.linear_sum_assignment(
+        iou, maximize=True
+    )
+    matched = iou[matched_rows, matched_columns] > 0.0
+    return rows[matched_rows[matched]], columns[matched_columns[matched]]
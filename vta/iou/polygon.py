@@ -0,0 +1,288 @@
+"""Provides intersection-over-union for polygon regions.
+
+VOT 2015 and later annotate the target with a rotated rectangle, stored as a
+polygon of four corners: ``[x1, y1, x2, y2, x3, y3, x4, y4]``. The functions in
+this module calculate the overlap of such regions for every frame of a sequence
+at once. Arrays of axis aligned ``[x, y, width, height]`` boxes are accepted
+wherever polygons are, and are converted with :py:func:`rectangle_to_polygon`.
+
+Three methods of calculating overlap are available. The method used for each
+value is reported along with the values.
+
+:exact: Intersect the polygons by clipping. This is exact for convex polygons,
+    which includes every rotated rectangle.
+:bounds: Use the IoU of the axis aligned bounding boxes of the polygons. This is
+    the fastest method, and is exact when both regions are axis aligned.
+:raster: Count the cells of a grid that lie inside each polygon. The accuracy
+    depends on the grid resolution.
+
+The ``auto`` mode uses the *bounds* method for frames in which both regions are
+axis aligned, and the *exact* method for every other frame. Its results are
+therefore always exact.
+
+.. code-block:: python
+
+    overlaps, methods = calculate_polygon_iou(results, ground_truth)
+    approximate = numpy.count_nonzero(methods == METHODS.index("raster"))
+"""
+
+import numpy
+
+from vta.iou.bounding_box import calculate_iou_batch
+
+METHODS = ("exact", "bounds", "raster")
+"""The names of the overlap methods, indexed by the codes reported with IoU."""
+
+
+def rectangle_to_polygon(rectangles) -> numpy.ndarray:
+    """Convert axis aligned boxes to polygons.
+
+    :param numpy.ndarray rectangles: An (N,4) array of ``[x, y, width, height]``
+        boxes.
+    :returns: An (N,8) array of the corners of each box, clockwise from the
+        upper left corner in image coordinates.
+    :rtype: numpy.ndarray
+    """
+    x, y, width, height = numpy.asarray(rectangles, dtype=float).T
+    right = x + width
+    bottom = y + height
+    return numpy.stack((x, y, right, y, right, bottom, x, bottom), axis=1)
+
+
+def polygon_to_rectangle(polygons) -> numpy.ndarray:
+    """Calculate the axis aligned bounding boxes of polygons.
+
+    :param numpy.ndarray polygons: An (N,8) array of polygons.
+    :returns: An (N,4) array of ``[x, y, width, height]`` boxes. Each box is the
+        smallest box that contains the corresponding polygon.
+    :rtype: numpy.ndarray
+    """
+    corners = _as_corners(polygons)
+    upper_left = corners.min(axis=1)
+    return numpy.concatenate((upper_left, corners.max(axis=1) - upper_left), axis=1)
+
+
+def calculate_polygon_iou(a, b, mode: str = "auto", resolution: int = 64):
+    """Calculate the intersection-over-union of corresponding regions.
+
+    :param numpy.ndarray a: An (N,8) array of polygons, or an (N,4) array of
+        boxes.
+    :param numpy.ndarray b: An (N,8) array of polygons, or an (N,4) array of
+        boxes. Row *i* of this array is compared to row *i* of ``a``.
+    :param str mode: The overlap method; one of ``auto``, ``exact``,
+        ``bounds``, or ``raster``.
+    :param int resolution: The number of grid cells along each axis of the
+        union of two regions, for the *raster* method.
+    :returns: A tuple of two (N,) arrays. The first holds the IoU values. The
+        second holds the index into :py:data:`METHODS` of the method used for
+        each value. Rows with NaN coordinates, such as failure frames in VOT
+        results, have an IoU of 0.
+    :rtype: tuple(numpy.ndarray, numpy.ndarray)
+    :raises ValueError: if the arrays do not have the same number of regions,
+        if the mode is unknown, or if the resolution is not positive.
+    """
+    a = _as_corners(a)
+    b = _as_corners(b)
+    if a.shape != b.shape:
+        raise ValueError(f"cannot compare {a.shape[0]} regions to {b.shape[0]}")
+    if mode == "auto":
+        return _calculate_auto(a, b)
+    if mode not in METHODS:
+        raise ValueError(f"unknown polygon overlap mode {mode}")
+    if mode == "exact":
+        overlaps = _calculate_exact(a, b)
+    elif mode == "bounds":
+        overlaps = _calculate_bounds(a, b)
+    elif resolution < 1:
+        raise ValueError(f"raster resolution must be positive, not {resolution}")
+    else:
+        overlaps = _calculate_raster(a, b, resolution)
+    return overlaps, numpy.full(a.shape[0], METHODS.index(mode), dtype=numpy.int8)
+
+
+def calculate_polygon_area(polygons) -> numpy.ndarray:
+    """Calculate the area of polygons.
+
+    :param numpy.ndarray polygons: An (N,8) array of polygons, or an (N,4) array
+        of boxes.
+    :returns: An (N,) array of areas.
+    :rtype: numpy.ndarray
+    """
+    return _shoelace(_as_corners(polygons))
+
+
+# -----------------------------------------------------------------------------
+#                                                       implementation details
+# -----------------------------------------------------------------------------
+# The number of sample points that the raster method tests at once, which
+# bounds its memory use whatever the resolution.
+_RASTER_POINTS = 1 << 20
+
+
+def _as_corners(regions):
+    """Convert an array of regions to an (N,4,2) array of polygon corners."""
+    regions = numpy.asarray(regions, dtype=float)
+    if regions.ndim == 1:
+        regions = regions.reshape(1, -1)
+    if regions.ndim == 3 and regions.shape[1:] == (4, 2):
+        return regions
+    if regions.ndim != 2 or regions.shape[1] not in (4, 8):
+        raise ValueError(f"expected an (N,4) or (N,8) array, not {regions.shape}")
+    if regions.shape[1] == 4:
+        regions = rectangle_to_polygon(regions)
+    return regions.reshape(-1, 4, 2)
+
+
+def _shoelace(corners):
+    x = corners[..., 0]
+    y = corners[..., 1]
+    cross = x * numpy.roll(y, -1, axis=-1) - numpy.roll(x, -1, axis=-1) * y
+    return numpy.abs(cross.sum(axis=-1)) / 2
+
+
+def _iou_from_areas(intersection, area_a, area_b):
+    union = area_a + area_b - intersection
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        iou = intersection / union
+    return numpy.where(union > 0, iou, 0.0)
+
+
+def _calculate_auto(a, b):
+    aligned = _is_axis_aligned(a) & _is_axis_aligned(b)
+    overlaps = numpy.empty(a.shape[0])
+    methods = numpy.full(a.shape[0], METHODS.index("exact"), dtype=numpy.int8)
+    overlaps[aligned] = _calculate_bounds(a[aligned], b[aligned])
+    overlaps[~aligned] = _calculate_exact(a[~aligned], b[~aligned])
+    methods[aligned] = METHODS.index("bounds")
+    return overlaps, methods
+
+
+def _is_axis_aligned(corners):
+    edges = numpy.roll(corners, -1, axis=1) - corners
+    return numpy.all((edges[..., 0] == 0) | (edges[..., 1] == 0), axis=1)
+
+
+def _calculate_bounds(a, b):
+    return calculate_iou_batch(polygon_to_rectangle(a), polygon_to_rectangle(b))
+
+
+def _cross(u, v):
+    return u[..., 0] * v[..., 1] - u[..., 1] * v[..., 0]
+
+
+def _inside(points, corners, tolerance):
+    """Test whether each point lies inside the convex polygon of the same row.
+
+    :param points: An (N,P,2) array of points.
+    :param corners: An (N,4,2) array of polygon corners.
+    :param tolerance: An (N,) array of tolerances for the cross products.
+    :returns: An (N,P) boolean array.
+    """
+    edges = numpy.roll(corners, -1, axis=1) - corners
+    cross = _cross(
+        edges[:, numpy.newaxis, :, :],
+        points[:, :, numpy.newaxis, :] - corners[:, numpy.newaxis, :, :],
+    )
+    tolerance = tolerance[:, numpy.newaxis, numpy.newaxis]
+    return numpy.all(cross >= -tolerance, axis=2) | numpy.all(
+        cross <= tolerance, axis=2
+    )
+
+
+def _edge_intersections(a, b):
+    """Find the intersection of every edge of a with every edge of b.
+
+    :returns: An (N,16,2) array of points and an (N,16) validity mask.
+    """
+    r = (numpy.roll(a, -1, axis=1) - a)[:, :, numpy.newaxis, :]
+    s = (numpy.roll(b, -1, axis=1) - b)[:, numpy.newaxis, :, :]
+    offset = b[:, numpy.newaxis, :, :] - a[:, :, numpy.newaxis, :]
+    denominator = _cross(r, s)
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        t = _cross(offset, s) / denominator  # pylint: disable=invalid-name
+        u = _cross(offset, r) / denominator  # pylint: disable=invalid-name
+        points = a[:, :, numpy.newaxis, :] + t[..., numpy.newaxis] * r
+    valid = (denominator != 0) & (t >= 0) & (t <= 1) & (u >= 0) & (u <= 1)
+    return points.reshape(-1, 16, 2), valid.reshape(-1, 16)
+
+
+def _calculate_exact(a, b):
+    """Intersect convex quadrilaterals.
+
+    The intersection of two convex polygons is the convex polygon whose corners
+    are the corners of each polygon that lie inside the other, plus the points
+    where their edges cross. Those candidate points are sorted by angle around
+    their centroid, then the area is calculated with the shoelace formula.
+    Invalid candidates are replaced with the first valid point, which adds
+    nothing to the area.
+    """
+    scale = numpy.nan_to_num(numpy.abs(numpy.concatenate((a, b), axis=1))).max(
+        axis=(1, 2), initial=1.0
+    )
+    tolerance = 1e-9 * scale**2
+    crossings, crossings_valid = _edge_intersections(a, b)
+    points = numpy.concatenate((a, b, crossings), axis=1)
+    valid = numpy.concatenate(
+        (_inside(a, b, tolerance), _inside(b, a, tolerance), crossings_valid), axis=1
+    )
+    count = valid.sum(axis=1)
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        centroid = (
+            numpy.where(valid[..., numpy.newaxis], points, 0).sum(axis=1)
+            / count[:, numpy.newaxis]
+        )
+    offsets = points - centroid[:, numpy.newaxis, :]
+    angles = numpy.where(
+        valid, numpy.arctan2(offsets[..., 1], offsets[..., 0]), numpy.inf
+    )
+    order = numpy.argsort(angles, axis=1)
+    points = numpy.take_along_axis(points, order[..., numpy.newaxis], axis=1)
+    valid = numpy.take_along_axis(valid, order, axis=1)
+    points = numpy.where(valid[..., numpy.newaxis], points, points[:, 0:1, :])
+    intersection = numpy.where(count >= 3, _shoelace(points), 0.0)
+    return _iou_from_areas(intersection, _shoelace(a), _shoelace(b))
+
+
+def _calculate_raster(a, b, resolution):
+    overlaps = numpy.empty(a.shape[0])
+    block_size = max(1, _RASTER_POINTS // resolution**2)
+    for start in range(0, a.shape[0], block_size):
+        block = slice(start, start + block_size)
+        overlaps[block] = _raster_block(a[block], b[block], resolution)
+    return overlaps
+
+
+def _raster_block(a, b, resolution):
+    """Rasterize a block of pairs, a band of grid rows at a time."""
+    corners = numpy.concatenate((a, b), axis=1)
+    low = corners.min(axis=1)
+    cell = (corners.max(axis=1) - low) / resolution
+    band = max(1, _RASTER_POINTS // (a.shape[0] * resolution))
+    counts = numpy.zeros((2, a.shape[0]), dtype=numpy.int64)
+    for start in range(0, resolution, band):
+        rows = numpy.arange(start, min(start + band, resolution))
+        counts += _raster_counts(_raster_points(low, cell, resolution, rows), a, b)
+    intersection, union = counts
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        iou = intersection / union
+    return numpy.where(union > 0, iou, 0.0)
+
+
+def _raster_points(low, cell, resolution, rows):
+    """Return the centers of the cells in some rows of the grid of each pair."""
+    grid_x, grid_y = numpy.meshgrid(numpy.arange(resolution) + 0.5, rows + 0.5)
+    grid = numpy.stack((grid_x.ravel(), grid_y.ravel()), axis=1)
+    return (
+        low[:, numpy.newaxis, :] + grid[numpy.newaxis, :, :] * cell[:, numpy.newaxis, :]
+    )
+
+
+def _raster_counts(points, a, b):
+    """Count the points inside both polygons, and inside either, of each pair."""
+    tolerance = numpy.zeros(a.shape[0])
+    inside_a = _inside(points, a, tolerance) & (_shoelace(a) > 0)[:, numpy.newaxis]
+    inside_b = _inside(points, b, tolerance) & (_shoelace(b) > 0)[:, numpy.newaxis]
+    return (
+        numpy.count_nonzero(inside_a & inside_b, axis=1),
+        numpy.count_nonzero(inside_a | inside_b, axis=1),
+    )
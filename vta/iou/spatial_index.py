@@ -0,0 +1,296 @@
+"""Provides a spatial index for finding boxes near a region.
+
+A :py:class:`SpatialIndex` is a packed R-tree over every box of a sequence or a
+data set. The boxes are sorted once with the Sort-Tile-Recursive (STR) order:
+by the x coordinate of their centers into vertical slices, then by the y
+coordinate within each slice. Each leaf node is a run of consecutive sorted
+boxes, and each node above it is a run of consecutive nodes of the level
+below; so every node covers a contiguous range of the sorted boxes, and the
+tree is stored as one NumPy array of node bounds per level, with no pointers.
+
+Queries descend the tree one level at a time, testing all surviving nodes of a
+level at once, so they only look at the boxes of nodes that can contain an
+answer.
+
+An index can be saved next to the annotation file it was built from, and
+loaded instead of being built again.
+
+.. code-block:: python
+
+    regions = vta.dataset.annotations.read_groundtruth("groundtruth_rect.txt")
+    index = SpatialIndex(regions)
+    index.save("groundtruth_rect" + INDEX_EXTENSION)
+    frames = index.query([100, 100, 50, 50])  # The frames that overlap it.
+"""
+
+import os
+
+import numpy
+
+from vta.iou.bounding_box import calculate_iou_batch
+from vta.iou.polygon import polygon_to_rectangle
+
+INDEX_EXTENSION = ".index.npz"
+"""The extension of saved spatial index files."""
+
+NODE_SIZE = 16
+"""The default number of children of each node."""
+
+
+class SpatialIndex:
+    """A packed R-tree over an array of boxes.
+
+    :param numpy.ndarray boxes: An (N,4) array of boxes, in the layout of
+        :py:mod:`vta.iou.bounding_box`, or an (N,8) array of polygons, which
+        are indexed by their bounding boxes. Boxes with coordinates that are
+        not finite, such as frames without a target, are left out of the tree,
+        so they are never found.
+    :param int node_size: The number of children of each node.
+    :raises ValueError: if the array is not an array of boxes or polygons.
+
+    The indices returned by queries are row numbers of ``boxes``; for the
+    regions of one annotation file, these are frame numbers.
+    """
+
+    def __init__(self, boxes, node_size: int = NODE_SIZE):
+        boxes = numpy.asarray(boxes, dtype=float)
+        if boxes.ndim != 2 or boxes.shape[1] not in (4, 8):
+            raise ValueError(f"expected an (N,4) or (N,8) array, not {boxes.shape}")
+        if boxes.shape[1] == 8:
+            boxes = polygon_to_rectangle(boxes)
+        node_size = max(2, int(node_size))
+        order = _str_order(boxes, node_size)
+        self.__setup(boxes, order, node_size, _build_levels(boxes[order], node_size))
+
+    @property
+    def boxes(self) -> numpy.ndarray:
+        """Get the (N,4) array of indexed boxes, in their original order."""
+        return self.__boxes
+
+    @property
+    def node_size(self) -> int:
+        """Get the number of children of each node."""
+        return self.__node_size
+
+    def __len__(self) -> int:
+        """Get the number of boxes in the tree, which excludes invalid boxes."""
+        return len(self.__order)
+
+    def query(self, region) -> numpy.ndarray:
+        """Find the boxes that overlap a region.
+
+        :param numpy.ndarray region: A box ``[x, y, width, height]``.
+        :returns: The sorted indices of the boxes whose intersection with the
+            region has an area larger than 0.
+        :rtype: numpy.ndarray
+        """
+        return self.query_many([region])[1]
+
+    def query_many(self, regions) -> tuple:
+        """Find the boxes that overlap each of several regions.
+
+        All of the regions descend the tree together, so this is much faster
+        than querying each region in turn.
+
+        :param numpy.ndarray regions: An (R,4) array of boxes.
+        :returns: A tuple of two arrays, with the index of the region and the
+            index of the box of each overlapping pair, sorted by region, then
+            by box.
+        :rtype: tuple(numpy.ndarray, numpy.ndarray)
+        """
+        regions = _corners(numpy.asarray(regions, dtype=float).reshape(-1, 4))
+        rows = numpy.arange(len(regions) if self.__levels else 0)
+        positions = numpy.zeros(len(rows), dtype=numpy.intp)
+        for depth in range(len(self.__levels) - 1, -2, -1):
+            keep = _overlaps(regions[rows], self.__bounds(depth)[positions])
+            rows, positions = rows[keep], positions[keep]
+            if depth >= 0:
+                positions, counts = self.__children(depth, positions)
+                rows = numpy.repeat(rows, counts)
+        boxes = self.__order[positions]
+        order = numpy.lexsort((boxes, rows))
+        return rows[order], boxes[order]
+
+    def query_iou(self, region, threshold: float) -> numpy.ndarray:
+        """Find the boxes whose IoU with a region reaches a threshold.
+
+        :param numpy.ndarray region: A box ``[x, y, width, height]``.
+        :param float threshold: The smallest IoU of a box that is found.
+        :returns: The sorted indices of the boxes that overlap the region with
+            an IoU of at least ``threshold``.
+        :rtype: numpy.ndarray
+        """
+        region = numpy.asarray(region, dtype=float).reshape(1, 4)
+        candidates = self.query(region[0])
+        iou = calculate_iou_batch(
+            self.__boxes[candidates], numpy.repeat(region, len(candidates), axis=0)
+        )
+        return candidates[iou >= threshold]
+
+    def nearest(self, point, count: int = 1) -> numpy.ndarray:
+        """Find the boxes nearest to a point.
+
+        At each level, the nodes that are certainly farther than ``count``
+        boxes of other nodes are not descended.
+
+        :param point: The ``(x, y)`` point.
+        :param int count: The number of boxes to find.
+        :returns: The indices of the ``count`` boxes whose distance to the
+            point is smallest, nearest first, and by index among equally near
+            boxes. A box that contains the point has a distance of 0. Fewer
+            boxes are returned if the tree has fewer boxes.
+        :rtype: numpy.ndarray
+        """
+        point = numpy.asarray(point, dtype=float).reshape(2)
+        count = max(0, int(count))
+        positions = numpy.zeros(1 if self.__levels and count else 0, numpy.intp)
+        for depth in range(len(self.__levels) - 1, -1, -1):
+            bounds = self.__bounds(depth)[positions]
+            bound = _count_distance(
+                _farthest(point, bounds), self.__covered(depth, positions), count
+            )
+            positions = positions[_distances(point, bounds) <= bound]
+            positions = self.__children(depth, positions)[0]
+        distances = _distances(point, self.__bounds(-1)[positions])
+        nearest = numpy.lexsort((self.__order[positions], distances))[:count]
+        return self.__order[positions[nearest]]
+
+    def save(self, file_path: str) -> None:
+        """Save the index, so that it can be loaded instead of built again.
+
+        :param str file_path: The path of the file to write, which is usually
+            the path of the annotation file, with :py:data:`INDEX_EXTENSION`
+            in place of its extension. The file is replaced atomically.
+        :returns: None
+        :raises OSError: if the file cannot be written.
+        """
+        temporary_path = f"{file_path}.{os.getpid()}"
+        with open(temporary_path, "wb") as index_file:
+            numpy.savez(
+                index_file,
+                boxes=self.__boxes,
+                order=self.__order,
+                node_size=self.__node_size,
+                nodes=numpy.concatenate([numpy.zeros((0, 4))] + self.__levels),
+                level_sizes=[len(level) for level in self.__levels],
+            )
+        os.replace(temporary_path, file_path)
+
+    @classmethod
+    def load(cls, file_path: str) -> "SpatialIndex":
+        """Load an index saved with :py:meth:`save`.
+
+        :param str file_path: The path of the index file.
+        :returns: The index.
+        :rtype: SpatialIndex
+        :raises OSError: if the file cannot be read.
+        :raises KeyError: if the file is not a spatial index file.
+        """
+        index = cls.__new__(cls)
+        with numpy.load(file_path) as arrays:
+            offsets = numpy.cumsum(arrays["level_sizes"])
+            index.__setup(
+                arrays["boxes"],
+                arrays["order"],
+                int(arrays["node_size"]),
+                numpy.split(arrays["nodes"], offsets[:-1]) if offsets.size else [],
+            )
+        return index
+
+    def __setup(self, boxes, order, node_size, levels):
+        self.__boxes = boxes
+        self.__order = order
+        self.__node_size = node_size
+        # Level 0 holds the leaf nodes; the last level holds the root.
+        self.__levels = levels
+        self.__corners = _corners(boxes[order])
+
+    def __bounds(self, depth):
+        """Return the corners of the nodes at a depth, or of the sorted boxes."""
+        return self.__levels[depth] if depth >= 0 else self.__corners
+
+    def __children(self, depth, positions):
+        """Return the positions of the children of nodes, and their counts."""
+        size = len(self.__bounds(depth - 1))
+        starts = positions * self.__node_size
+        counts = numpy.minimum(starts + self.__node_size, size) - starts
+        return _ranges(starts, counts), counts
+
+    def __covered(self, depth, positions):
+        """Return the number of boxes under each node at a depth."""
+        span = self.__node_size ** (depth + 1)
+        return numpy.minimum(positions * span + span, len(self.__order)) - (
+            positions * span
+        )
+
+
+# -----------------------------------------------------------------------------
+#                                                       implementation details
+# -----------------------------------------------------------------------------
+def _str_order(boxes, node_size):
+    """Return the indices of the valid boxes, in STR order."""
+    valid = numpy.flatnonzero(
+        numpy.all(numpy.isfinite(boxes), axis=1) & numpy.all(boxes[:, 2:4] >= 0, axis=1)
+    )
+    centers = boxes[valid, 0:2] + boxes[valid, 2:4] / 2
+    slices = int(numpy.ceil(numpy.sqrt(numpy.ceil(len(valid) / node_size))))
+    by_x = numpy.argsort(centers[:, 0], kind="stable")
+    slice_numbers = numpy.arange(len(valid)) // max(1, slices * node_size)
+    return valid[by_x[numpy.lexsort((centers[by_x, 1], slice_numbers))]]
+
+
+def _build_levels(boxes, node_size):
+    """Return the corners of the nodes of each level, from the leaves up."""
+    levels = []
+    corners = _corners(boxes)
+    while len(corners) > 1 or not levels and len(corners):
+        starts = numpy.arange(0, len(corners), node_size)
+        corners = numpy.hstack(
+            (
+                numpy.minimum.reduceat(corners[:, 0:2], starts),
+                numpy.maximum.reduceat(corners[:, 2:4], starts),
+            )
+        )
+        levels.append(corners)
+    return levels
+
+
+def _corners(boxes):
+    """Convert ``[x, y, width, height]`` boxes to ``[left, top, right, bottom]``."""
+    return numpy.hstack((boxes[:, 0:2], boxes[:, 0:2] + boxes[:, 2:4]))
+
+
+def _ranges(starts, counts):
+    """Concatenate ``arange(start, start + count)`` for each start and count."""
+    ends = numpy.cumsum(counts)
+    return numpy.repeat(starts - (ends - counts), counts) + numpy.arange(
+        ends[-1] if ends.size else 0
+    )
+
+
+def _overlaps(a, b):
+    return numpy.all(
+        numpy.minimum(a[:, 2:4], b[:, 2:4]) > numpy.maximum(a[:, 0:2], b[:, 0:2]),
+        axis=1,
+    )
+
+
+def _distances(point, corners):
+    """Return the distance from a point to the nearest point of each box."""
+    offsets = numpy.maximum(corners[:, 0:2] - point, point - corners[:, 2:4])
+    return numpy.hypot(*numpy.maximum(offsets, 0.0).T)
+
+
+def _farthest(point, corners):
+    """Return the distance from a point to the farthest point of each box."""
+    offsets = numpy.maximum(
+        numpy.abs(corners[:, 0:2] - point), numpy.abs(corners[:, 2:4] - point)
+    )
+    return numpy.hypot(*offsets.T)
+
+
+def _count_distance(farthest, counts, count):
+    """Return a distance within which there are at least ``count`` boxes."""
+    order = numpy.argsort(farthest)
+    enough = numpy.searchsorted(numpy.cumsum(counts[order]), count)
+    return farthest[order[enough]] if enough < len(order) else numpy.inf
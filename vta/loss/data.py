@@ -1,7 +1,17 @@
-"""Provides data structures for encapsulating loss data."""
+"""Provides data structures for encapsulating loss data.
+
+A :py:class:`Loss` holds the data of one training run. A :py:class:`LossTable`
+holds the data of many runs in columns, so that validation, ranking, and
+summary statistics are single vectorized passes over every run, instead of a
+Python loop over :py:class:`Loss` objects. Each run in a table can still be
+used as a :py:class:`Loss`, whose arrays are views into the table, or the
+run's own arrays, which may be memory mapped.
+"""
 
 import numpy
 
+import vta.loss.ranking
+
 
 class Loss:
     """Encapsulates training loss data.
@@ -24,6 +34,307 @@ class Loss:
         self.precision_values = precision_values
 
 
+class RaggedArray:
+    """Rows of different lengths, stored as one array of values.
+
+    Row *i* is ``values[offsets[i]:offsets[i + 1]]``. The methods that summarize
+    rows each make a single vectorized pass over all the values.
+
+    A ragged array made with :py:meth:`from_arrays` keeps the arrays of its
+    rows, and only concatenates them the first time :py:attr:`values` is used.
+    Until then, rows are the original arrays, and the methods that only read
+    the ends of rows, such as :py:meth:`last` and :py:meth:`tails`, read them
+    from each row; so memory mapped rows are neither copied nor read in full.
+
+    .. py:attribute:: offsets
+        A numpy.ndarray of integers, one longer than the number of rows, giving
+        the start of each row in ``values``, and then the end of the last row.
+    """
+
+    def __init__(self, values: numpy.ndarray, offsets: numpy.ndarray):
+        self.__values = values
+        self.__rows = None
+        self.offsets = offsets
+        self.__prefix_sums = None
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """Make a ragged array whose rows are arrays, without copying them.
+
+        :param arrays: A sequence of one dimensional arrays, one per row.
+        :returns: The ragged array.
+        :rtype: RaggedArray
+        """
+        arrays = [numpy.asanyarray(a) for a in arrays]
+        offsets = numpy.zeros(len(arrays) + 1, dtype=numpy.int64)
+        numpy.cumsum([len(a) for a in arrays], out=offsets[1:])
+        ragged = cls(None, offsets)
+        ragged.__rows = arrays  # pylint: disable=unused-private-member
+        return ragged
+
+    @property
+    def values(self) -> numpy.ndarray:
+        """The values of every row, one row after another, as one array.
+
+        The rows given to :py:meth:`from_arrays` are concatenated into it the
+        first time it is used.
+        """
+        if self.__values is None:
+            self.__values = (
+                numpy.concatenate(self.__rows) if self.__rows else numpy.empty(0)
+            )
+            self.__rows = None
+        return self.__values
+
+    def __len__(self) -> int:
+        """The number of rows."""
+        return len(self.offsets) - 1
+
+    def __getitem__(self, row: int) -> numpy.ndarray:
+        """A view of the values of one row."""
+        if self.__rows is not None:
+            return self.__rows[row]
+        return self.__values[self.offsets[row] : self.offsets[row + 1]]
+
+    @property
+    def lengths(self) -> numpy.ndarray:
+        """The number of values in each row."""
+        return numpy.diff(self.offsets)
+
+    def select(self, rows) -> "RaggedArray":
+        """Copy some of the rows into a new ragged array.
+
+        :param rows: The indices of the rows to copy, in the order to copy
+            them, or a boolean mask of the rows to copy.
+        :returns: A ragged array of the selected rows. The rows of a ragged
+            array whose values were not concatenated are not copied.
+        :rtype: RaggedArray
+        """
+        rows = numpy.arange(len(self))[rows]
+        if self.__rows is not None:
+            return RaggedArray.from_arrays([self.__rows[r] for r in rows])
+        lengths = self.lengths[rows]
+        offsets = numpy.zeros(len(rows) + 1, dtype=numpy.int64)
+        numpy.cumsum(lengths, out=offsets[1:])
+        shifts = numpy.repeat(self.offsets[rows] - offsets[:-1], lengths)
+        return RaggedArray(self.values[numpy.arange(offsets[-1]) + shifts], offsets)
+
+    def compress(self, keep: numpy.ndarray) -> "RaggedArray":
+        """Copy some of the values into a new ragged array with the same rows.
+
+        :param numpy.ndarray keep: A boolean mask of the values to copy, with
+            one element per value.
+        :returns: A ragged array with the same number of rows, in which each
+            row has only the kept values of that row.
+        :rtype: RaggedArray
+        """
+        counts = numpy.bincount(
+            self.row_of(numpy.flatnonzero(keep)), minlength=len(self)
+        )
+        offsets = numpy.zeros(len(self) + 1, dtype=numpy.int64)
+        numpy.cumsum(counts, out=offsets[1:])
+        return RaggedArray(self.values[keep], offsets)
+
+    def row_of(self, positions: numpy.ndarray) -> numpy.ndarray:
+        """Find the rows that contain positions in ``values``.
+
+        :param numpy.ndarray positions: Indices into ``values``.
+        :returns: The row of each position.
+        :rtype: numpy.ndarray
+        """
+        return numpy.searchsorted(self.offsets, positions, side="right") - 1
+
+    def find_invalid(self) -> tuple:
+        """Find the values that are NaN, +infinity, or -infinity.
+
+        :returns: A tuple of the row of each invalid value, and its index in
+            its row, ordered by row, then by index.
+        :rtype: tuple(numpy.ndarray, numpy.ndarray)
+        """
+        if self.__rows is None:
+            positions = numpy.flatnonzero(~numpy.isfinite(self.values))
+            rows = self.row_of(positions)
+            return rows, positions - self.offsets[rows]
+        indices = [numpy.flatnonzero(~numpy.isfinite(r)) for r in self.__rows]
+        rows = numpy.repeat(numpy.arange(len(self)), [len(i) for i in indices])
+        return rows, numpy.concatenate([numpy.zeros(0, numpy.intp)] + indices)
+
+    def first(self) -> numpy.ndarray:
+        """The first value of each row, or NaN for empty rows."""
+        return self.__take(self.offsets[:-1], 0)
+
+    def last(self) -> numpy.ndarray:
+        """The last value of each row, or NaN for empty rows."""
+        return self.__take(self.offsets[1:] - 1, -1)
+
+    def prefix_sums(self) -> numpy.ndarray:
+        """The prefix sums of the finite values, as 64 bit floats.
+
+        The sums are calculated once, and cached. Element *i* is the sum of the
+        finite values among the first *i* values, so the sum of the finite
+        values of row *r* is ``sums[offsets[r + 1]] - sums[offsets[r]]``. NaN
+        and infinite values count as 0, so that they do not spoil the sums of
+        other rows.
+        """
+        if self.__prefix_sums is None:
+            values = self.values
+            self.__prefix_sums = numpy.zeros(len(values) + 1)
+            numpy.cumsum(
+                numpy.where(numpy.isfinite(values), values, 0.0),
+                dtype=numpy.float64,
+                out=self.__prefix_sums[1:],
+            )
+        return self.__prefix_sums
+
+    def reduce(self, function: numpy.ufunc) -> numpy.ndarray:
+        """Reduce each row with a ufunc, such as :py:data:`numpy.fmin`.
+
+        :param numpy.ufunc function: The ufunc to reduce with.
+        :returns: One value per row, or NaN for empty rows.
+        :rtype: numpy.ndarray
+        """
+        result = numpy.full(len(self), numpy.nan)
+        filled = self.lengths > 0
+        if filled.any():
+            result[filled] = function.reduceat(self.values, self.offsets[:-1][filled])
+        return result
+
+    def pad(self) -> numpy.ndarray:
+        """Copy the rows into a two dimensional array.
+
+        :returns: A ``(rows, length)`` array, where ``length`` is the length of
+            the longest row. Each row starts at the first column, and is padded
+            with NaN.
+        :rtype: numpy.ndarray
+        """
+        lengths = self.lengths
+        width = lengths.max() if len(self) else 0
+        padded = numpy.full((len(self), width), numpy.nan)
+        padded[numpy.arange(width) < lengths[:, None]] = self.values
+        return padded
+
+    def tails(self, width: int) -> tuple:
+        """Gather the last values of each row into a two dimensional array.
+
+        :param int width: The number of values to gather from each row.
+        :returns: A tuple of a ``(rows, width)`` array, with the last value of
+            each row in the last column, and a boolean array of the same shape
+            that is ``False`` where a row has fewer than ``width`` values. Those
+            elements are NaN.
+        :rtype: tuple(numpy.ndarray, numpy.ndarray)
+        """
+        indices = self.offsets[1:, None] - width + numpy.arange(width)
+        present = indices >= self.offsets[:-1, None]
+        tails = numpy.full(indices.shape, numpy.nan)
+        if self.__rows is None:
+            tails[present] = self.values[indices[present]]
+        else:
+            for tail, row in zip(tails, self.__rows):
+                if width > 0 and len(row) > 0:
+                    tail[-min(width, len(row)) :] = row[-width:]
+        return tails, present
+
+    def __take(self, indices, index):
+        result = numpy.full(len(self), numpy.nan)
+        filled = self.lengths > 0
+        if self.__rows is None:
+            result[filled] = self.values[indices[filled]]
+        else:
+            result[filled] = [r[index] for r in self.__rows if len(r) > 0]
+        return result
+
+
+class LossTable:
+    """Encapsulates the training loss data of many runs, in columns.
+
+    .. py:attribute:: labels
+        A list of the label of each run.
+
+    .. py:attribute:: sources
+        A list of the file from which each run was read, or ``None`` for runs
+        that were not read from a file.
+
+    .. py:attribute:: loss
+        A :py:class:`RaggedArray` with one row of loss values per run.
+
+    .. py:attribute:: precision
+        A :py:class:`RaggedArray` with one row of precision values per run.
+    """
+
+    def __init__(self, labels: list, loss: RaggedArray, precision: RaggedArray):
+        self.labels = labels
+        self.sources = [None] * len(labels)
+        self.loss = loss
+        self.precision = precision
+        self.__views = {}
+
+    @classmethod
+    def from_losses(cls, losses, sources=None) -> "LossTable":
+        """Make a table of several runs.
+
+        The arrays of the runs are not copied, so the arrays of memory mapped
+        runs stay memory mapped, until a column's values are needed as one
+        array; see :py:class:`RaggedArray`.
+
+        :param LossList losses: The runs.
+        :param list sources: The file from which each run was read, if known.
+        :returns: The table.
+        :rtype: LossTable
+        """
+        table = cls(
+            [l.label for l in losses],
+            RaggedArray.from_arrays([l.loss_values for l in losses]),
+            RaggedArray.from_arrays([l.precision_values for l in losses]),
+        )
+        if sources is not None:
+            table.sources = list(sources)
+        return table
+
+    def __len__(self) -> int:
+        """The number of runs."""
+        return len(self.labels)
+
+    def __getitem__(self, row: int) -> Loss:
+        """Get one run as a :py:class:`Loss`, whose arrays are views.
+
+        The same object is returned each time a run is requested.
+        """
+        if row not in self.__views:
+            self.__views[row] = Loss(
+                self.labels[row], self.loss[row], self.precision[row]
+            )
+        return self.__views[row]
+
+    def select(self, rows) -> "LossTable":
+        """Copy some of the runs into a new table.
+
+        :param rows: The indices of the runs to copy, in the order to copy
+            them, or a boolean mask of the runs to copy.
+        :returns: A table of the selected runs.
+        :rtype: LossTable
+        """
+        rows = numpy.arange(len(self))[rows]
+        table = LossTable(
+            [self.labels[r] for r in rows],
+            self.loss.select(rows),
+            self.precision.select(rows),
+        )
+        table.sources = [self.sources[r] for r in rows]
+        return table
+
+    def invalid_runs(self) -> numpy.ndarray:
+        """Find the runs that have NaN or infinite values.
+
+        :returns: A boolean array that is ``True`` for each run that has at
+            least one NaN, +infinity, or -infinity loss or precision value.
+        :rtype: numpy.ndarray
+        """
+        invalid = numpy.zeros(len(self), dtype=bool)
+        for column in (self.loss, self.precision):
+            invalid[column.find_invalid()[0]] = True
+        return invalid
+
+
 LossList = list
 
 
@@ -50,7 +361,8 @@ def sort_by_loss(losses: LossList, algorithm: str) -> None:
     :param LossList losses: The list of loss data to sort. This list is sorted
         in place.
     :param str algorithm: The algorithm to use for sorting. See the loss
-        configuration item ``sort_algorithm`` for acceptable values.
+        configuration item ``sort_algorithm``, and
+        :py:data:`vta.loss.ranking.ALGORITHMS`, for acceptable values.
     :returns: None
 
     This function sorts the loss data, based on loss values (not precision
@@ -69,8 +381,9 @@ def sort_by_loss(losses: LossList, algorithm: str) -> None:
         sorted ahead of ``baseline``. ``baseline[4]`` is 2, while
         ``new_loss[4]`` is 1.
     """
-    if algorithm == "last":
-        losses.sort(key=lambda l: l.loss_values[-1])
+    options = vta.loss.ranking.RankingOptions(algorithm)
+    order = vta.loss.ranking.rank(LossTable.from_losses(losses), "loss", options)
+    losses[:] = [losses[i] for i in order]
 
 
 def sort_by_precision(losses: LossList, algorithm: str) -> None:
@@ -79,7 +392,8 @@ def sort_by_precision(losses: LossList, algorithm: str) -> None:
     :param LossList losses: The list of loss data to sort. This list is sorted
         in place.
     :param str algorithm: The algorithm to use for sorting. See the loss
-        configuration item ``sort_algorithm`` for acceptable values.
+        configuration item ``sort_algorithm``, and
+        :py:data:`vta.loss.ranking.ALGORITHMS`, for acceptable values.
     :returns: None
 
     This function sorts the loss data, based on precision values (not loss
@@ -98,5 +412,7 @@ def sort_by_precision(losses: LossList, algorithm: str) -> None:
         sorted ahead of ``new_loss``. ``baseline[4]`` is 2, while
         ``new_loss[4]`` is 1.
     """
-    if algorithm == "last":
-        losses.sort(key=lambda l: l.precision_values[-1], reverse=True)
+    options = vta.loss.ranking.RankingOptions(algorithm)
+    table = LossTable.from_losses(losses)
+    order = vta.loss.ranking.rank(table, "precision", options)
+    losses[:] = [losses[i] for i in order]
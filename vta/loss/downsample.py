@@ -0,0 +1,217 @@
+"""Functions for reducing curves to the points that can be seen when drawn.
+
+A curve with a million points, drawn on an axes a thousand pixels wide, puts a
+thousand points in every pixel column. Drawing only the minimum and maximum of
+each column draws the same picture, including every spike, with a fraction of
+the points. :py:class:`Pyramid` precomputes the minimum and maximum of blocks of
+points at every power of two block size, so that the points for any visible
+range and width can be selected without another pass over the curve. When
+points are appended to a curve, :py:meth:`Pyramid.extend` only calculates the
+blocks that the new points complete.
+"""
+
+import numpy
+
+ALGORITHMS = ("minmax", "stride", "none")
+"""The names of the downsampling algorithms.
+
+:minmax: Draw the minimum and maximum of each pixel column, selected from a
+    :py:class:`Pyramid`. This preserves the shape of the curve.
+:stride: Draw evenly spaced points. Only the drawn points are read, which is
+    fastest for memory mapped data, but spikes between the points are lost.
+:none: Draw every point.
+"""
+
+
+class Pyramid:
+    """The minimum and maximum of a curve over blocks of every power of 2 size.
+
+    Level *k* holds the minimum and maximum of each block of :math:`2^k`
+    points. Levels for blocks of fewer than 16 points are not kept, because
+    drawing every point of such a range is cheap; so the levels together hold
+    about an eighth as many values as the curve. NaN values are ignored, unless
+    a block is all NaN.
+    """
+
+    def __init__(self, values: numpy.ndarray):
+        """Build the pyramid for a curve.
+
+        :param numpy.ndarray values: The values of the curve. The x value of
+            each point is its index.
+        """
+        self.__values = values[:0]
+        # Each level is an array of [minimum, maximum] rows, with room to grow;
+        # only the first of its rows, as many as its size, are blocks.
+        self.__levels = []
+        self.__sizes = []
+        self.extend(values)
+
+    def extend(self, values: numpy.ndarray) -> None:
+        """Update the pyramid after points were appended to the curve.
+
+        Only the blocks that the new points complete are calculated, from the
+        new points and the points of the last incomplete block; so the cost
+        depends on the number of new points, not on the length of the curve.
+
+        :param numpy.ndarray values: The values of the curve, whose first
+            points are the points from which the pyramid was built.
+        :returns: None
+        """
+        self.__values = values
+        done = self.__sizes[0] if self.__sizes else 0
+        blocks = numpy.asarray(values[done << _MINIMUM_LEVEL :])
+        blocks = numpy.column_stack((blocks, blocks))
+        for _ in range(_MINIMUM_LEVEL):
+            blocks = _merge_pairs(blocks)
+        depth = 0
+        while self.__append(depth, blocks) and self.__sizes[depth] >= 2:
+            done = self.__sizes[depth + 1] if depth + 1 < len(self.__sizes) else 0
+            blocks = _merge_pairs(self.__blocks(depth)[2 * done :])
+            depth += 1
+
+    def __len__(self) -> int:
+        """The number of points in the curve."""
+        return len(self.__values)
+
+    def select(self, start: float, stop: float, buckets: int) -> tuple:
+        """Select the points to draw for a range of the curve.
+
+        :param float start: The smallest x value that is visible.
+        :param float stop: The largest x value that is visible.
+        :param int buckets: The number of buckets, usually pixel columns, into
+            which the visible range is divided.
+        :returns: A tuple of x values and y values. If the range has fewer
+            points than ``buckets``, every point in the range is returned.
+            Otherwise, the first point, then the minimum and maximum of each
+            block, with the x value of the block's center, and then any points
+            after the last whole block are returned; there are at most
+            ``buckets`` blocks. One point on either side of the range is included, so lines
+            continue to the edges of the axes.
+        :rtype: tuple(numpy.ndarray, numpy.ndarray)
+        """
+        first, last = _visible_range(start, stop, len(self))
+        level = int(numpy.ceil(numpy.log2(max(1, (last - first) / max(1, buckets)))))
+        level = min(level, _MINIMUM_LEVEL + len(self.__levels) - 1)
+        if level < _MINIMUM_LEVEL:
+            return numpy.arange(first, last), self.__values[first:last]
+        block = 1 << level
+        blocks = slice(first // block, -(-last // block))
+        minimums, maximums = self.__blocks(level - _MINIMUM_LEVEL)[blocks].T
+        centers = (
+            numpy.arange(blocks.start, blocks.start + len(minimums)) + 0.5
+        ) * block
+        # The first point is kept, so the curve starts where the range starts.
+        x_data = numpy.concatenate(([first], numpy.repeat(centers, 2)))
+        y_data = numpy.concatenate(
+            (
+                self.__values[first : first + 1],
+                numpy.column_stack((minimums, maximums)).ravel(),
+            )
+        )
+        covered = (blocks.start + len(minimums)) * block
+        if covered < last:  # The tail is too short to fill a block.
+            x_data = numpy.concatenate((x_data, numpy.arange(covered, last)))
+            y_data = numpy.concatenate((y_data, self.__values[covered:last]))
+        return x_data, y_data
+
+    def __blocks(self, depth):
+        """Return the [minimum, maximum] rows of the blocks of a level."""
+        return self.__levels[depth][: self.__sizes[depth]]
+
+    def __append(self, depth, blocks):
+        """Append blocks to a level, and return whether the level exists."""
+        if depth == len(self.__levels):
+            if len(blocks) == 0:
+                return False
+            self.__levels.append(numpy.empty((0, 2), dtype=blocks.dtype))
+            self.__sizes.append(0)
+        level, size = self.__levels[depth], self.__sizes[depth]
+        if size + len(blocks) > len(level):
+            # Doubling the capacity keeps the cost of appending constant.
+            grown = numpy.empty(
+                (max(2 * len(level), size + len(blocks)), 2), dtype=level.dtype
+            )
+            grown[:size] = level[:size]
+            self.__levels[depth] = level = grown
+        level[size : size + len(blocks)] = blocks
+        self.__sizes[depth] = size + len(blocks)
+        return True
+
+
+class Downsampler:
+    """Selects the points of a curve to draw, with one of :py:data:`ALGORITHMS`."""
+
+    def __init__(self, values: numpy.ndarray, algorithm: str = "minmax"):
+        """Prepare to downsample a curve.
+
+        :param numpy.ndarray values: The values of the curve. The x value of
+            each point is its index.
+        :param str algorithm: One of :py:data:`ALGORITHMS`. For *minmax*, the
+            :py:class:`Pyramid` is built here.
+        :raises ValueError: if the algorithm is not one of
+            :py:data:`ALGORITHMS`.
+        """
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"{algorithm} is not a downsampling algorithm")
+        self.__values = values
+        self.__algorithm = algorithm
+        self.__pyramid = Pyramid(values) if algorithm == "minmax" else None
+
+    def extend(self, values: numpy.ndarray) -> None:
+        """Update the downsampler after points were appended to the curve.
+
+        :param numpy.ndarray values: The values of the curve, whose first
+            points are the points it was prepared with. See
+            :py:meth:`Pyramid.extend`.
+        :returns: None
+        """
+        self.__values = values
+        if self.__pyramid is not None:
+            self.__pyramid.extend(values)
+
+    def select(self, start: float, stop: float, buckets: int) -> tuple:
+        """Select the points to draw for a range of the curve.
+
+        :param float start: The smallest x value that is visible.
+        :param float stop: The largest x value that is visible.
+        :param int buckets: The number of buckets, usually pixel columns, into
+            which the visible range is divided.
+        :returns: A tuple of x values and y values. See :py:meth:`Pyramid.select`
+            for *minmax*. For *stride*, at most ``buckets`` evenly spaced points
+            of the range, always including its last point. For *none*, every
+            point of the curve.
+        :rtype: tuple(numpy.ndarray, numpy.ndarray)
+        """
+        if self.__pyramid is not None:
+            return self.__pyramid.select(start, stop, buckets)
+        if self.__algorithm == "none":
+            return numpy.arange(len(self.__values)), self.__values
+        first, last = _visible_range(start, stop, len(self.__values))
+        step = max(1, -(-(last - first) // max(1, buckets)))
+        x_data = numpy.arange(last - 1, first - 1, -step)[::-1]
+        # Only the selected values of a memory mapped array are read.
+        return x_data, self.__values[x_data]
+
+
+# -----------------------------------------------------------------------------
+#                                                       implementation details
+# -----------------------------------------------------------------------------
+_MINIMUM_LEVEL = 4
+
+
+def _merge_pairs(blocks):
+    """Merge each pair of [minimum, maximum] rows, dropping an odd last row."""
+    size = len(blocks) // 2 * 2
+    return numpy.column_stack(
+        (
+            numpy.fmin(blocks[0:size:2, 0], blocks[1:size:2, 0]),
+            numpy.fmax(blocks[0:size:2, 1], blocks[1:size:2, 1]),
+        )
+    )
+
+
+def _visible_range(start, stop, size):
+    """Return the indices of the visible points, and one on either side."""
+    first = min(size, max(0, int(numpy.floor(start)) - 1))
+    last = max(first, min(size, int(numpy.ceil(stop)) + 2))
+    return first, last
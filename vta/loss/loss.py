@@ -1,14 +1,21 @@
 """The entry module for the vta loss command."""
 
 import argparse
-import json
+import concurrent.futures
+import os
+import os.path
 
-import matplotlib.pyplot as plt
+import matplotlib.figure
 import numpy
-import scipy.interpolate
-import sklearn.linear_model
 
 import vta.loss.data
+import vta.loss.downsample
+import vta.loss.loss_file
+import vta.loss.ranking
+import vta.loss.trend
+import vta.loss.validation
+import vta.utilities.metric_store
+import vta.utilities.profiling
 
 
 def main(arguments, configuration):
@@ -26,16 +33,34 @@ def main(arguments, configuration):
         occurred.
     :rtype: int
     """
+    if arguments.convert is not None:
+        with vta.utilities.profiling.phase("convert"):
+            return _convert(arguments.file, arguments.convert)
+    if arguments.follow and arguments.output is not None:
+        print("error: --follow cannot be used with --output, which saves graphs once")
+        return 1
     configuration = _augment_configuration(configuration["loss"])
-    losses = _read_loss_data(arguments.file)
+    with vta.utilities.profiling.phase("read"):
+        losses = _read_loss_data(arguments.file, arguments.jobs, arguments.store)
+        table = vta.loss.data.LossTable.from_losses(losses, arguments.file)
     if configuration["reject_invalid_data"]:
-        losses = [l for l in losses if _filter_invalid_data(l)]
-    figure = plt.figure(figsize=(15, 10))
-    axes = _make_axes(figure, configuration)
-    _graph_loss(configuration, axes, losses)
-    _graph_precision(configuration, axes, losses)
-    axes.legend()  # This must remain after the data is graphed.
+        with vta.utilities.profiling.phase("validate"):
+            table = _repair_invalid_data(table, configuration["invalid_data_policy"])
+    if arguments.output is not None:
+        with vta.utilities.profiling.phase("save"):
+            return _save_figures(arguments, configuration, table)
+    with vta.utilities.profiling.phase("plot"):
+        # pyplot selects a GUI backend, so it is only imported to show graphs.
+        import matplotlib.pyplot as plt  # pylint: disable=import-outside-toplevel
+
+        figure = plt.figure(figsize=_FIGURE_SIZE)
+        axes, curves = _draw_figure(figure, configuration, table)
+        _redraw_on_zoom(figure, axes, curves)
+    if arguments.follow:
+        timer = _follow(axes, curves, table, arguments.interval)
+        timer.start()
     plt.show()
+    return 0
 
 
 def make_parser(subparsers, common_options):
@@ -57,48 +82,347 @@ def make_parser(subparsers, common_options):
         formatter_class=argparse.ArgumentDefaultsHelpFormatter,
     )
     parser.add_argument(
-        "file", help="The JSON file that has the loss data to graph.", nargs="+"
+        "file",
+        help="The JSON or binary file that has the loss data to graph.",
+        nargs="+",
+    )
+    parser.add_argument(
+        "--convert",
+        help="Convert each JSON file to a binary loss file in this directory,"
+        " instead of drawing graphs. Binary files are much faster to read.",
+        metavar="DIR",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count(),
+        help="The maximum number of files to read at the same time.",
+    )
+    parser.add_argument(
+        "--output",
+        help="Save the graphs to files in this directory, instead of showing"
+        " them. No GUI is needed, so this works on headless machines.",
+        metavar="DIR",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["png", "svg", "pdf"],
+        default="png",
+        help="The file format of the graphs saved with --output.",
+    )
+    parser.add_argument(
+        "--group",
+        choices=["all", "directory", "file"],
+        default="all",
+        help="How the files are grouped into graphs saved with --output. With"
+        " all, one graph named loss is drawn. With directory, one graph is"
+        " drawn for each name of a directory that contains files; with file,"
+        " one graph is drawn for each file.",
+    )
+    parser.add_argument(
+        "--follow",
+        action="store_true",
+        help="Keep watching the files, and update the graphs as training jobs"
+        " add data to them. Binary files are followed most efficiently. This"
+        " cannot be used with --output.",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=5.0,
+        help="The number of seconds between checks for new data, when"
+        " following files.",
+    )
+    parser.add_argument(
+        "--store",
+        help="Keep the loss data read from each file in this directory. Later"
+        " runs only read the files that changed.",
+        metavar="DIR",
     )
 
 
 # -----------------------------------------------------------------------------
 #                                                       implementation details
 # -----------------------------------------------------------------------------
-def _filter_invalid_data(data):
-    if vta.loss.data.has_invalid_values(data):
-        print("warning:", data.label, "has invalid data")
-        return False
-    return True
+_FIGURE_SIZE = (15, 10)
+
+
+def _convert(file_paths, directory):
+    os.makedirs(directory, exist_ok=True)
+    exit_code = 0
+    for file_path in file_paths:
+        try:
+            print(vta.loss.loss_file.convert_loss_file(file_path, directory))
+        except (OSError, ValueError, KeyError) as error:
+            print(f"error: could not convert {file_path}: {error}")
+            exit_code = 1
+    return exit_code
 
 
-def _graph_loss(configuration, axes, losses):
+def _repair_invalid_data(table, policy):
+    invalid = vta.loss.validation.find_invalid_values(table)
+    for values in invalid:
+        for row in numpy.unique(values.rows):
+            print(
+                f"warning: {table.labels[row]} has invalid {values.kind} values at"
+                f" epochs {_format_epochs(values.epochs_of(row))}"
+            )
+    repaired = vta.loss.validation.repair(table, policy, invalid)
+    if len(repaired) < len(table):
+        print(f"warning: rejected {len(table) - len(repaired)} runs with invalid data")
+    return repaired
+
+
+def _format_epochs(epochs, count=5):
+    text = ", ".join(str(epoch) for epoch in epochs[:count])
+    return text + (f", and {len(epochs) - count} more" if len(epochs) > count else "")
+
+
+def _save_figures(arguments, configuration, table):
+    """Save one figure per group of runs, drawing the figures concurrently."""
+    groups = {}
+    for row, source in enumerate(table.sources):
+        groups.setdefault(_group_name(source, arguments.group), []).append(row)
+    os.makedirs(arguments.output, exist_ok=True)
+    # Each task holds only the runs of its group, so that a process pool does
+    # not copy every run to every task.
+    tasks = [
+        (
+            os.path.join(arguments.output, f"{name}.{arguments.format}"),
+            table.select(rows),
+        )
+        for name, rows in groups.items()
+    ]
+    save = _FigureSaver(configuration)
+    if arguments.jobs is None or arguments.jobs <= 1 or len(tasks) <= 1:
+        saved = [save(task) for task in tasks]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(arguments.jobs) as executor:
+            saved = list(executor.map(save, tasks))
+    for file_path in saved:
+        print(file_path)
+    return 0
+
+
+def _group_name(file_path, group):
+    if group == "directory":
+        return os.path.basename(os.path.dirname(os.path.abspath(file_path)))
+    if group == "file":
+        return os.path.splitext(os.path.basename(file_path))[0]
+    return "loss"
+
+
+class _FigureSaver:
+    """Draws and saves one figure; a class, so that it can be pickled."""
+
+    def __init__(self, configuration):
+        self.configuration = configuration
+
+    def __call__(self, task):
+        file_path, table = task
+        # A figure that is not managed by pyplot renders with Agg, or with the
+        # SVG or PDF backends, none of which need a GUI.
+        with vta.utilities.profiling.phase("plot"):
+            figure = matplotlib.figure.Figure(figsize=_FIGURE_SIZE)
+            _draw_figure(figure, self.configuration, table)
+        with vta.utilities.profiling.phase("render"):
+            figure.savefig(file_path)
+        return file_path
+
+
+def _draw_figure(figure, configuration, table):
+    axes = _make_axes(figure, configuration)
+    curves = _graph_loss(configuration, axes, table)
+    curves += _graph_precision(configuration, axes, table)
+    _draw_trends(axes, curves, configuration)
+    axes.legend()  # This must remain after the data is graphed.
+    return axes, curves
+
+
+def _graph_loss(configuration, axes, table):
     if not configuration["draw_loss"]:
-        return
-    vta.loss.data.sort_by_loss(losses, configuration["sort_algorithm"])
-    for loss in losses[0 : configuration["maximum_graphs"]]:
-        value = loss.loss_values[-1]
-        axes.plot(
-            range(len(loss.loss_values)),
-            loss.loss_values,
-            label=f"[{value:.3f}] {loss.label}",
-            linestyle="-" if configuration["line_loss"] else "",
-            marker="." if configuration["scatter_loss"] else "",
+        return []
+    with vta.utilities.profiling.phase("sort"):
+        best = vta.loss.ranking.rank(
+            table,
+            "loss",
+            _ranking_options(configuration),
+            configuration["maximum_graphs"],
         )
+    return [_Curve(axes, table[i], "loss", configuration) for i in best]
 
 
-def _graph_precision(configuration, axes, precisions):
+def _graph_precision(configuration, axes, table):
     if not configuration["draw_precision"]:
+        return []
+    with vta.utilities.profiling.phase("sort"):
+        best = vta.loss.ranking.rank(
+            table,
+            "precision",
+            _ranking_options(configuration),
+            configuration["maximum_graphs"],
+        )
+    return [_Curve(axes, table[i], "precision", configuration) for i in best]
+
+
+def _draw_trends(axes, curves, configuration):
+    """Fit the trends of all the curves of each kind at once, and draw them."""
+    if configuration["trend"] == "none":
         return
-    vta.loss.data.sort_by_precision(precisions, configuration["sort_algorithm"])
-    for precision in precisions[0 : configuration["maximum_graphs"]]:
-        value = precision.precision_values[-1]
-        axes.plot(
-            range(len(precision.precision_values)),
-            precision.precision_values,
-            label=f"[{value:.3f}] {precision.label}",
-            linestyle="-" if configuration["line_precision"] else "",
-            marker="." if configuration["scatter_precision"] else "",
+    options = vta.loss.trend.TrendOptions(
+        configuration["trend"],
+        configuration["trend_window"],
+        configuration["trend_smoothing"],
+    )
+    for kind in ("loss", "precision"):
+        drawn = [curve for curve in curves if curve.kind == kind]
+        column = vta.loss.data.RaggedArray.from_arrays([c.values for c in drawn])
+        with vta.utilities.profiling.phase("trend"):
+            fitted = vta.loss.trend.trends(column, options)
+        for row, curve in enumerate(drawn):
+            curve.set_trend(
+                axes,
+                vta.loss.trend.TrendFollower(options, curve.values, fitted[row]),
+            )
+
+
+def _ranking_options(configuration):
+    return vta.loss.ranking.RankingOptions(
+        configuration["sort_algorithm"],
+        configuration["sort_window"],
+        configuration["sort_smoothing"],
+    )
+
+
+class _Curve:
+    """Draws one array of a Loss, downsampled to the width of the axes.
+
+    A trend of the array can be drawn over it, in the same color.
+    """
+
+    def __init__(self, axes, loss, kind, configuration):
+        self.loss = loss
+        self.kind = kind
+        self.algorithm = configuration["downsample"]
+        self.trend = None
+        self.length = len(self.values)
+        self.downsampler = vta.loss.downsample.Downsampler(self.values, self.algorithm)
+        (self.line,) = axes.plot(
+            *self.downsampler.select(0, self.length, _pixel_width(axes)),
+            label=self.label,
+            linestyle="-" if configuration[f"line_{kind}"] else "",
+            marker="." if configuration[f"scatter_{kind}"] else "",
+        )
+
+    @property
+    def values(self):
+        """The drawn array of the loss."""
+        return getattr(self.loss, f"{self.kind}_values")
+
+    @property
+    def label(self):
+        """The legend label, which starts with the last value."""
+        return f"[{self.values[-1]:.3f}] {self.loss.label}"
+
+    def reload(self, axes, unchanged):
+        """Downsample the values again, and extend the trend, after the loss
+        data changed.
+
+        :param axes: The axes on which the curve is drawn.
+        :param int unchanged: The number of values at the start of the curve
+            that did not change. When only values were appended, only the new
+            values are downsampled and fitted.
+        """
+        if unchanged < self.length:
+            self.downsampler = vta.loss.downsample.Downsampler(
+                self.values, self.algorithm
+            )
+        else:
+            self.downsampler.extend(self.values)
+        self.length = len(self.values)
+        self.line.set_data(*self.downsampler.select(0, self.length, _pixel_width(axes)))
+        self.line.set_label(self.label)
+        if self.trend is not None:
+            follower = self.trend[0]
+            self.set_trend(axes, follower, follower.update(self.values, unchanged))
+
+    def set_trend(self, axes, follower, values=None):
+        """Draw a trend over the curve, replacing the previous trend.
+
+        :param axes: The axes on which the curve is drawn.
+        :param vta.loss.trend.TrendFollower follower: Fits the trend.
+        :param numpy.ndarray values: The trend, if it is not the trend last
+            fitted by the follower.
+        """
+        if self.trend is not None:
+            self.trend[2].remove()
+        # Trends are smooth, so evenly spaced points show their shape.
+        algorithm = "none" if self.algorithm == "none" else "stride"
+        downsampler = vta.loss.downsample.Downsampler(
+            follower.fitted if values is None else values, algorithm
+        )
+        (line,) = axes.plot(
+            *downsampler.select(*axes.get_xlim(), _pixel_width(axes)),
+            color=self.line.get_color(),
+            linestyle="--",
+        )
+        self.trend = follower, downsampler, line
+
+    def draw(self, axes):
+        """Select the points for the visible range of the axes."""
+        start, stop = axes.get_xlim()
+        self.line.set_data(*self.downsampler.select(start, stop, _pixel_width(axes)))
+        if self.trend is not None:
+            _, downsampler, line = self.trend
+            line.set_data(*downsampler.select(start, stop, _pixel_width(axes)))
+
+
+def _pixel_width(axes):
+    return max(1, int(axes.bbox.width))
+
+
+def _redraw_on_zoom(figure, axes, curves):
+    def draw(_):
+        for curve in curves:
+            curve.draw(axes)
+
+    axes.callbacks.connect("xlim_changed", draw)
+    figure.canvas.mpl_connect("resize_event", draw)
+
+
+def _follow(axes, curves, table, interval):
+    """Create a timer that updates the curves from the files that changed.
+
+    Only the changed curves are given new data; when records were appended to
+    a file, only the new records are downsampled and fitted. The figure is
+    only redrawn when a file changed.
+    """
+    # The table returns the same Loss object each time a run is requested.
+    sources = {id(table[row]): source for row, source in enumerate(table.sources)}
+    followers = {
+        id(curve.loss): vta.loss.loss_file.LossFollower(
+            sources[id(curve.loss)], curve.loss
         )
+        for curve in curves
+    }
+
+    def update():
+        changed = {key for key, f in followers.items() if f.poll()}
+        if not changed:
+            return
+        for curve in curves:
+            if id(curve.loss) in changed:
+                curve.reload(axes, followers[id(curve.loss)].unchanged)
+        axes.relim()
+        axes.autoscale_view()
+        for curve in curves:
+            curve.draw(axes)
+        axes.legend()
+        axes.figure.canvas.draw_idle()
+
+    timer = axes.figure.canvas.new_timer(interval=int(interval * 1000))
+    timer.add_callback(update)
+    return timer
 
 
 def _augment_configuration(configuration):
@@ -108,25 +432,56 @@ def _augment_configuration(configuration):
     configuration["draw_precision"] = (
         configuration["scatter_precision"] or configuration["line_precision"]
     )
+    configuration.setdefault("downsample", "minmax")
+    configuration.setdefault("sort_window", 10)
+    configuration.setdefault("sort_smoothing", 0.1)
+    configuration.setdefault("invalid_data_policy", "reject")
+    configuration.setdefault("trend", "none")
+    configuration.setdefault("trend_window", 100)
+    configuration.setdefault("trend_smoothing", 0.02)
+    vta.loss.ranking.check_smoothing("sort_smoothing", configuration["sort_smoothing"])
     # configuration["sort_algorithm"] = configuration["sort_algorithm"].lower()
     return configuration
 
 
-def _read_loss_data(file_paths):
+def _read_loss_data(file_paths, jobs=None, store_directory=None):
+    if store_directory is None:
+        return vta.loss.loss_file.read_loss_files(file_paths, jobs)
+    store = vta.utilities.metric_store.MetricStore(store_directory)
+    # Binary files are mapped rather than parsed, so they are not stored.
+    binary = [vta.loss.loss_file.is_binary_loss_file(f) for f in file_paths]
+    stored = [
+        None if is_binary else store.get(*_store_arguments(file_path))
+        for file_path, is_binary in zip(file_paths, binary)
+    ]
+    stale = [f for f, values in zip(file_paths, stored) if values is None]
+    read = iter(vta.loss.loss_file.read_loss_files(stale, jobs))
     losses = vta.loss.data.LossList()
-    for file_path in file_paths:
-        with open(file_path) as loss_file:
-            data = json.load(loss_file)
-        losses.append(
-            vta.loss.data.Loss(
-                data["label"] if "label" in data else file_path,
-                numpy.array(data["loss"]),
-                numpy.array(data["precision"]),
+    for file_path, is_binary, values in zip(file_paths, binary, stored):
+        if values is None:
+            loss = next(read)
+            if not is_binary:
+                store.put(
+                    *_store_arguments(file_path),
+                    {
+                        "label": loss.label,
+                        "loss": loss.loss_values,
+                        "precision": loss.precision_values,
+                    },
+                )
+        else:
+            loss = vta.loss.data.Loss(
+                str(values["label"]), values["loss"], values["precision"]
             )
-        )
+        losses.append(loss)
+    store.save()
     return losses
 
 
+def _store_arguments(file_path):
+    return ("loss", os.path.abspath(file_path)), [file_path], {}
+
+
 def _has_invalid_values(data):
     return numpy.any(numpy.logical_not(numpy.isfinite(data)))
 
@@ -145,28 +500,6 @@ def _make_axes(figure, configuration):
         axes.set_ylabel("Precision")
     axes.autoscale(enable=True, axis="both", tight=True)
     axes.grid(
-        b=True, which="major", axis="both", color="#101010", alpha=0.5, linestyle=":"
+        True, which="major", axis="both", color="#101010", alpha=0.5, linestyle=":"
     )
     return axes
-
-
-def _graph_regression(axes, data):
-    """
-    .. todo:: See issue #7
-    """
-    regression = sklearn.linear_model.LinearRegression()
-    x_data = numpy.arange(len(data))  # pylint: disable=invalid-name
-    regression.fit(x_data.reshape(-1, 1), numpy.array(data).reshape(-1, 1))
-    # x_data = numpy.arange(0.0, len(data), 0.1)
-    x_data = numpy.linspace(0.0, len(data), 100)
-    prediction = regression.predict(x_data.reshape(-1, 1))
-    axes.plot(x_data, prediction)
-
-
-def _graph_fit(axes, data):
-    """
-    .. todo:: See issue #7
-    """
-    interpolation = scipy.interpolate.interp1d(range(len(data)), data)
-    x_data = numpy.linspace(0, len(data), 100)
-    axes.plot(x_data, interpolation(x_data))
@@ -0,0 +1,403 @@
+"""Functions for reading and writing loss data files.
+
+Loss files come in two formats, which are detected from the file contents.
+
+A JSON loss file is an object with a *loss* array, a *precision* array, and an
+optional *label*. Training logs can have hundreds of thousands of values, so
+:py:func:`read_loss_file` does not build a Python list for each array. It finds
+each array in the raw bytes and decodes it directly into a float array with
+:py:func:`numpy.fromstring`. Files that this fast path cannot handle, such as
+files whose arrays are nested, are read with :py:mod:`json`.
+
+A binary loss file starts with a header: the 8 bytes ``VTALOSS1``, the length of
+the label as a little-endian 32 bit unsigned integer, and the UTF-8 label,
+padded with zeros to a multiple of 8 bytes. The header is followed by one record
+per epoch: the loss and then the precision, each a little-endian 32 bit float.
+Binary files are read with :py:class:`numpy.memmap`, so only the values that are
+used, such as the last value for sorting, are read from disk. Records can be
+appended to a binary file, with :py:func:`append_loss_records`, while it is
+being read; :py:class:`LossFollower` maps the new records without reading the
+earlier ones again, and only decodes the values appended to a JSON file.
+"""
+
+import concurrent.futures
+import json
+import os
+import re
+import struct
+import warnings
+import zlib
+
+import numpy
+
+import vta.loss.data
+
+BINARY_EXTENSION = ".vtaloss"
+"""The file extension given to binary loss files."""
+
+
+def read_loss_file(file_path: str) -> vta.loss.data.Loss:
+    """Read the loss data in one file, in either format.
+
+    :param str file_path: The path to the JSON or binary loss file.
+    :returns: The loss data. If the file has no label, the file path is used as
+        the label. The arrays of a binary file are memory mapped.
+    :rtype: vta.loss.data.Loss
+    :raises OSError: if the file cannot be read.
+    :raises ValueError: if the file is neither valid JSON nor a valid binary
+        loss file.
+    :raises KeyError: if a JSON file does not have loss and precision arrays.
+    """
+    if is_binary_loss_file(file_path):
+        return _read_binary_file(file_path)
+    with open(file_path, "rb") as loss_file:
+        text = loss_file.read()
+    loss = _find_array(text, b"loss")
+    precision = _find_array(text, b"precision")
+    label = _find_label(text)
+    if loss is None or precision is None or label is _INVALID:
+        data = json.loads(text)
+        label = data.get("label")
+        loss = numpy.array(data["loss"], dtype=numpy.float64)
+        precision = numpy.array(data["precision"], dtype=numpy.float64)
+    return vta.loss.data.Loss(file_path if label is None else label, loss, precision)
+
+
+def read_loss_files(file_paths, jobs: int = None) -> vta.loss.data.LossList:
+    """Read the loss data in several files concurrently.
+
+    :param file_paths: A sequence of paths to JSON or binary loss files.
+    :param int jobs: The maximum number of processes that read JSON files at
+        once. If this is ``None`` or 1, the files are read in this process.
+        Binary files are always mapped in this process.
+    :returns: The loss data of each file, in the order of ``file_paths``.
+    :rtype: vta.loss.data.LossList
+    :raises OSError: if a file cannot be read.
+    :raises ValueError: if a file is neither valid JSON nor a valid binary loss
+        file.
+    :raises KeyError: if a JSON file does not have loss and precision arrays.
+    """
+    file_paths = list(file_paths)
+    binary = [is_binary_loss_file(f) for f in file_paths]
+    decoded = iter(
+        _read_json_files([f for f, b in zip(file_paths, binary) if not b], jobs)
+    )
+    return vta.loss.data.LossList(
+        _read_binary_file(f) if b else next(decoded) for f, b in zip(file_paths, binary)
+    )
+
+
+def is_binary_loss_file(file_path: str) -> bool:
+    """Determine if a file is a binary loss file.
+
+    :param str file_path: The path to the file.
+    :returns: ``True`` if the file starts with the binary loss file signature.
+    :rtype: bool
+    :raises OSError: if the file cannot be read.
+    """
+    with open(file_path, "rb") as loss_file:
+        return loss_file.read(len(_SIGNATURE)) == _SIGNATURE
+
+
+def write_binary_loss_file(file_path: str, loss: vta.loss.data.Loss) -> None:
+    """Write loss data to a binary loss file.
+
+    :param str file_path: The path of the file to write. An existing file is
+        replaced.
+    :param vta.loss.data.Loss loss: The loss data to write. It must have one
+        precision value per loss value.
+    :returns: None
+    :raises ValueError: if the loss and precision values have different
+        lengths.
+    :raises OSError: if the file cannot be written.
+    """
+    records = _make_records(loss)
+    label = loss.label.encode("utf-8")
+    header = _SIGNATURE + struct.pack("<I", len(label)) + label
+    part_path = f"{file_path}.part"
+    with open(part_path, "wb") as loss_file:
+        loss_file.write(header.ljust(_header_size(len(label)), b"\0"))
+        loss_file.write(records.tobytes())
+    os.replace(part_path, file_path)
+
+
+def append_loss_records(file_path: str, loss: vta.loss.data.Loss) -> None:
+    """Append records to a binary loss file, creating it if necessary.
+
+    This is meant to be called by training jobs after each epoch, so that
+    ``vta loss --follow`` can show their progress.
+
+    :param str file_path: The path of the binary loss file.
+    :param vta.loss.data.Loss loss: The new loss and precision values. The label
+        is only used if the file does not exist yet.
+    :returns: None
+    :raises ValueError: if the loss and precision values have different
+        lengths, or if the file is not a binary loss file.
+    :raises OSError: if the file cannot be written.
+    """
+    if not os.path.exists(file_path):
+        write_binary_loss_file(file_path, loss)
+        return
+    records = _make_records(loss)
+    with open(file_path, "r+b") as loss_file:
+        _, offset, size = _read_header(loss_file, file_path)
+        # Overwrite any partial record left by an interrupted append.
+        loss_file.seek(size - (size - offset) % _RECORD_SIZE)
+        loss_file.write(records.tobytes())
+        loss_file.truncate()
+
+
+def convert_loss_file(file_path: str, directory: str) -> str:
+    """Convert a JSON loss file to a binary loss file.
+
+    :param str file_path: The path to the JSON loss file.
+    :param str directory: The directory in which to write the binary file. The
+        binary file has the name of the JSON file, with its extension replaced
+        by :py:data:`BINARY_EXTENSION`.
+    :returns: The path to the binary file.
+    :rtype: str
+    :raises OSError: if a file cannot be read or written.
+    :raises ValueError: if the JSON file cannot be read, or if its loss and
+        precision arrays have different lengths.
+    :raises KeyError: if the JSON file does not have loss and precision arrays.
+    """
+    loss = read_loss_file(file_path)
+    if loss.label == file_path:
+        loss.label = ""  # The binary file's own path will be its label.
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    binary_path = os.path.join(directory, name + BINARY_EXTENSION)
+    write_binary_loss_file(binary_path, loss)
+    return binary_path
+
+
+class LossFollower:
+    """Follows a loss file, updating its loss data as the file changes.
+
+    A binary file that has grown is mapped again; the new records become part
+    of the loss arrays, and the earlier records are not read again. A JSON file
+    has to be read again from the start, but when values were only appended to
+    its arrays, only the new values are decoded; the bytes of the values
+    decoded before are compared with a checksum.
+    """
+
+    def __init__(self, file_path: str, loss: vta.loss.data.Loss):
+        """Start following a file.
+
+        :param str file_path: The path to the loss file.
+        :param vta.loss.data.Loss loss: The loss data already read from the
+            file. It is updated in place by :py:meth:`poll`.
+        """
+        self.__file_path = file_path
+        self.__loss = loss
+        self.__state = _file_state(file_path)
+        self.__unchanged = 0
+        # The size and checksum of the decoded text of each JSON array, up to
+        # its last comma, and the number of values before that comma.
+        self.__prefixes = {}
+
+    @property
+    def file_path(self) -> str:
+        """The path to the followed file."""
+        return self.__file_path
+
+    @property
+    def loss(self) -> vta.loss.data.Loss:
+        """The loss data, which is updated by :py:meth:`poll`."""
+        return self.__loss
+
+    @property
+    def unchanged(self) -> int:
+        """The number of values at the start of the arrays kept by the last change."""
+        return self.__unchanged
+
+    def poll(self) -> bool:
+        """Check the file for changes, and update the loss data.
+
+        :returns: ``True`` if the loss data changed. ``False`` if the file did
+            not change, or if it could not be read, for example because a JSON
+            file is being rewritten; it is checked again at the next poll.
+        :rtype: bool
+        """
+        try:
+            state = _file_state(self.__file_path)
+            if state == self.__state:
+                return False
+            if is_binary_loss_file(self.__file_path):
+                loss = _read_binary_file(self.__file_path)
+                # Records are only overwritten by replacing the file.
+                kept = self.__loss if state[2] == self.__state[2] else None
+                unchanged = _common_length(kept, loss)
+            else:
+                loss, unchanged = self.__read_json()
+        except (OSError, ValueError, KeyError):
+            return False
+        self.__state = state
+        self.__unchanged = unchanged
+        self.__loss.label = loss.label
+        self.__loss.loss_values = loss.loss_values
+        self.__loss.precision_values = loss.precision_values
+        return True
+
+    def __read_json(self):
+        """Read the JSON file, decoding only the values appended to it."""
+        with open(self.__file_path, "rb") as loss_file:
+            text = loss_file.read()
+        label = _find_label(text)
+        arrays = [self.__decode(text, key) for key in (b"loss", b"precision")]
+        if label is _INVALID or None in arrays:
+            self.__prefixes = {}
+            return read_loss_file(self.__file_path), 0
+        label = self.__file_path if label is None else label
+        loss = vta.loss.data.Loss(label, arrays[0][0], arrays[1][0])
+        return loss, min(arrays[0][1], arrays[1][1])
+
+    def __decode(self, text, key):
+        """Return an array of the JSON file and the number of kept values."""
+        span = _find_span(text, key)
+        if span is None:
+            return None
+        start, end = span
+        size, checksum, count = self.__prefixes.get(key, (0, 0, 0))
+        old = getattr(self.__loss, f"{key.decode()}_values")
+        if (
+            end - start < size
+            or len(old) < count
+            or zlib.crc32(memoryview(text)[start : start + size]) != checksum
+        ):
+            size = count = 0
+        new = _decode_array(text[start + size : end])
+        if new is None:
+            return None
+        values = numpy.concatenate((numpy.asarray(old[:count], numpy.float64), new))
+        comma = text.rfind(b",", start, end) + 1 if len(values) > 1 else start
+        self.__prefixes[key] = (
+            comma - start,
+            zlib.crc32(memoryview(text)[start:comma]),
+            max(0, len(values) - 1),
+        )
+        return values, count
+
+
+# -----------------------------------------------------------------------------
+#                                                       implementation details
+# -----------------------------------------------------------------------------
+_INVALID = object()
+_SIGNATURE = b"VTALOSS1"
+_RECORD_TYPE = numpy.dtype("<f4")
+_RECORD_SIZE = 2 * _RECORD_TYPE.itemsize
+
+
+def _file_state(file_path):
+    status = os.stat(file_path)
+    return status.st_mtime_ns, status.st_size, status.st_ino
+
+
+def _common_length(old, new):
+    """Return the number of records of the old loss data still in the new."""
+    if old is None:
+        return 0
+    return min(len(old.loss_values), len(new.loss_values))
+
+
+def _header_size(label_size):
+    return -(-(len(_SIGNATURE) + 4 + label_size) // 8) * 8
+
+
+def _make_records(loss):
+    if len(loss.loss_values) != len(loss.precision_values):
+        raise ValueError(
+            f"{loss.label} has {len(loss.loss_values)} loss values, but"
+            f" {len(loss.precision_values)} precision values"
+        )
+    records = numpy.empty((len(loss.loss_values), 2), dtype=_RECORD_TYPE)
+    records[:, 0] = loss.loss_values
+    records[:, 1] = loss.precision_values
+    return records
+
+
+def _read_header(loss_file, file_path):
+    """Return the label, the offset of the first record, and the file size."""
+    header = loss_file.read(len(_SIGNATURE) + 4)
+    if len(header) < len(_SIGNATURE) + 4 or not header.startswith(_SIGNATURE):
+        raise ValueError(f"{file_path} is not a binary loss file")
+    (label_size,) = struct.unpack("<I", header[len(_SIGNATURE) :])
+    label = loss_file.read(label_size)
+    size = os.fstat(loss_file.fileno()).st_size
+    offset = _header_size(label_size)
+    if len(label) < label_size or size < offset:
+        raise ValueError(f"{file_path} has a truncated header")
+    return label.decode("utf-8"), offset, size
+
+
+def _read_binary_file(file_path):
+    with open(file_path, "rb") as loss_file:
+        label, offset, size = _read_header(loss_file, file_path)
+    count = (size - offset) // _RECORD_SIZE
+    if count:
+        records = numpy.memmap(
+            file_path, _RECORD_TYPE, "r", offset=offset, shape=(count, 2)
+        )
+    else:
+        records = numpy.empty((0, 2), dtype=_RECORD_TYPE)
+    return vta.loss.data.Loss(label or file_path, records[:, 0], records[:, 1])
+
+
+def _read_json_files(file_paths, jobs):
+    if jobs is None or jobs <= 1 or len(file_paths) <= 1:
+        return [read_loss_file(f) for f in file_paths]
+    chunk_size = max(1, len(file_paths) // (jobs * 4))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(read_loss_file, file_paths, chunksize=chunk_size))
+
+
+_LABEL = re.compile(rb'"label"\s*:\s*("(?:[^"\\]|\\.)*"|null)')
+_NESTED = b'[]{}"'
+
+
+def _find_array(text, key):
+    """Decode the flat array of numbers that is the value of key.
+
+    None is returned if key is missing, appears more than once, or is not a
+    flat array of numbers.
+    """
+    span = _find_span(text, key)
+    return None if span is None else _decode_array(text[span[0] : span[1]])
+
+
+def _find_span(text, key):
+    """Find the start and end of the text in the brackets of key's array.
+
+    None is returned if key is missing, or appears more than once.
+    """
+    matches = list(re.finditer(rb'"' + key + rb'"\s*:\s*\[', text))
+    if len(matches) != 1:
+        return None
+    start = matches[0].end()
+    end = text.find(b"]", start)
+    return None if end < 0 else (start, end)
+
+
+def _decode_array(values):
+    """Decode comma separated numbers, or return None if there are others."""
+    if any(character in values for character in _NESTED):
+        return None
+    count = values.count(b",") + 1 if values.strip() else 0
+    with warnings.catch_warnings():
+        # Older versions of numpy warn when they stop at text that is not a
+        # number, and the count check below rejects such arrays; newer
+        # versions raise.
+        warnings.simplefilter("ignore", DeprecationWarning)
+        try:
+            array = numpy.fromstring(values, dtype=numpy.float64, sep=",")
+        except ValueError:
+            return None
+    return array if len(array) == count else None
+
+
+def _find_label(text):
+    matches = list(_LABEL.finditer(text))
+    if len(matches) > 1:
+        return _INVALID
+    if not matches:
+        return _INVALID if b'"label"' in text else None
+    return json.loads(matches[0].group(1))
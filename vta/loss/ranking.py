@@ -0,0 +1,153 @@
+"""Functions for ranking training runs by their loss or precision.
+
+Runs are ranked from a :py:class:`vta.loss.data.LossTable`. Every run is reduced
+to one score in a single vectorized pass over the table's columns, and only the
+best runs are selected, with :py:func:`numpy.argpartition`. Scores that only
+need the last epochs of each run read only those; the area under the curve uses
+the table's cached prefix sums. NaN and infinite values are ignored by
+*mean_last* and *auc*, so they only affect the score of their own run.
+"""
+
+import numpy
+
+ALGORITHMS = ("last", "mean_last", "ema", "minimum", "auc")
+"""The names of the ranking algorithms.
+
+:last: The last value.
+:mean_last: The mean of the last values; see :py:attr:`RankingOptions.window`.
+:ema: The exponential moving average at the last value; see
+    :py:attr:`RankingOptions.smoothing`.
+:minimum: The best value: the minimum loss, or the maximum precision.
+:auc: The area under the curve, with the trapezoidal rule.
+"""
+
+
+class RankingOptions:
+    """Options that control how runs are ranked.
+
+    .. py:attribute:: algorithm
+        One of :py:data:`ALGORITHMS`.
+
+    .. py:attribute:: window
+        The number of values averaged by *mean_last*.
+
+    .. py:attribute:: smoothing
+        The weight of the newest value in the *ema* average, greater than 0
+        and at most 1.
+
+    :raises ValueError: if the smoothing is not greater than 0 and at most 1.
+    """
+
+    def __init__(self, algorithm: str = "last", window: int = 10, smoothing=0.1):
+        check_smoothing("smoothing", smoothing)
+        self.algorithm = algorithm
+        self.window = window
+        self.smoothing = smoothing
+
+
+def check_smoothing(name: str, smoothing) -> None:
+    """Check that the weight of the newest value of an EMA is valid.
+
+    :param str name: The name of the setting, for the error message.
+    :param float smoothing: The weight of the newest value.
+    :returns: None
+    :raises ValueError: if the weight is not greater than 0 and at most 1.
+    """
+    if not 0.0 < smoothing <= 1.0:
+        raise ValueError(
+            f"{name} must be greater than 0 and at most 1, not {smoothing}"
+        )
+
+
+def score(table, kind: str, options: RankingOptions) -> numpy.ndarray:
+    """Calculate the score of each run.
+
+    :param vta.loss.data.LossTable table: The runs to score.
+    :param str kind: Either *loss* or *precision*; the values that are scored.
+    :param RankingOptions options: How to score the runs.
+    :returns: One score per run. Runs without values score NaN.
+    :rtype: numpy.ndarray
+    :raises ValueError: if the algorithm is not one of :py:data:`ALGORITHMS`.
+    """
+    column = getattr(table, kind)
+    if options.algorithm == "last":
+        return column.last()
+    if options.algorithm == "minimum":
+        return column.reduce(numpy.fmin if kind == "loss" else numpy.fmax)
+    if options.algorithm == "ema":
+        return _score_ema(column, options.smoothing)
+    if options.algorithm == "mean_last":
+        return _score_mean_last(column, options.window)
+    if options.algorithm == "auc":
+        return _score_auc(column)
+    raise ValueError(f"{options.algorithm} is not a ranking algorithm")
+
+
+def rank(table, kind: str, options: RankingOptions, count: int = None):
+    """Find the best runs, best first.
+
+    Lower scores are better for loss, and higher scores are better for
+    precision. Runs that score NaN are ranked last.
+
+    :param vta.loss.data.LossTable table: The runs to rank.
+    :param str kind: Either *loss* or *precision*; the values that are ranked.
+    :param RankingOptions options: How to score the runs.
+    :param int count: The number of runs to find, or ``None`` to rank every run.
+    :returns: The indices of the best runs in ``table``, best first.
+    :rtype: numpy.ndarray
+    :raises ValueError: if the algorithm is not one of :py:data:`ALGORITHMS`.
+    """
+    scores = score(table, kind, options)
+    keys = scores if kind == "loss" else -scores
+    keys = numpy.where(numpy.isnan(keys), numpy.inf, keys)
+    if count is None or count >= len(keys):
+        return numpy.argsort(keys, kind="stable")
+    if count <= 0:
+        return numpy.empty(0, dtype=numpy.intp)
+    best = numpy.argpartition(keys, count - 1)[:count]
+    return best[numpy.lexsort((best, keys[best]))]
+
+
+# -----------------------------------------------------------------------------
+#                                                       implementation details
+# -----------------------------------------------------------------------------
+_EMA_TOLERANCE = 1e-6
+
+
+def _score_mean_last(column, window):
+    tails, present = column.tails(max(1, window))
+    finite = present & numpy.isfinite(tails)
+    with numpy.errstate(invalid="ignore", divide="ignore"):
+        return numpy.sum(tails, axis=1, where=finite) / finite.sum(axis=1)
+
+
+def _score_auc(column):
+    """Integrate the finite values of each run with the trapezoidal rule."""
+    sums = column.prefix_sums()
+    totals = sums[column.offsets[1:]] - sums[column.offsets[:-1]]
+    first, last = column.first(), column.last()
+    damaged = ~(numpy.isfinite(first) & numpy.isfinite(last))
+    if damaged.any():
+        # The ends of a run are its first and last finite values.
+        finite = column.select(damaged)
+        finite = finite.compress(numpy.isfinite(finite.values))
+        first[damaged], last[damaged] = finite.first(), finite.last()
+    return totals - (first + last) / 2.0
+
+
+def _score_ema(column, smoothing):
+    """Average the last values with exponentially decaying weights.
+
+    Older values are ignored once their weight falls below _EMA_TOLERANCE, so
+    only the last few values of each run are read.
+    """
+    decay = 1.0 - smoothing
+    if decay <= 0.0:
+        return column.last()
+    window = int(numpy.ceil(numpy.log(_EMA_TOLERANCE) / numpy.log(decay))) + 1
+    weights = decay ** numpy.arange(window - 1, -1, -1, dtype=numpy.float64)
+    tails, present = column.tails(window)
+    weighted = numpy.sum(tails * weights, axis=1, where=present)
+    # Dividing by the sum of the weights corrects the bias of short runs.
+    with numpy.errstate(invalid="ignore", divide="ignore"):
+        return weighted / numpy.sum(weights * present, axis=1)
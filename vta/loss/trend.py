@@ -0,0 +1,283 @@
+"""Functions for fitting trends to the curves of many runs at once.
+
+Runs whose lengths are within a factor of 2 of each other are copied into a
+two dimensional array, one run per row, padded with NaN by
+:py:meth:`vta.loss.data.RaggedArray.pad`; so every run of such a batch is
+fitted in the same vectorized pass, and the padding never more than doubles the
+size of the data. Values that are not finite, including the padding, are
+ignored. Lines are fitted with the closed form least squares solution, and
+curves are smoothed by convolving them with a kernel, with overlap-add FFT
+convolution, so the memory used only grows with the length of the curves.
+
+The trend of a curve that grows, such as a followed training log, is extended
+by a :py:class:`TrendFollower`, which only reads the new values.
+"""
+
+import numpy
+
+import vta.loss.data
+import vta.loss.ranking
+
+METHODS = ("linear", "moving_average", "ema")
+"""The names of the trend fitting methods.
+
+:linear: The least squares line through the values of the run.
+:moving_average: The mean of the last :py:attr:`TrendOptions.window` values.
+:ema: The exponential moving average; see :py:attr:`TrendOptions.smoothing`.
+"""
+
+
+class TrendOptions:
+    """Options that control how trends are fitted.
+
+    .. py:attribute:: method
+        One of :py:data:`METHODS`.
+
+    .. py:attribute:: window
+        The number of values averaged by *moving_average*.
+
+    .. py:attribute:: smoothing
+        The weight of the newest value in the *ema* average, greater than 0
+        and at most 1.
+
+    :raises ValueError: if the smoothing is not greater than 0 and at most 1.
+    """
+
+    def __init__(self, method: str = "ema", window: int = 100, smoothing=0.02):
+        vta.loss.ranking.check_smoothing("smoothing", smoothing)
+        self.method = method
+        self.window = window
+        self.smoothing = smoothing
+
+
+def fit_lines(values: numpy.ndarray) -> tuple:
+    """Fit a line to each row, with least squares.
+
+    :param numpy.ndarray values: A two dimensional array with one curve per
+        row. The x value of each point is its column.
+    :returns: A tuple of the slope and the intercept of each row's line. A row
+        with one finite value has a slope of 0; a row without finite values has
+        a NaN slope and intercept.
+    :rtype: tuple(numpy.ndarray, numpy.ndarray)
+    """
+    valid = numpy.isfinite(values)
+    counts = valid.sum(axis=1)
+    x_data = numpy.arange(values.shape[1], dtype=numpy.float64)
+    y_data = numpy.where(valid, values, 0.0)
+    with numpy.errstate(invalid="ignore", divide="ignore"):
+        x_means = (valid * x_data).sum(axis=1) / counts
+        y_means = y_data.sum(axis=1) / counts
+        # Centering x keeps the sums small, so long runs lose no precision.
+        x_offsets = numpy.where(valid, x_data - x_means[:, None], 0.0)
+        variances = (x_offsets * x_offsets).sum(axis=1)
+        slopes = (x_offsets * y_data).sum(axis=1) / variances
+    slopes = numpy.where(counts == 1, 0.0, slopes)
+    return slopes, y_means - slopes * x_means
+
+
+def smooth(values: numpy.ndarray, kernel: numpy.ndarray) -> numpy.ndarray:
+    """Smooth each row with a weighted average of its last values.
+
+    :param numpy.ndarray values: A two dimensional array with one curve per
+        row.
+    :param numpy.ndarray kernel: The weight of each value in the average; the
+        first weight is given to the newest value.
+    :returns: The smoothed rows. Each value is divided by the sum of the
+        weights of the finite values it averages, so that the start of a run,
+        and the values around a gap, are not biased toward 0. Values that do
+        not average any finite value are NaN.
+    :rtype: numpy.ndarray
+    """
+    if values.size == 0:
+        return numpy.array(values, dtype=numpy.float64)
+    # SciPy takes a second to import, so it is only imported to smooth.
+    import scipy.signal  # pylint: disable=import-outside-toplevel
+
+    valid = numpy.isfinite(values)
+    width = values.shape[1]
+    # Weights after the first width are never applied to a value of the rows.
+    kernel = numpy.asarray(kernel, dtype=numpy.float64)[None, :width]
+
+    def convolve(data):
+        return scipy.signal.oaconvolve(data, kernel, axes=1)[:, :width]
+
+    weights = convolve(valid.astype(numpy.float64))
+    sums = convolve(numpy.where(valid, values, 0.0))
+    # Where no finite value is averaged, the weights are only rounding errors.
+    covered = weights > numpy.min(kernel) / 2.0
+    with numpy.errstate(invalid="ignore", divide="ignore"):
+        return numpy.where(covered, sums / weights, numpy.nan)
+
+
+def trends(
+    column: vta.loss.data.RaggedArray, options: TrendOptions
+) -> vta.loss.data.RaggedArray:
+    """Fit the trend of every row of a column.
+
+    :param vta.loss.data.RaggedArray column: The curves, one per row.
+    :param TrendOptions options: How to fit the trends.
+    :returns: A ragged array with the trend of each row, with the same offsets
+        as ``column``.
+    :rtype: vta.loss.data.RaggedArray
+    :raises ValueError: if the method is not one of :py:data:`METHODS`.
+    """
+    kernel = _kernel(options)
+    fitted = numpy.full(column.offsets[-1], numpy.nan)
+    for rows in _batches(column.lengths):
+        batch = column.select(rows)
+        values = batch.pad()
+        epochs = numpy.arange(values.shape[1])
+        if kernel is None:
+            slopes, intercepts = fit_lines(values)
+            values = slopes[:, None] * epochs + intercepts[:, None]
+        else:
+            values = smooth(values, kernel)
+        fitted[_positions(column, rows)] = values[epochs < batch.lengths[:, None]]
+    return vta.loss.data.RaggedArray(fitted, column.offsets.copy())
+
+
+class TrendFollower:
+    """Extends the trend of one curve as values are appended to it.
+
+    Each value of a smoothed trend only depends on the last values of the
+    curve, as many as the kernel is long; so only the new values, and that
+    many values before them, are read and smoothed. For *linear*, the means and
+    sums of squares of the least squares fit are updated with the new values,
+    and the line is evaluated again.
+    """
+
+    def __init__(self, options: TrendOptions, values, fitted: numpy.ndarray):
+        """Start following a curve whose trend was fitted by :py:func:`trends`.
+
+        :param TrendOptions options: How the trend was fitted.
+        :param numpy.ndarray values: The values of the curve.
+        :param numpy.ndarray fitted: The trend of the values, which is not
+            fitted again.
+        :raises ValueError: if the method is not one of :py:data:`METHODS`.
+        """
+        self.__kernel = _kernel(options)
+        self.__fitted = numpy.array(fitted, dtype=numpy.float64)
+        self.__length = len(self.__fitted)
+        # The count, the means of x and y, and the sums of the squared x
+        # offsets and of the products of the offsets, of the finite values.
+        self.__moments = numpy.zeros(5)
+        if self.__kernel is None:
+            self.__length = 0
+            self.update(values, 0)
+
+    @property
+    def fitted(self) -> numpy.ndarray:
+        """The trend of the values given to the last update."""
+        return self.__fitted[: self.__length]
+
+    def update(self, values, unchanged: int) -> numpy.ndarray:
+        """Extend the trend to the values appended to the curve.
+
+        :param numpy.ndarray values: The values of the curve.
+        :param int unchanged: The number of values at the start of the curve
+            that did not change since the last update. The trend of the values
+            after them is fitted again.
+        :returns: The trend of the values.
+        :rtype: numpy.ndarray
+        """
+        start = min(self.__length, max(0, unchanged), len(values))
+        if self.__kernel is None:
+            if start < self.__length:
+                self.__moments[:] = 0.0
+                start = 0
+            _add_moments(self.__moments, values, start)
+            slope, intercept = _line(self.__moments)
+            self.__reserve(len(values))
+            numpy.multiply(
+                numpy.arange(len(values)), slope, out=self.__fitted[: len(values)]
+            )
+            self.__fitted[: len(values)] += intercept
+        else:
+            first = max(0, start - len(self.__kernel) + 1)
+            window = numpy.asarray(values[first:], dtype=numpy.float64)
+            self.__reserve(len(values))
+            self.__fitted[start : len(values)] = smooth(window[None], self.__kernel)[
+                0, start - first :
+            ]
+        self.__length = len(values)
+        return self.fitted
+
+    def __reserve(self, size):
+        """Make room for a trend of a size, doubling the capacity if needed."""
+        if size > len(self.__fitted):
+            grown = numpy.empty(max(size, 2 * len(self.__fitted)))
+            grown[: self.__length] = self.__fitted[: self.__length]
+            self.__fitted = grown
+
+
+# -----------------------------------------------------------------------------
+#                                                       implementation details
+# -----------------------------------------------------------------------------
+_EMA_TOLERANCE = 1e-6
+
+
+def _kernel(options):
+    """Return the smoothing kernel of a method, or None for *linear*."""
+    if options.method == "linear":
+        return None
+    if options.method == "moving_average":
+        return numpy.ones(max(1, options.window))
+    if options.method == "ema":
+        return _ema_kernel(options.smoothing)
+    raise ValueError(f"{options.method} is not a trend method")
+
+
+def _batches(lengths):
+    """Yield the non-empty rows in groups whose lengths are within a factor 2."""
+    rows = numpy.flatnonzero(lengths)
+    _, exponents = numpy.frexp(lengths[rows])
+    for exponent in numpy.unique(exponents):
+        yield rows[exponents == exponent]
+
+
+def _positions(column, rows):
+    """Return the positions in ``column.values`` of the values of rows."""
+    lengths = column.lengths[rows]
+    ends = numpy.cumsum(lengths)
+    return numpy.repeat(column.offsets[rows] - (ends - lengths), lengths) + (
+        numpy.arange(ends[-1])
+    )
+
+
+def _ema_kernel(smoothing):
+    """Return the weights of the EMA, ignoring those below _EMA_TOLERANCE."""
+    decay = 1.0 - smoothing
+    if decay <= 0.0:
+        return numpy.ones(1)
+    size = int(numpy.ceil(numpy.log(_EMA_TOLERANCE) / numpy.log(decay))) + 1
+    return decay ** numpy.arange(size, dtype=numpy.float64)
+
+
+def _add_moments(moments, values, start):
+    """Merge the moments of the finite values after start into moments."""
+    new = numpy.asarray(values[start:], dtype=numpy.float64)
+    valid = numpy.isfinite(new)
+    count = numpy.count_nonzero(valid)
+    if count == 0:
+        return
+    x_data = numpy.flatnonzero(valid) + float(start)
+    y_data = new[valid]
+    x_mean, y_mean = x_data.mean(), y_data.mean()
+    x_offsets = x_data - x_mean
+    total = moments[0] + count
+    x_shift, y_shift = x_mean - moments[1], y_mean - moments[2]
+    weight = moments[0] * count / total
+    moments[3] += x_offsets.dot(x_offsets) + x_shift * x_shift * weight
+    moments[4] += x_offsets.dot(y_data - y_mean) + x_shift * y_shift * weight
+    moments[1] += x_shift * count / total
+    moments[2] += y_shift * count / total
+    moments[0] = total
+
+
+def _line(moments):
+    """Return the slope and intercept of the least squares line of moments."""
+    count, x_mean, y_mean, x_squares, products = moments
+    if count == 0:
+        return numpy.nan, numpy.nan
+    slope = products / x_squares if count > 1 else 0.0
+    return slope, y_mean - slope * x_mean
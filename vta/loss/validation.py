@@ -0,0 +1,158 @@
+"""Functions for finding and repairing invalid values in loss data.
+
+A value is invalid if it is NaN, +infinity, or -infinity. One diverged training
+step can leave a few invalid values in a run that is otherwise useful, so
+instead of rejecting the run, it can be repaired with one of
+:py:data:`POLICIES`. Invalid values are found, and runs are repaired, with
+vectorized passes over the columns of a :py:class:`vta.loss.data.LossTable`.
+"""
+
+import numpy
+
+import vta.loss.data
+
+KINDS = ("loss", "precision")
+"""The names of the columns of a :py:class:`vta.loss.data.LossTable`."""
+
+POLICIES = ("reject", "truncate", "forward_fill", "mask")
+"""The names of the policies for runs that have invalid values.
+
+:reject: Remove the run.
+:truncate: Remove the values of the run from the first epoch that has an
+    invalid loss or precision value.
+:forward_fill: Replace each invalid value with the last valid value before it.
+    Invalid values before the first valid value of a run become NaN.
+:mask: Replace each invalid value with NaN, so that it is not drawn.
+
+Runs that are left without any valid values are removed, whatever the policy.
+"""
+
+
+class InvalidValues:
+    """The positions of the invalid values in one column of a table.
+
+    .. py:attribute:: kind
+        The column, one of :py:data:`KINDS`.
+
+    .. py:attribute:: rows
+        A numpy.ndarray of the run of each invalid value, in ascending order.
+
+    .. py:attribute:: epochs
+        A numpy.ndarray of the epoch of each invalid value, that is its index
+        in its run. The epochs of each run are in ascending order.
+    """
+
+    def __init__(self, kind: str, rows: numpy.ndarray, epochs: numpy.ndarray):
+        self.kind = kind
+        self.rows = rows
+        self.epochs = epochs
+
+    def __len__(self) -> int:
+        """The number of invalid values."""
+        return len(self.rows)
+
+    def epochs_of(self, row: int) -> numpy.ndarray:
+        """The epochs of the invalid values of one run.
+
+        :param int row: The run.
+        :returns: The epochs, in ascending order.
+        :rtype: numpy.ndarray
+        """
+        start, stop = numpy.searchsorted(self.rows, [row, row + 1])
+        return self.epochs[start:stop]
+
+
+def find_invalid_values(table: vta.loss.data.LossTable) -> list:
+    """Find every invalid value of every run.
+
+    :param vta.loss.data.LossTable table: The runs to check.
+    :returns: One :py:class:`InvalidValues` for each of :py:data:`KINDS`, in
+        that order.
+    :rtype: list
+    """
+    return [InvalidValues(kind, *getattr(table, kind).find_invalid()) for kind in KINDS]
+
+
+def repair(
+    table: vta.loss.data.LossTable, policy: str, invalid: list = None
+) -> vta.loss.data.LossTable:
+    """Repair, or reject, the runs that have invalid values.
+
+    :param vta.loss.data.LossTable table: The runs to repair. They are not
+        changed.
+    :param str policy: One of :py:data:`POLICIES`.
+    :param list invalid: The invalid values of ``table``, as returned by
+        :py:func:`find_invalid_values`. If this is ``None``, they are found.
+    :returns: A table of the repaired runs, and the runs that had no invalid
+        values. If no run has invalid values, ``table`` itself is returned.
+    :rtype: vta.loss.data.LossTable
+    :raises ValueError: if the policy is not one of :py:data:`POLICIES`.
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"{policy} is not an invalid data policy")
+    if invalid is None:
+        invalid = find_invalid_values(table)
+    damaged = numpy.zeros(len(table), dtype=bool)
+    for values in invalid:
+        damaged[values.rows] = True
+    if not damaged.any():
+        return table
+    if policy == "reject":
+        return table.select(~damaged)
+    if policy == "truncate":
+        repaired = _truncate(table, invalid)
+    else:
+        replace = _forward_fill if policy == "forward_fill" else _mask
+        repaired = _with_columns(table, replace(table.loss), replace(table.precision))
+    return repaired.select(~damaged | _has_valid_values(repaired))
+
+
+# -----------------------------------------------------------------------------
+#                                                       implementation details
+# -----------------------------------------------------------------------------
+def _with_columns(table, loss, precision):
+    repaired = vta.loss.data.LossTable(table.labels, loss, precision)
+    repaired.sources = table.sources
+    return repaired
+
+
+def _epochs(column):
+    """Return the index of each value in its row."""
+    starts = numpy.repeat(column.offsets[:-1], column.lengths)
+    return numpy.arange(len(column.values)) - starts
+
+
+def _truncate(table, invalid):
+    cuts = numpy.full(len(table), numpy.iinfo(numpy.int64).max)
+    for values in invalid:
+        numpy.minimum.at(cuts, values.rows, values.epochs)
+    loss, precision = (
+        column.compress(_epochs(column) < numpy.repeat(cuts, column.lengths))
+        for column in (table.loss, table.precision)
+    )
+    return _with_columns(table, loss, precision)
+
+
+def _forward_fill(column):
+    valid = numpy.isfinite(column.values)
+    positions = numpy.arange(len(column.values))
+    previous = numpy.maximum.accumulate(numpy.where(valid, positions, -1))
+    # A value with no valid value before it in its own row becomes NaN.
+    starts = numpy.repeat(column.offsets[:-1], column.lengths)
+    values = numpy.full(len(positions), numpy.nan)
+    filled = previous >= starts
+    values[filled] = column.values[previous[filled]]
+    return vta.loss.data.RaggedArray(values, column.offsets)
+
+
+def _mask(column):
+    values = numpy.where(numpy.isfinite(column.values), column.values, numpy.nan)
+    return vta.loss.data.RaggedArray(values, column.offsets)
+
+
+def _has_valid_values(table):
+    valid = numpy.zeros(len(table), dtype=bool)
+    for kind in KINDS:
+        column = getattr(table, kind)
+        valid[column.row_of(numpy.flatnonzero(numpy.isfinite(column.values)))] = True
+    return valid
@@ -1,12 +1,14 @@
 """Functions and classes for working with files."""
 
+import argparse
+import hashlib
 import os.path
 import sys
 
 
-# The PyLint suppressions are necessary. This class implements the
-# argparse.Action interface, so it must be this way.
-class DirectoryValidator:  # pylint: disable=too-many-instance-attributes,too-few-public-methods
+# This class implements the argparse.Action interface, which has no public
+# methods in older versions of Python.
+class DirectoryValidator(argparse.Action):  # pylint: disable=too-few-public-methods
     """Validates that a command argument represents a legitimate directory.
 
     This is intended for use with
@@ -35,33 +37,24 @@ class DirectoryValidator:  # pylint: disable=too-many-instance-attributes,too-fe
 
     """
 
-    # #lizard forgives
-    def __init__(  # pylint: disable=too-many-arguments
-        self,
-        option_strings,
-        dest,
-        nargs=None,
-        const=None,
-        default=None,
-        type=None,  # pylint: disable=redefined-builtin
-        choices=None,
-        required=False,
-        help=None,  # pylint: disable=redefined-builtin
-        metavar=None,
-    ):
-        self.option_strings = option_strings
-        self.dest = dest
-        self.nargs = nargs
-        self.const = const
-        self.default = default
-        self.type = type
-        self.choices = choices
-        self.required = required
-        self.help = help
-        self.metavar = metavar
-
-    def __call__(self, parser, namespace, values, option_string):
+    def __call__(self, parser, namespace, values, option_string=None):
         directory = os.path.abspath(os.path.expanduser(values))
         if os.path.exists(directory) and not os.path.isdir(directory):
             sys.exit(f"error: {directory} already exists and is not a directory")
-        setattr(namespace, option_string, directory)
+        setattr(namespace, self.dest, directory)
+
+
+def hash_file(file_path: str, chunk_size: int = 1 << 20) -> str:
+    """Calculate a hash of a file's contents.
+
+    :param str file_path: The path to the file to hash.
+    :param int chunk_size: The number of bytes to read at a time.
+    :returns: The SHA-256 digest of the file, as a hexadecimal string.
+    :rtype: str
+    :raises OSError: if the file cannot be read.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as hashed_file:
+        for chunk in iter(lambda: hashed_file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,250 @@
+"""Provides a persistent store of computed metrics.
+
+Evaluating many trackers, or graphing many training runs, repeats the same
+calculations on inputs that rarely change. A :py:class:`MetricStore` saves the
+result of each calculation along with a fingerprint of its inputs: the content
+hash of each input file, and a hash of the parameters of the calculation. A
+stored result is reused until its fingerprint changes.
+
+The results are plain NumPy arrays. The fingerprints of every entry are kept in
+one small JSON index, and the arrays of each entry in an ``.npz`` file of their
+own; so saving a store only writes the index and the entries that changed, and
+loading it never runs code from the files. A store that cannot be read, for
+example because it was written by another version, is treated as empty.
+
+.. code-block:: python
+
+    store = MetricStore("~/.cache/vta")
+    values = store.get(("ope", tracker, sequence), input_paths, parameters)
+    if values is None:
+        values = {"success": calculate_success(*input_paths)}
+        store.put(("ope", tracker, sequence), input_paths, parameters, values)
+    store.save()
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import os.path
+import zipfile
+
+import numpy
+
+import vta.utilities.file_utilities
+
+STORE_FILE = "metrics.json"
+"""The name of the file, in the store directory, that indexes the metrics."""
+
+VALUES_DIRECTORY = "values"
+"""The name of the directory, in the store directory, that holds the arrays of
+each metric."""
+
+
+class MetricStore:
+    """A directory of computed metrics, keyed by name and input fingerprint.
+
+    :param str directory: The directory in which to store metrics. It is
+        created when the store is first saved.
+
+    The index of every entry is loaded when the store is created, and changes
+    are written only by :py:meth:`save`, so checking thousands of entries reads
+    one file. The arrays of an entry are only read when the entry is current.
+    Input files are hashed only when their modification time or size differ
+    from the time and size recorded with an entry; checking an unchanged entry
+    does not read its inputs.
+    """
+
+    def __init__(self, directory: str):
+        directory = os.path.expanduser(directory)
+        self.__file_path = os.path.join(directory, STORE_FILE)
+        self.__values_directory = os.path.join(directory, VALUES_DIRECTORY)
+        self.__entries = _load_entries(self.__file_path)
+        # The values put since the store was saved, by key.
+        self.__pending = {}
+        self.__modified = False
+
+    @property
+    def file_path(self) -> str:
+        """Get the path of the file that indexes the metrics."""
+        return self.__file_path
+
+    def get(self, key, input_paths, parameters):
+        """Get a stored metric, if its inputs and parameters are unchanged.
+
+        :param tuple key: A tuple of strings that names the metric, such as
+            ``("ope", tracker, sequence)``.
+        :param list input_paths: The files from which the metric is calculated.
+        :param dict parameters: The parameters of the calculation. These must
+            be serializable to JSON.
+        :returns: A dictionary that maps the name of each value to its array,
+            or ``None`` if there is no current value for ``key``, or if its
+            arrays cannot be read.
+        :rtype: dict(str, numpy.ndarray)
+        :raises OSError: if an input file cannot be read.
+        """
+        key = tuple(key)
+        entry = self.__entries.get(key)
+        if entry is None or entry["parameters"] != _hash_parameters(parameters):
+            return None
+        inputs = _fingerprint_inputs(input_paths, entry["inputs"])
+        if _hashes(inputs) != _hashes(entry["inputs"]):
+            return None
+        values = self.__pending.get(key)
+        if values is None:
+            values = _load_values(self.__values_path(key))
+            if values is None:
+                return None
+        if inputs != entry["inputs"]:
+            entry["inputs"] = inputs
+            self.__modified = True
+        return values
+
+    def put(self, key, input_paths, parameters, values) -> None:
+        """Store a metric.
+
+        :param tuple key: A tuple of strings that names the metric.
+        :param list input_paths: The files from which the metric was
+            calculated.
+        :param dict parameters: The parameters of the calculation.
+        :param dict values: A dictionary that maps the name of each value to
+            an array, or to a number or string, which is stored as an array.
+        :returns: None
+        :raises OSError: if an input file cannot be read.
+        :raises ValueError: if a value cannot be stored as a plain array, such
+            as an arbitrary Python object.
+        """
+        arrays = {name: numpy.asarray(value) for name, value in values.items()}
+        for name, array in arrays.items():
+            if array.dtype.hasobject:
+                raise ValueError(f"{name} cannot be stored as a plain array")
+        key = tuple(key)
+        previous = self.__entries.get(key, {}).get("inputs", {})
+        self.__entries[key] = {
+            "inputs": _fingerprint_inputs(input_paths, previous),
+            "parameters": _hash_parameters(parameters),
+        }
+        self.__pending[key] = arrays
+        self.__modified = True
+
+    def compute(self, key, input_paths, parameters, function) -> dict:
+        """Get a stored metric, or calculate and store it.
+
+        :param tuple key: A tuple of strings that names the metric.
+        :param list input_paths: The files from which the metric is calculated.
+        :param dict parameters: The parameters of the calculation.
+        :param function: A function with no arguments that calculates the
+            metric and returns its dictionary of values.
+        :returns: The stored values, or the newly calculated values.
+        :rtype: dict
+        """
+        values = self.get(key, input_paths, parameters)
+        if values is None:
+            values = function()
+            self.put(key, input_paths, parameters, values)
+        return values
+
+    def save(self) -> None:
+        """Write the changes to disk, if there were any since the last save.
+
+        The arrays of the metrics put since then are written first, and then
+        the index; each file is replaced atomically.
+
+        :returns: None
+        :raises OSError: if the store cannot be written.
+        """
+        if not self.__modified:
+            return
+        os.makedirs(self.__values_directory, exist_ok=True)
+        for key, arrays in self.__pending.items():
+            with _replacing(self.__values_path(key)) as values_file:
+                numpy.savez(values_file, **arrays)
+        entries = [
+            {
+                "key": list(key),
+                "inputs": entry["inputs"],
+                "parameters": entry["parameters"],
+            }
+            for key, entry in self.__entries.items()
+        ]
+        with _replacing(self.__file_path) as store_file:
+            store_file.write(json.dumps({"entries": entries}).encode("utf-8"))
+        self.__pending = {}
+        self.__modified = False
+
+    def __values_path(self, key):
+        """Return the path of the file that holds the arrays of an entry."""
+        name = hashlib.sha256(json.dumps(list(key)).encode("utf-8")).hexdigest()
+        return os.path.join(self.__values_directory, f"{name}.npz")
+
+
+# -----------------------------------------------------------------------------
+#                                                       implementation details
+# -----------------------------------------------------------------------------
+@contextlib.contextmanager
+def _replacing(file_path):
+    """Open a temporary file, and move it to file_path once it is written."""
+    temporary_path = f"{file_path}.{os.getpid()}"
+    with open(temporary_path, "wb") as written_file:
+        yield written_file
+    os.replace(temporary_path, file_path)
+
+
+def _load_entries(file_path):
+    """Load the index, or return an empty one if it cannot be read."""
+    try:
+        with open(file_path, "rb") as store_file:
+            entries = json.loads(store_file.read().decode("utf-8"))["entries"]
+        return {
+            tuple(entry["key"]): {
+                "inputs": {
+                    path: tuple(fingerprint)
+                    for path, fingerprint in entry["inputs"].items()
+                },
+                "parameters": entry["parameters"],
+            }
+            for entry in entries
+        }
+    except (OSError, ValueError, TypeError, KeyError, AttributeError):
+        return {}
+
+
+def _load_values(file_path):
+    """Load the arrays of an entry, or return None if they cannot be read."""
+    try:
+        # numpy.load leaves a file that it opened open if the file is damaged.
+        with open(file_path, "rb") as values_file:
+            with numpy.load(values_file, allow_pickle=False) as arrays:
+                return {name: arrays[name] for name in arrays.files}
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        return None
+
+
+def _hash_parameters(parameters):
+    text = json.dumps(parameters, sort_keys=True)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _hashes(inputs):
+    return {file_path: fingerprint[2] for file_path, fingerprint in inputs.items()}
+
+
+def _fingerprint_inputs(input_paths, previous):
+    """Describe each input with its time, size, and hash.
+
+    A hash recorded for an input whose time and size have not changed is reused.
+    """
+    inputs = {}
+    for file_path in input_paths:
+        file_path = os.path.abspath(os.path.expanduser(file_path))
+        status = os.stat(file_path)
+        old = previous.get(file_path)
+        if old is not None and old[:2] == (status.st_mtime_ns, status.st_size):
+            inputs[file_path] = old
+        else:
+            inputs[file_path] = (
+                status.st_mtime_ns,
+                status.st_size,
+                vta.utilities.file_utilities.hash_file(file_path),
+            )
+    return inputs
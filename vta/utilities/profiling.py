@@ -0,0 +1,212 @@
+"""Functions for timing the phases of VTA commands.
+
+Commands mark their phases, such as reading data or drawing graphs, with
+:py:func:`phase`. Marking a phase costs almost nothing, unless profiling was
+started with :py:func:`start`, as ``vta --profile`` does. Then the wall time of
+each phase is recorded, along with the peak of the memory allocated through
+Python, which includes NumPy arrays, as traced by :py:mod:`tracemalloc`. The
+main thread is also profiled with :py:mod:`cProfile`. :py:func:`stop` writes
+the phase timeline as JSON, and the profile statistics as a *.pstats* file, which
+can be read with :py:mod:`pstats` or tools such as *snakeviz*.
+
+.. code-block:: python
+
+    with vta.utilities.profiling.phase("read"):
+        losses = vta.loss.loss_file.read_loss_files(file_paths)
+"""
+
+import contextlib
+import cProfile
+import json
+import os
+import os.path
+import sys
+import threading
+import time
+import tracemalloc
+
+TIMELINE_FILE = "timeline.json"
+"""The name of the file to which the phase timeline is written."""
+
+STATISTICS_FILE = "profile.pstats"
+"""The name of the file to which the cProfile statistics are written."""
+
+
+class Phase:
+    """The measurements of one phase of a command.
+
+    .. py:attribute:: name
+        The name of the phase, such as *read* or *plot*.
+
+    .. py:attribute:: thread
+        The name of the thread that ran the phase.
+
+    .. py:attribute:: depth
+        The number of phases of the main thread that enclose this phase.
+
+    .. py:attribute:: start
+        The time at which the phase started, in seconds since profiling started.
+
+    .. py:attribute:: wall_time
+        The number of seconds the phase took.
+
+    .. py:attribute:: peak_memory
+        The largest number of bytes allocated at once during the phase,
+        including those allocated before it. Memory is only traced for the
+        whole process, so this is ``None`` for phases of other threads, which
+        overlap. Before Python 3.9, the peak cannot be reset, so this is the
+        peak since profiling started.
+    """
+
+    def __init__(self, name: str, thread: str, depth: int, started: float):
+        self.name = name
+        self.thread = thread
+        self.depth = depth
+        self.start = started
+        self.wall_time = None
+        self.peak_memory = None
+
+
+class Profiler:
+    """Records the phases of a command."""
+
+    def __init__(self):
+        self.__origin = time.perf_counter()
+        self.__phases = []
+        self.__lock = threading.Lock()
+        # Each element is an open phase of the main thread, and its peak memory.
+        self.__stack = []
+        self.__profile = cProfile.Profile()
+
+    @property
+    def phases(self) -> list:
+        """The :py:class:`Phase` objects that have ended, ordered by start."""
+        with self.__lock:
+            return sorted(self.__phases, key=lambda p: p.start)
+
+    @property
+    def profile(self) -> cProfile.Profile:
+        """The profile of the main thread."""
+        return self.__profile
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        """Measure a phase, for the duration of a ``with`` statement.
+
+        :param str name: The name of the phase.
+        :returns: A context manager, which gives the :py:class:`Phase`.
+        """
+        main = threading.current_thread() is threading.main_thread()
+        record = Phase(
+            name,
+            threading.current_thread().name,
+            len(self.__stack) if main else 0,
+            time.perf_counter() - self.__origin,
+        )
+        if main:
+            self.__record_peak()
+            self.__stack.append([record, 0])
+            _reset_peak()
+        try:
+            yield record
+        finally:
+            record.wall_time = time.perf_counter() - self.__origin - record.start
+            if main:
+                self.__record_peak()
+                record.peak_memory = self.__stack.pop()[1]
+                if self.__stack:
+                    self.__stack[-1][1] = max(self.__stack[-1][1], record.peak_memory)
+            with self.__lock:
+                self.__phases.append(record)
+
+    def write(self, directory: str) -> None:
+        """Write the timeline and the profile statistics.
+
+        :param str directory: The directory in which to write
+            :py:data:`TIMELINE_FILE` and :py:data:`STATISTICS_FILE`. It is
+            created if necessary.
+        :returns: None
+        :raises OSError: if a file cannot be written.
+        """
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, TIMELINE_FILE), "w") as timeline_file:
+            json.dump([vars(p) for p in self.phases], timeline_file, indent=2)
+        self.__profile.dump_stats(os.path.join(directory, STATISTICS_FILE))
+
+    def __record_peak(self):
+        if self.__stack:
+            peak = tracemalloc.get_traced_memory()[1]
+            self.__stack[-1][1] = max(self.__stack[-1][1], peak)
+
+
+def start() -> Profiler:
+    """Start profiling.
+
+    :returns: The profiler that records the phases marked with
+        :py:func:`phase`.
+    :rtype: Profiler
+    """
+    global _PROFILER  # pylint: disable=global-statement
+    _PROFILER = Profiler()
+    tracemalloc.start()
+    _PROFILER.profile.enable()
+    return _PROFILER
+
+
+def stop(directory: str) -> None:
+    """Stop profiling, write the results, and print a summary of the phases.
+
+    :param str directory: The directory in which to write the results. See
+        :py:meth:`Profiler.write`.
+    :returns: None
+    :raises OSError: if a file cannot be written.
+    """
+    global _PROFILER  # pylint: disable=global-statement
+    profiler, _PROFILER = _PROFILER, None
+    if profiler is None:
+        return
+    profiler.profile.disable()
+    tracemalloc.stop()
+    profiler.write(directory)
+    _print_summary(profiler.phases)
+
+
+def phase(name: str):
+    """Mark a phase of a command, for the duration of a ``with`` statement.
+
+    :param str name: The name of the phase, such as *read* or *plot*.
+    :returns: A context manager. If profiling was started, it measures the
+        phase, and gives the :py:class:`Phase`; otherwise, it gives ``None``.
+    """
+    if _PROFILER is None:
+        return _unmeasured()
+    return _PROFILER.phase(name)
+
+
+# -----------------------------------------------------------------------------
+#                                                       implementation details
+# -----------------------------------------------------------------------------
+_PROFILER = None
+
+
+def _print_summary(phases):
+    for record in phases:
+        name = "  " * record.depth + record.name
+        line = f"{name:<24}{record.wall_time:9.3f} s"
+        if record.peak_memory is not None:
+            line += f"{record.peak_memory / 2**20:10.1f} MiB peak"
+        if record.thread != threading.main_thread().name:
+            line += f" ({record.thread})"
+        print(line, file=sys.stderr)
+
+
+@contextlib.contextmanager
+def _unmeasured():
+    """Give no phase; contextlib.nullcontext needs Python 3.7."""
+    yield None
+
+
+def _reset_peak():
+    """Reset the peak of the traced memory, if Python can (3.9 and later)."""
+    if hasattr(tracemalloc, "reset_peak"):
+        tracemalloc.reset_peak()
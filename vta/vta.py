@@ -1,13 +1,67 @@
 """The main entry point for all VTA commands."""
 
 import argparse
+import importlib
 import os.path
 import sys
 
-import yaml
+import vta.utilities.profiling
 
-from vta.dataset import dataset
-from vta.loss import loss
+
+class Command:
+    """A VTA command, whose module is only imported when the command runs.
+
+    Commands such as ``vta loss`` import heavy packages, such as matplotlib.
+    Registering commands by module name means that running one command does
+    not import the modules of the others.
+
+    .. py:attribute:: module
+        The name of the module that implements the command. It has a
+        ``make_parser`` function, which adds the command's parser to the
+        subparsers of the root parser, and a ``main`` function, which runs the
+        command.
+
+    .. py:attribute:: summary
+        A one line description of the command, for ``vta --help``.
+
+    .. py:attribute:: common_options
+        ``True`` if the command's ``make_parser`` function is given the parser
+        of the options common to VTA commands, as its second argument.
+
+    .. py:attribute:: configured
+        ``True`` if the command reads the VTA configuration file. Its ``main``
+        function is given the configuration, as its second argument.
+    """
+
+    def __init__(
+        self,
+        module: str,
+        summary: str,
+        common_options: bool = False,
+        configured: bool = False,
+    ):
+        self.module = module
+        self.summary = summary
+        self.common_options = common_options
+        self.configured = configured
+
+
+COMMANDS = {
+    "dataset": Command(
+        "vta.dataset.dataset", "Download a video data set, or part of a data set."
+    ),
+    "evaluate": Command(
+        "vta.evaluate.evaluate",
+        "Evaluate tracker results with OTB one pass evaluation.",
+    ),
+    "loss": Command(
+        "vta.loss.loss",
+        "Analyze data related to machine learning training loss.",
+        common_options=True,
+        configured=True,
+    ),
+}
+"""The VTA commands, by name."""
 
 
 def main():
@@ -21,22 +75,26 @@ def main():
         error occurred.
     :rtype: int
     """
-    master_parser = make_parser()
+    master_parser = make_parser(_find_commands(sys.argv[1:]))
     arguments = master_parser.parse_args()
-    if arguments.configuration:
-        configuration = load_configuration(arguments.configuration)
-    else:
-        configuration = None
-    if arguments.command == "dataset":
-        return dataset.main(arguments)
-    if arguments.command == "loss":
-        return loss.main(arguments, configuration)
-    return 0
-
-
-def make_parser():
+    if arguments.command is None:
+        return 0
+    if arguments.profile is None:
+        return _run_command(arguments)
+    vta.utilities.profiling.start()
+    try:
+        return _run_command(arguments)
+    finally:
+        vta.utilities.profiling.stop(arguments.profile)
+
+
+def make_parser(commands=None):
     """Create the argument parser for the root VTA command.
 
+    :param commands: The names of the commands whose modules are imported to
+        add their full parsers. The other commands are added with only their
+        summaries, which is enough for ``vta --help``. If this is ``None``, all
+        the commands are imported.
     :return: The argument parser, with all common arguments and subparsers
         added.
     :rtype: :py:class:`argparse.ArgumentParser`
@@ -53,6 +111,14 @@ def make_parser():
         help="Print the version of VTA, then exit.",
         version="1.0",
     )
+    master_parser.add_argument(
+        "--profile",
+        help="Measure the wall time and peak memory of each phase of the"
+        " command, such as reading data and drawing graphs. Print a summary,"
+        " and write the phase timeline (timeline.json) and the cProfile"
+        " statistics (profile.pstats) to this directory.",
+        metavar="DIR",
+    )
     subparsers = master_parser.add_subparsers(
         title="VTA commands",
         description="These are the commands available in VTA.",
@@ -65,8 +131,15 @@ def make_parser():
         " format is YAML.",
         default=os.path.expanduser("~/.vta.yml"),
     )
-    # dataset.make_parser(subparsers)
-    loss.make_parser(subparsers, common_options)
+    for name, command in COMMANDS.items():
+        if commands is not None and name not in commands:
+            subparsers.add_parser(name, help=command.summary, add_help=False)
+        elif command.common_options:
+            importlib.import_module(command.module).make_parser(
+                subparsers, common_options
+            )
+        else:
+            importlib.import_module(command.module).make_parser(subparsers)
     return master_parser
 
 
@@ -78,6 +151,9 @@ def load_configuration(file_path):
     :rtype: dict
     :raises OSError: if opening file_path fails.
     """
+    # Only commands that read the configuration pay for importing yaml.
+    import yaml  # pylint: disable=import-outside-toplevel
+
     file_path = os.path.expanduser(file_path)
     try:
         with open(file_path) as config_file:
@@ -89,5 +165,40 @@ def load_configuration(file_path):
     return configuration
 
 
+# -----------------------------------------------------------------------------
+#                                                       implementation details
+# -----------------------------------------------------------------------------
+_VALUE_OPTIONS = ("--profile",)
+
+
+def _find_commands(argv):
+    """Return the command named on the command line, as a list.
+
+    The first argument that is neither a root option nor the value of a root
+    option names the command.
+    """
+    arguments = iter(argv)
+    for argument in arguments:
+        if argument in _VALUE_OPTIONS:
+            next(arguments, None)
+        elif not argument.startswith("-"):
+            return [argument] if argument in COMMANDS else []
+    return []
+
+
+def _run_command(arguments):
+    command = COMMANDS[arguments.command]
+    module = importlib.import_module(command.module)
+    with vta.utilities.profiling.phase(arguments.command):
+        if not command.configured:
+            return module.main(arguments)
+        if arguments.configuration:
+            with vta.utilities.profiling.phase("configuration"):
+                configuration = load_configuration(arguments.configuration)
+        else:
+            configuration = None
+        return module.main(arguments, configuration)
+
+
 if __name__ == "__main__":
     sys.exit(main())